@@ -0,0 +1,218 @@
+"""
+Benchmarks de las etapas de la QSN: tiempo y pico de memoria frente al tamaño de entrada.
+
+Uso:
+    python3 benchmarks/run.py                      # mide y compara con benchmarks/baseline.json
+    python3 benchmarks/run.py --quick              # tamaños pequeños
+    python3 benchmarks/run.py --output res.json    # guarda los resultados en JSON
+    python3 benchmarks/run.py --update-baseline    # reemplaza la línea base
+
+Para cada etapa se ajusta la pendiente log-log del tiempo y de la memoria frente al tamaño
+(1 = lineal, 2 = cuadrático...). Una pendiente que supera la de la línea base en más de
+--slope-tolerance se marca como regresión de escalado y el script termina con código 1.
+
+La memoria es el pico de tracemalloc, que sólo ve las reservas de Python y NumPy: la memoria
+interna de qiskit-aer (C++) no se cuenta.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qsn.automaton import QSNAutomaton
+from qsn.circuits import create_correlation_circuit, create_ising_circuit, ring_interactions
+from qsn.cut_project import cut_and_project
+from qsn.e8 import e8_shell, e8_shell_doubled
+from qsn.geometry import generate_quasicrystal_tetrahedra, generate_tetrahedra, project_to_3d
+from qsn.ising import run_circuit
+from qsn.transmission import simulate_qubit_transmission, simulate_qubit_transmission_batch
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+def _e8_shell(shell):
+    def run():
+        # En frío: sin las cachés de las capas del E8
+        e8_shell.cache_clear()
+        e8_shell_doubled.cache_clear()
+        e8_shell(shell)
+    return run
+
+def _cut_and_project(radius):
+    return lambda: sum(len(chunk) for chunk in cut_and_project(radius, dims=4))
+
+def _project(n):
+    vertices = np.random.default_rng(0).standard_normal((n, 8))
+    return lambda: project_to_3d(vertices, window_size=2.0)
+
+def _tetrahedra(n):
+    points = np.random.default_rng(0).random((n, 3))
+    return lambda: generate_tetrahedra(points)
+
+def _quasicrystal_tetrahedra(n):
+    return lambda: generate_quasicrystal_tetrahedra(n, seed=0)
+
+def _transmission(n):
+    return lambda: simulate_qubit_transmission([1, 0, 0], [0, 1, 0], num_samples=n, seed=0)
+
+def _transmission_batch(n):
+    states = np.tile([1, 0, 0], (n, 1))
+    return lambda: simulate_qubit_transmission_batch(states, [0, 1, 0], num_samples=1000, seed=0)
+
+def _automaton(n):
+    points = np.random.default_rng(0).random((n, 3))
+    _, simplices = generate_tetrahedra(points)
+    automaton = QSNAutomaton(simplices, seed=0)
+    return lambda: automaton.step(10)
+
+def _circuit_build(n):
+    return lambda: create_correlation_circuit(n, ring_interactions(n))
+
+def _ising_fast_path(n):
+    qc = create_ising_circuit(n, ring_interactions(n))
+    return lambda: run_circuit(qc, shots=1000, seed=0)
+
+def _aer_simulation(n):
+    from qiskit_aer import AerSimulator
+
+    qc = create_correlation_circuit(n, ring_interactions(n))
+    simulator = AerSimulator()
+    return lambda: simulator.run(qc, shots=1000, seed_simulator=0).result()
+
+# Etapa -> (tamaños, tamaños de --quick (un tramo de los anteriores), constructor, unidad del tamaño)
+CASES = {
+    'e8_shell': ([2, 4, 8], [2, 4], _e8_shell, 'capa'),
+    'cut_and_project': ([2.0, 3.0, 4.0], [2.0, 3.0], _cut_and_project, 'radio'),
+    'project_to_3d': ([10_000, 100_000, 1_000_000], [10_000, 100_000], _project, 'vértices'),
+    'generate_tetrahedra': ([2_000, 8_000, 32_000], [2_000, 8_000], _tetrahedra, 'puntos'),
+    'generate_quasicrystal_tetrahedra': ([10_000, 100_000, 1_000_000], [10_000, 100_000],
+                                         _quasicrystal_tetrahedra, 'tetraedros'),
+    'simulate_qubit_transmission': ([10_000, 100_000, 1_000_000], [10_000, 100_000], _transmission,
+                                    'muestras'),
+    'simulate_qubit_transmission_batch': ([100, 1_000, 10_000], [100, 1_000], _transmission_batch, 'pares'),
+    'automaton_step': ([2_000, 8_000, 32_000], [2_000, 8_000], _automaton, 'puntos'),
+    'create_correlation_circuit': ([10, 100, 1_000], [10, 100], _circuit_build, 'qubits'),
+    'run_circuit_ising': ([10, 100, 1_000], [10, 100], _ising_fast_path, 'qubits'),
+    'aer_correlation_circuit': ([8, 12, 16], [8, 12], _aer_simulation, 'qubits'),
+}
+
+def measure(run, min_time=0.2, min_repeat=3, max_repeat=10_000):
+    """
+    Mejor tiempo de varias repeticiones y pico de memoria de tracemalloc de una ejecución aparte.
+
+    Se repite al menos `min_repeat` veces y hasta sumar `min_time` segundos (con un tope de
+    `max_repeat`), así que las etapas de microsegundos también se miden sobre muchas ejecuciones.
+    """
+    times = []
+    start = time.perf_counter()
+    while len(times) < min_repeat or (time.perf_counter() - start < min_time and len(times) < max_repeat):
+        t0 = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak
+
+def slope(sizes, values):
+    """Pendiente del ajuste por mínimos cuadrados de log(valor) frente a log(tamaño)."""
+    sizes, values = np.asarray(sizes, dtype=float), np.maximum(np.asarray(values, dtype=float), 1e-12)
+    if len(sizes) < 2:
+        return float('nan')
+    return float(np.polyfit(np.log(sizes), np.log(values), 1)[0])
+
+def run_benchmarks(names=None, quick=False):
+    """Ejecuta las etapas pedidas y devuelve el diccionario de resultados."""
+    results = {}
+    for name, (sizes, quick_sizes, build, unit) in CASES.items():
+        if names and name not in names:
+            continue
+        sizes = quick_sizes if quick else sizes
+        seconds, peaks = [], []
+        try:
+            for size in sizes:
+                elapsed, peak = measure(build(size))
+                seconds.append(elapsed)
+                peaks.append(peak)
+                print(f"{name:36s} {unit:>10s}={size:<10g} {elapsed * 1e3:10.2f} ms {peak / 2**20:10.2f} MiB")
+        except ImportError as e:
+            print(f"{name:36s} omitido: {e}")
+            continue
+        results[name] = {'unit': unit, 'sizes': sizes, 'seconds': seconds, 'peak_bytes': peaks,
+                         'time_slope': slope(sizes, seconds), 'memory_slope': slope(sizes, peaks)}
+    return {
+        'meta': {'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                 'python': platform.python_version(), 'numpy': np.__version__,
+                 'machine': platform.machine(), 'quick': quick},
+        'results': results,
+    }
+
+def compare(current, baseline, slope_tolerance=0.3):
+    """
+    Compara las pendientes de escalado con la línea base.
+
+    La pendiente de la línea base se reajusta sobre sus tamaños dentro del rango medido ahora,
+    de modo que una ejecución con --quick se compare con el mismo tramo de la curva.
+
+    Retorna:
+    list: Mensajes de regresión (vacía si no hay ninguna).
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        lo, hi = min(result['sizes']), max(result['sizes'])
+        inside = [i for i, size in enumerate(base['sizes']) if lo <= size <= hi]
+        if len(inside) < 2:
+            print(f"{name:36s} sin tramo común con la línea base")
+            continue
+        sizes = [base['sizes'][i] for i in inside]
+        for key, values in (('time_slope', 'seconds'), ('memory_slope', 'peak_bytes')):
+            base_slope = slope(sizes, [base[values][i] for i in inside])
+            if result[key] > base_slope + slope_tolerance:
+                regressions.append(f"{name}: {key} {result[key]:.2f} > línea base {base_slope:.2f}")
+        ratio = np.median([result['seconds'][result['sizes'].index(s)] / base['seconds'][base['sizes'].index(s)]
+                           for s in sizes if s in result['sizes']] or [np.nan])
+        print(f"{name:36s} pendiente {result['time_slope']:5.2f} "
+              f"(base {slope(sizes, [base['seconds'][i] for i in inside]):5.2f}), tiempo x{ratio:.2f} respecto a la base")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('stages', nargs='*', help="Etapas a medir (por defecto, todas)")
+    parser.add_argument('--quick', action='store_true', help="Usa tamaños pequeños")
+    parser.add_argument('--output', help="Ruta del JSON de resultados")
+    parser.add_argument('--baseline', default=BASELINE, help="JSON de la línea base")
+    parser.add_argument('--update-baseline', action='store_true', help="Guarda los resultados como línea base")
+    parser.add_argument('--slope-tolerance', type=float, default=0.3,
+                        help="Aumento máximo admitido de la pendiente log-log")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.stages, quick=args.quick)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=2)
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.slope_tolerance)
+    for regression in regressions:
+        print(f"REGRESIÓN {regression}")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import argparse
+import time
+import numpy as np
+from qsn.automaton import QSNAutomaton
+from qsn.cut_project import cut_and_project
+from qsn.geometry import generate_tetrahedra
+from qsn.mesh_buffer import MeshBuffer
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta un parche de la QSN al formato binario del visor (main.c)")
+    parser.add_argument('output', help="Ruta del archivo de malla (p. ej. qsn.mesh)")
+    parser.add_argument('--radius', type=float, default=4.0, help="Radio del parche en el espacio físico")
+    parser.add_argument('--frames', type=int, default=0, help="Fotogramas del autómata a publicar en vivo")
+    parser.add_argument('--interval', type=float, default=0.5, help="Segundos entre fotogramas")
+    parser.add_argument('--seed', type=int, default=123, help="Semilla de los estados iniciales")
+    args = parser.parse_args(argv)
+
+    # Parche por corte y proyección (cut_and_project ya descarta los puntos que coinciden en 3D)
+    points = np.concatenate(list(cut_and_project(args.radius, dims=3)))
+    points, simplices = generate_tetrahedra(points, tiled=len(points) > 200_000)
+    simplices = np.asarray(simplices).reshape(-1, 4)
+
+    automaton = QSNAutomaton(simplices, seed=args.seed)
+    mesh = MeshBuffer.create(args.output, points, simplices, automaton.states)
+    print(f"{args.output}: {len(points)} puntos, {len(simplices)} tetraedros")
+
+    # El visor relee sólo la sección de estados cuando cambia state_version
+    with mesh:
+        for _ in range(args.frames):
+            time.sleep(args.interval)
+            mesh.update_states(automaton.step())
+            print(f"Fotograma {automaton.frame}: off/left/right = {automaton.census().tolist()}")
+
+if __name__ == '__main__':
+    main()
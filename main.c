@@ -1,11 +1,43 @@
+#define GL_GLEXT_PROTOTYPES
 #include <GL/glut.h>
+#include <fcntl.h>
 #include <math.h>
+#include <stdint.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
 
 #define num_tetrahedra 500
 #define phi ((1 + sqrt(5)) / 2)
 
+// Formato de malla exportado por qsn/mesh_buffer.py (versión 1, little-endian)
+#define MESH_MAGIC "QSNMESH"
+#define MESH_VERSION 1
+#define STATE_NONE 255
+#define POLL_MS 200
+
+typedef struct {
+    char magic[8];
+    uint32_t version;
+    uint32_t header_size;
+    uint64_t num_points;
+    uint64_t num_cells;
+    uint64_t points_offset;
+    uint64_t simplices_offset;
+    uint64_t states_offset;
+    uint64_t state_version;
+} MeshHeader;
+
+// Caras de un tetraedro como índices locales de sus 4 vértices
+static const int faces[4][3] = {{0, 1, 2}, {0, 1, 3}, {0, 2, 3}, {1, 2, 3}};
+
+// Clases de dibujo: sin estado, izquierda, derecha (las celdas apagadas no se dibujan)
+#define NUM_CLASSES 3
+static const float class_colors[NUM_CLASSES][3] = {{0, 0, 1}, {0.85f, 0.2f, 0.2f}, {0.2f, 0.4f, 0.9f}};
+
 // Variables para la posición de la cámara
 float cameraX = 5.0, cameraY = 5.0, cameraZ = 5.0;
 
@@ -13,6 +45,20 @@ typedef struct {
     float x, y, z;
 } Point3D;
 
+// Malla actual: mapeada desde el archivo o generada una sola vez en modo de demostración
+const char *mesh_path = NULL;
+void *mesh_map = NULL;
+size_t mesh_size = 0;
+ino_t mesh_inode = 0;
+const Point3D *points = NULL;
+const uint32_t *simplices = NULL;
+const uint8_t *states = NULL;
+uint64_t num_points = 0, num_cells = 0, last_state_version = 0;
+
+GLuint vertex_buffer = 0, index_buffer = 0;
+GLsizei class_counts[NUM_CLASSES];
+uint32_t *indices = NULL;
+
 Point3D generate_rotation() {
     Point3D rotation;
     rotation.x = (float)rand() / RAND_MAX * 2 * M_PI;
@@ -73,28 +119,126 @@ void generate_quasicrystal_tetrahedron(Point3D *vertices, float size) {
     }
 }
 
-void draw_tetrahedron(Point3D *vertices) {
-    glBegin(GL_TRIANGLES);
-    // Base
-    glVertex3f(vertices[0].x, vertices[0].y, vertices[0].z);
-    glVertex3f(vertices[1].x, vertices[1].y, vertices[1].z);
-    glVertex3f(vertices[2].x, vertices[2].y, vertices[2].z);
-
-    // Side 1
-    glVertex3f(vertices[0].x, vertices[0].y, vertices[0].z);
-    glVertex3f(vertices[1].x, vertices[1].y, vertices[1].z);
-    glVertex3f(vertices[3].x, vertices[3].y, vertices[3].z);
-
-    // Side 2
-    glVertex3f(vertices[0].x, vertices[0].y, vertices[0].z);
-    glVertex3f(vertices[2].x, vertices[2].y, vertices[2].z);
-    glVertex3f(vertices[3].x, vertices[3].y, vertices[3].z);
-
-    // Side 3
-    glVertex3f(vertices[1].x, vertices[1].y, vertices[1].z);
-    glVertex3f(vertices[2].x, vertices[2].y, vertices[2].z);
-    glVertex3f(vertices[3].x, vertices[3].y, vertices[3].z);
-    glEnd();
+// Modo de demostración: los 500 tetraedros aleatorios se generan una sola vez al arrancar
+void build_toy_mesh() {
+    Point3D *toy_points = malloc(4 * num_tetrahedra * sizeof(Point3D));
+    uint32_t *toy_simplices = malloc(4 * num_tetrahedra * sizeof(uint32_t));
+    uint8_t *toy_states = malloc(num_tetrahedra);
+    for (int i = 0; i < num_tetrahedra; i++) {
+        generate_quasicrystal_tetrahedron(&toy_points[4 * i], 1.0);
+        for (int k = 0; k < 4; k++) {
+            toy_simplices[4 * i + k] = 4 * i + k;
+        }
+        toy_states[i] = STATE_NONE;
+    }
+    points = toy_points;
+    simplices = toy_simplices;
+    states = toy_states;
+    num_points = 4 * num_tetrahedra;
+    num_cells = num_tetrahedra;
+}
+
+// Mapea el archivo de malla; la geometría se usa directamente desde el mapa, sin copiarla
+int map_mesh(const char *path) {
+    int fd = open(path, O_RDONLY);
+    if (fd < 0) {
+        perror(path);
+        return -1;
+    }
+    struct stat st;
+    if (fstat(fd, &st) < 0 || (size_t)st.st_size < sizeof(MeshHeader)) {
+        fprintf(stderr, "%s: archivo de malla truncado\n", path);
+        close(fd);
+        return -1;
+    }
+    void *map = mmap(NULL, st.st_size, PROT_READ, MAP_SHARED, fd, 0);
+    close(fd);
+    if (map == MAP_FAILED) {
+        perror("mmap");
+        return -1;
+    }
+    const MeshHeader *header = map;
+    if (memcmp(header->magic, MESH_MAGIC, 8) != 0 || header->version != MESH_VERSION ||
+        header->points_offset + 12 * header->num_points > (uint64_t)st.st_size ||
+        header->simplices_offset + 16 * header->num_cells > (uint64_t)st.st_size ||
+        header->states_offset + header->num_cells > (uint64_t)st.st_size) {
+        fprintf(stderr, "%s: no es una malla QSN de versión %d válida\n", path, MESH_VERSION);
+        munmap(map, st.st_size);
+        return -1;
+    }
+    if (mesh_map) {
+        munmap(mesh_map, mesh_size);
+    }
+    mesh_map = map;
+    mesh_size = st.st_size;
+    mesh_inode = st.st_ino;
+    points = (const Point3D *)((const char *)map + header->points_offset);
+    simplices = (const uint32_t *)((const char *)map + header->simplices_offset);
+    states = (const uint8_t *)map + header->states_offset;
+    num_points = header->num_points;
+    num_cells = header->num_cells;
+    return 0;
+}
+
+// Sube los vértices una sola vez como buffer estático
+void upload_geometry() {
+    glBindBuffer(GL_ARRAY_BUFFER, vertex_buffer);
+    glBufferData(GL_ARRAY_BUFFER, num_points * sizeof(Point3D), points, GL_STATIC_DRAW);
+
+    // Encuadrar la cámara según la extensión del parche
+    float extent = 1;
+    for (uint64_t i = 0; i < num_points; i++) {
+        extent = fmaxf(extent, fmaxf(fabsf(points[i].x), fmaxf(fabsf(points[i].y), fabsf(points[i].z))));
+    }
+    cameraX = cameraY = cameraZ = 1.5f * extent;
+}
+
+// Reconstruye el buffer de índices a partir de los estados: es lo único que se relee al cambiar
+void rebuild_indices() {
+    const volatile MeshHeader *header = mesh_map;
+    if (header) {
+        last_state_version = header->state_version;
+    }
+    GLsizei offsets[NUM_CLASSES];
+    memset(class_counts, 0, sizeof(class_counts));
+    for (uint64_t i = 0; i < num_cells; i++) {
+        uint8_t state = states[i];
+        if (state != 0) {
+            class_counts[state <= 2 ? state : 0] += 12;
+        }
+    }
+    offsets[0] = 0;
+    for (int c = 1; c < NUM_CLASSES; c++) {
+        offsets[c] = offsets[c - 1] + class_counts[c - 1];
+    }
+    GLsizei total = offsets[NUM_CLASSES - 1] + class_counts[NUM_CLASSES - 1];
+    indices = realloc(indices, (total ? total : 1) * sizeof(uint32_t));
+    for (uint64_t i = 0; i < num_cells; i++) {
+        uint8_t state = states[i];
+        if (state == 0) {
+            continue;
+        }
+        GLsizei *offset = &offsets[state <= 2 ? state : 0];
+        for (int f = 0; f < 4; f++) {
+            for (int k = 0; k < 3; k++) {
+                indices[(*offset)++] = simplices[4 * i + faces[f][k]];
+            }
+        }
+    }
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, index_buffer);
+    glBufferData(GL_ELEMENT_ARRAY_BUFFER, total * sizeof(uint32_t), indices, GL_DYNAMIC_DRAW);
+}
+
+void draw_classes() {
+    GLsizei offset = 0;
+    for (int c = 0; c < NUM_CLASSES; c++) {
+        if (class_counts[c]) {
+            glColor3fv(class_colors[c]);
+            glDrawElements(GL_TRIANGLES, class_counts[c], GL_UNSIGNED_INT,
+                           (const void *)(offset * sizeof(uint32_t)));
+        }
+        offset += class_counts[c];
+    }
 }
 
 void display() {
@@ -102,20 +246,61 @@ void display() {
     glLoadIdentity();
     gluLookAt(cameraX, cameraY, cameraZ, 0, 0, 0, 0, 1, 0); // Set the camera position
 
-    glColor3f(0, 0, 1); // Blue color
+    glBindBuffer(GL_ARRAY_BUFFER, vertex_buffer);
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, index_buffer);
+    glEnableClientState(GL_VERTEX_ARRAY);
+    glVertexPointer(3, GL_FLOAT, 0, 0);
 
-    for (int i = 0; i < num_tetrahedra; i++) {
-        Point3D vertices[4];
-        generate_quasicrystal_tetrahedron(vertices, 1.0);
-        draw_tetrahedron(vertices);
+    // Caras rellenas y, encima, las aristas en gris oscuro para distinguir los tetraedros
+    glEnable(GL_POLYGON_OFFSET_FILL);
+    glPolygonOffset(1, 1);
+    draw_classes();
+    glDisable(GL_POLYGON_OFFSET_FILL);
+    glPolygonMode(GL_FRONT_AND_BACK, GL_LINE);
+    GLsizei total = 0;
+    for (int c = 0; c < NUM_CLASSES; c++) {
+        total += class_counts[c];
     }
+    glColor3f(0.2f, 0.2f, 0.2f);
+    glDrawElements(GL_TRIANGLES, total, GL_UNSIGNED_INT, 0);
+    glPolygonMode(GL_FRONT_AND_BACK, GL_FILL);
 
+    glDisableClientState(GL_VERTEX_ARRAY);
     glutSwapBuffers();
 }
 
+// Comprueba periódicamente si el archivo se ha reemplazado (nueva geometría) o si han cambiado los estados
+void poll_mesh(int value) {
+    struct stat st;
+    const volatile MeshHeader *header = mesh_map;
+    if (stat(mesh_path, &st) == 0 && st.st_ino != mesh_inode) {
+        if (map_mesh(mesh_path) == 0) {
+            upload_geometry();
+            rebuild_indices();
+            glutPostRedisplay();
+        }
+    } else if (header && header->state_version != last_state_version) {
+        rebuild_indices();
+        glutPostRedisplay();
+    }
+    glutTimerFunc(POLL_MS, poll_mesh, value);
+}
+
+void reshape(int width, int height) {
+    glViewport(0, 0, width, height);
+    glMatrixMode(GL_PROJECTION);
+    glLoadIdentity();
+    gluPerspective(45, (double)width / (height ? height : 1), 0.1, 1000);
+    glMatrixMode(GL_MODELVIEW);
+}
+
 void init() {
     glClearColor(1, 1, 1, 1); // Set background color to white
     glEnable(GL_DEPTH_TEST);
+    glGenBuffers(1, &vertex_buffer);
+    glGenBuffers(1, &index_buffer);
+    upload_geometry();
+    rebuild_indices();
 }
 
 void specialKeys(int key, int x, int y) {
@@ -138,15 +323,28 @@ void specialKeys(int key, int x, int y) {
 }
 
 int main(int argc, char **argv) {
-    srand(123); // Seed for reproducibility
     glutInit(&argc, argv);
+    // ./tetrahedron qsn.mesh dibuja una malla exportada con export_mesh.py; sin argumentos, la demostración
+    if (argc > 1) {
+        mesh_path = argv[1];
+        if (map_mesh(mesh_path) < 0) {
+            return 1;
+        }
+    } else {
+        srand(123); // Seed for reproducibility
+        build_toy_mesh();
+    }
     glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH);
     glutInitWindowSize(800, 600);
     glutCreateWindow("Quasicrystalline Spin Network (QSN)");
 
     glutDisplayFunc(display);
+    glutReshapeFunc(reshape);
     glutSpecialFunc(specialKeys); // Registramos la función specialKeys como callback para las teclas especiales
     init();
+    if (mesh_path) {
+        glutTimerFunc(POLL_MS, poll_mesh, 0);
+    }
     glutMainLoop();
     return 0;
 }
@@ -0,0 +1,25 @@
+import argparse
+import asyncio
+from qsn.cache import ArtifactCache
+from qsn.patch_service import PatchService
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio local de parches de la QSN (socket Unix o localhost)")
+    parser.add_argument('--socket', help="Ruta del socket Unix (por defecto se escucha en --host/--port)")
+    parser.add_argument('--host', default='127.0.0.1', help="Dirección TCP local")
+    parser.add_argument('--port', type=int, default=8765, help="Puerto TCP")
+    parser.add_argument('--max-mb', type=float, default=1024, help="Memoria máxima de la caché de parches (MiB)")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos de cálculo")
+    parser.add_argument('--disk-cache', action='store_true', help="Guardar también los parches en la caché en disco")
+    args = parser.parse_args(argv)
+
+    service = PatchService(max_bytes=int(args.max_mb * 2**20), max_workers=args.workers,
+                           disk_cache=ArtifactCache() if args.disk_cache else None)
+    print(f"Sirviendo parches en {args.socket or f'{args.host}:{args.port}'}")
+    try:
+        asyncio.run(service.serve(path=args.socket, host=args.host, port=args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
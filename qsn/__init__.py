@@ -0,0 +1,27 @@
+"""
+Utilidades compartidas para la QSN (Quasicrystalline Spin Network) y su mapeo a E8.
+
+Importar el paquete no ejecuta ningún cálculo ni carga scipy, matplotlib ni qiskit: se importan
+sólo dentro de las funciones que los usan (triangular, indexar puntos o construir matrices
+dispersas; dibujar; construir y simular un circuito).
+"""
+from qsn.automaton import LEFT, OFF, RIGHT, QSNAutomaton, face_adjacency, register_rule
+from qsn.cache import ArtifactCache, cache_key
+from qsn.circuits import create_correlation_circuit, create_ising_circuit, ring_interactions, simulate_counts
+from qsn.cut_project import PHI, cut_and_project, project_parallel, project_perpendicular
+from qsn.e8 import e8_lattice_points, e8_roots, e8_shell
+from qsn.ensemble import parameter_grid, run_ensemble
+from qsn.exact import ExactPointIndex, deduplicate, hash_rows, is_e8_doubled, to_doubled, zphi_project
+from qsn.frame_store import FrameStore, geometry_hash, record_run
+from qsn.geometry import (generate_e8_vertices, generate_hexagonal_grid, generate_quasicrystal_tetrahedra,
+                          generate_quasicrystal_tetrahedron, generate_tetrahedra, hexagonal_axial_coordinates,
+                          project_to_3d, project_to_3d_exact, project_to_4d, random_rotation_matrices)
+from qsn.ising import diagonal_ising, ising_probabilities, run_circuit, sample_ising
+from qsn.mps import MatrixProductState, run_mps, tetrahedra_interactions
+from qsn.phason import PhasonPatch, PhasonUpdate
+from qsn.point_index import QSNPointIndex
+from qsn.render import plot_flower_of_life, plot_tetrahedra, show_or_save, tetrahedra_faces
+from qsn.sweep import sweep_counts
+from qsn.tetrahedralize import BlockFailure, circumspheres, tetrahedralize_tiled
+from qsn.transmission import simulate_qubit_transmission, simulate_qubit_transmission_batch, transmission_task
+from qsn.vertex_types import VertexCensus, classify_vertices, register_vertex_type, vertex_type_name
@@ -0,0 +1,149 @@
+"""Autómata celular de la QSN sobre tetraedros: apagado, o encendido y rotado a izquierda o derecha."""
+import numpy as np
+
+from qsn.render import TETRAHEDRON_FACES
+
+# Estados de cada "píxel" tetraédrico (2 bits)
+OFF, LEFT, RIGHT = 0, 1, 2
+
+def face_adjacency(simplices):
+    """
+    Construye la matriz de adyacencia por caras entre tetraedros.
+
+    Parámetros:
+    simplices (array): Índices de los vértices de cada tetraedro, forma (N, 4).
+
+    Retorna:
+    csr_matrix: Matriz (N, N) de int8 con un 1 para cada par de tetraedros que comparten cara.
+    """
+    from scipy.sparse import csr_matrix
+
+    simplices = np.asarray(simplices, dtype=np.int64).reshape(-1, 4)
+    num_cells = len(simplices)
+    faces = np.sort(simplices[:, TETRAHEDRON_FACES].reshape(-1, 3), axis=1)
+    owner = np.repeat(np.arange(num_cells), 4)
+    num_points = int(simplices.max()) + 1 if num_cells else 0
+    if num_points ** 3 < 2 ** 63:
+        # Clave entera única por cara: ordenar un int64 es mucho más rápido que un lexsort
+        keys = (faces[:, 0] * num_points + faces[:, 1]) * num_points + faces[:, 2]
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        same = keys[1:] == keys[:-1]
+    else:
+        order = np.lexsort(faces.T[::-1])
+        faces = faces[order]
+        same = np.all(faces[1:] == faces[:-1], axis=1)
+    owner = owner[order]
+    # En una tetraedrización cada cara interior aparece exactamente dos veces, consecutivas al ordenar
+    shared = np.nonzero(same)[0]
+    rows = np.concatenate([owner[shared], owner[shared + 1]])
+    cols = np.concatenate([owner[shared + 1], owner[shared]])
+    data = np.ones(len(rows), dtype=np.int8)
+    return csr_matrix((data, (rows, cols)), shape=(num_cells, num_cells))
+
+def pack_states(states):
+    """Empaqueta estados de 2 bits, cuatro celdas por byte."""
+    states = np.asarray(states, dtype=np.uint8)
+    padded = np.zeros(-(-len(states) // 4) * 4, dtype=np.uint8)
+    padded[:len(states)] = states
+    padded = padded.reshape(-1, 4)
+    return padded[:, 0] | (padded[:, 1] << 2) | (padded[:, 2] << 4) | (padded[:, 3] << 6)
+
+def unpack_states(packed, num_cells):
+    """Desempaqueta estados de 2 bits empaquetados con `pack_states`."""
+    shifts = np.array([0, 2, 4, 6], dtype=np.uint8)
+    return ((np.asarray(packed, dtype=np.uint8)[:, None] >> shifts) & 3).reshape(-1)[:num_cells]
+
+def life_rule(states, counts, birth=(2,), survive=(1, 2)):
+    """
+    Regla tipo Vida quiral: una celda apagada se enciende si el número de vecinas encendidas está
+    en `birth`, con la quiralidad mayoritaria de sus vecinas (izquierda en empate); una encendida
+    sigue igual si ese número está en `survive` y si no se apaga.
+    """
+    born_table = np.zeros(5, dtype=bool)
+    born_table[list(birth)] = True
+    survive_table = np.zeros(5, dtype=bool)
+    survive_table[list(survive)] = True
+
+    alive = counts[:, LEFT] + counts[:, RIGHT]
+    on = states != OFF
+    chirality = np.where(counts[:, RIGHT] > counts[:, LEFT], RIGHT, LEFT).astype(np.uint8)
+    new_states = np.where(on & survive_table[alive], states, OFF).astype(np.uint8)
+    born = ~on & born_table[alive]
+    new_states[born] = chirality[born]
+    return new_states
+
+def majority_rule(states, counts):
+    """Cada celda encendida adopta la quiralidad mayoritaria de sus vecinas (en empate no cambia)."""
+    new_states = states.copy()
+    on = states != OFF
+    new_states[on & (counts[:, LEFT] > counts[:, RIGHT])] = LEFT
+    new_states[on & (counts[:, RIGHT] > counts[:, LEFT])] = RIGHT
+    return new_states
+
+# Reglas disponibles: f(states, counts, **params) -> nuevos estados
+RULES = {
+    'life': life_rule,
+    'majority': majority_rule,
+}
+
+def register_rule(name, rule):
+    """Registra una regla de actualización f(states, counts, **params) -> nuevos estados (uint8)."""
+    RULES[name] = rule
+
+class QSNAutomaton:
+    """
+    Autómata celular sobre la tetraedrización de la QSN.
+
+    Los estados se guardan empaquetados (2 bits por celda) y cada paso es una multiplicación de
+    la matriz de adyacencia CSR por los indicadores de estado más una regla vectorizada.
+
+    Parámetros:
+    simplices (array): Tetraedros devueltos por `generate_tetrahedra`, forma (N, 4).
+    rule (str | callable): Nombre en RULES o función f(states, counts, **params).
+    params (dict | None): Parámetros de la regla.
+    states (array | None): Estados iniciales (N,). Por defecto, aleatorios según `density`.
+    density (float): Fracción de celdas encendidas si no se dan estados iniciales.
+    seed (int | np.random.Generator | None): Semilla para los estados iniciales.
+    """
+
+    def __init__(self, simplices, rule='life', params=None, states=None, density=0.3, seed=None):
+        self.adjacency = face_adjacency(simplices)
+        self.num_cells = self.adjacency.shape[0]
+        self.rule = RULES[rule] if isinstance(rule, str) else rule
+        self.params = dict(params or {})
+        self.frame = 0
+        self.degree = np.asarray(self.adjacency.sum(axis=1)).ravel().astype(np.int64)
+        if states is None:
+            rng = np.random.default_rng(seed)
+            on = rng.random(self.num_cells) < density
+            states = np.where(on, rng.integers(LEFT, RIGHT + 1, self.num_cells), OFF)
+        self.packed = pack_states(states)
+
+    @property
+    def states(self):
+        """Estados actuales desempaquetados, forma (N,)."""
+        return unpack_states(self.packed, self.num_cells)
+
+    def neighbor_counts(self, states):
+        """Número de vecinas por cara en cada estado, forma (N, 3) indexada por OFF/LEFT/RIGHT."""
+        indicators = np.column_stack([states == LEFT, states == RIGHT]).astype(np.int32)
+        on_counts = self.adjacency @ indicators
+        counts = np.empty((self.num_cells, 3), dtype=np.int64)
+        counts[:, LEFT] = on_counts[:, 0]
+        counts[:, RIGHT] = on_counts[:, 1]
+        counts[:, OFF] = self.degree - on_counts[:, 0] - on_counts[:, 1]
+        return counts
+
+    def step(self, num_frames=1):
+        """Avanza `num_frames` fotogramas y devuelve los estados finales desempaquetados."""
+        states = self.states
+        for _ in range(num_frames):
+            states = self.rule(states, self.neighbor_counts(states), **self.params)
+            self.frame += 1
+        self.packed = pack_states(states)
+        return states
+
+    def census(self):
+        """Número de celdas en cada estado (OFF, LEFT, RIGHT)."""
+        return np.bincount(self.states, minlength=3)
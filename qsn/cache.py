@@ -0,0 +1,200 @@
+"""Caché en disco direccionada por contenido de los artefactos de geometría (puntos, tetraedros, adyacencia)."""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+# Cambiar al modificar el formato de las entradas: invalida todas las claves anteriores
+CACHE_VERSION = 1
+_META = 'meta.json'
+
+def _canonical(value):
+    """Convierte parámetros en una estructura JSON estable; los arrays se sustituyen por su hash."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        digest = hashlib.sha256(array.tobytes()).hexdigest()
+        return {'__array__': [array.dtype.str, list(array.shape), digest]}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def cache_key(stage, params=None, seed=None):
+    """Hash SHA-256 de (versión, etapa, parámetros, semilla)."""
+    payload = json.dumps([CACHE_VERSION, stage, _canonical(params or {}), _canonical(seed)], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def default_cache_dir():
+    """Directorio de la caché: $QSN_CACHE_DIR o ~/.cache/qsn."""
+    return os.environ.get('QSN_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'qsn')
+
+class ArtifactCache:
+    """
+    Caché de artefactos por etapa, con una entrada por hash de (etapa, parámetros, semilla).
+
+    Cada entrada es un directorio con un .npy por array (más data/indices/indptr para las
+    matrices dispersas) que se cargan con mmap_mode, de modo que un arranque en caliente no lee
+    el parche completo. Las escrituras son atómicas (directorio temporal + rename) y, cuando el
+    tamaño total supera `max_bytes`, se expulsan las entradas usadas hace más tiempo.
+
+    Parámetros:
+    directory (str | None): Directorio de la caché. Por defecto, `default_cache_dir()`.
+    max_bytes (int): Tamaño máximo total. Por defecto es 2 GiB.
+    mmap_mode (str | None): Modo de np.load. Por defecto 'r' (sólo lectura, mapeado en memoria).
+    """
+
+    def __init__(self, directory=None, max_bytes=2**31, mmap_mode='r'):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.mmap_mode = mmap_mode
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, stage, params=None, seed=None):
+        """
+        Busca una entrada.
+
+        Retorna:
+        dict | None: Arrays (mapeados en memoria) y matrices dispersas por nombre, o None si no está.
+        """
+        path = self._path(cache_key(stage, params, seed))
+        try:
+            with open(os.path.join(path, _META)) as f:
+                meta = json.load(f)
+            arrays = {}
+            for name, spec in meta['arrays'].items():
+                if spec.get('sparse'):
+                    from scipy.sparse import csr_matrix
+
+                    parts = [np.load(os.path.join(path, f"{name}.{part}.npy"), mmap_mode=self.mmap_mode)
+                             for part in ('data', 'indices', 'indptr')]
+                    arrays[name] = csr_matrix(tuple(parts), shape=tuple(spec['shape']))
+                else:
+                    arrays[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode=self.mmap_mode)
+        except (OSError, ValueError, KeyError):
+            return None
+        # La fecha de modificación de meta.json marca el último uso para la expulsión LRU
+        os.utime(os.path.join(path, _META))
+        return arrays
+
+    def put(self, stage, params=None, seed=None, **arrays):
+        """
+        Guarda los arrays de una entrada (reemplaza la existente) y aplica la expulsión LRU a las
+        demás: la entrada recién escrita no se expulsa aunque por sí sola supere `max_bytes`.
+
+        Parámetros:
+        stage (str): Nombre de la etapa ('patch', 'tetrahedra', ...).
+        params (dict | None): Parámetros de la etapa. Pueden incluir arrays.
+        seed (int | None): Semilla de la etapa.
+        **arrays: Arrays o matrices dispersas a guardar, por nombre.
+        """
+        from scipy.sparse import issparse
+
+        key = cache_key(stage, params, seed)
+        tmp = tempfile.mkdtemp(prefix=f".{key}.", dir=self.directory)
+        meta = {'stage': stage, 'params': _canonical(params or {}), 'seed': _canonical(seed), 'arrays': {}}
+        for name, value in arrays.items():
+            if issparse(value):
+                value = value.tocsr()
+                for part in ('data', 'indices', 'indptr'):
+                    np.save(os.path.join(tmp, f"{name}.{part}.npy"), getattr(value, part))
+                meta['arrays'][name] = {'sparse': True, 'shape': list(value.shape)}
+            else:
+                np.save(os.path.join(tmp, f"{name}.npy"), np.asarray(value))
+                meta['arrays'][name] = {}
+        with open(os.path.join(tmp, _META), 'w') as f:
+            json.dump(meta, f)
+        path = self._path(key)
+        shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            # Otro proceso ha escrito la misma entrada a la vez: su contenido es equivalente
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict(keep=key)
+
+    def cached(self, stage, params, seed, compute):
+        """
+        Devuelve la entrada si existe; si no, la calcula con `compute()` (que devuelve un dict de
+        arrays), la guarda y la devuelve leída de la caché. Si no se puede releer (otro proceso la
+        ha expulsado o el disco falla), devuelve los arrays calculados.
+        """
+        arrays = self.get(stage, params, seed)
+        if arrays is None:
+            computed = compute()
+            try:
+                self.put(stage, params, seed, **computed)
+            except OSError:
+                return computed
+            arrays = self.get(stage, params, seed)
+            if arrays is None:
+                return computed
+        return arrays
+
+    def entries(self):
+        """Lista de (clave, etapa, bytes, último uso) de las entradas completas."""
+        result = []
+        for key in os.listdir(self.directory):
+            path = self._path(key)
+            try:
+                with open(os.path.join(path, _META)) as f:
+                    stage = json.load(f)['stage']
+                last_used = os.path.getmtime(os.path.join(path, _META))
+                size = sum(entry.stat().st_size for entry in os.scandir(path))
+            except (OSError, ValueError, KeyError):
+                continue
+            result.append((key, stage, size, last_used))
+        return result
+
+    def size(self):
+        """Tamaño total de las entradas en bytes."""
+        return sum(size for _, _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None, keep=None):
+        """
+        Expulsa las entradas usadas hace más tiempo hasta que el total no supere `max_bytes`.
+
+        Parámetros:
+        max_bytes (int | None): Tamaño máximo total. Por defecto, `self.max_bytes`.
+        keep (str | None): Clave que no se expulsa nunca (la entrada que se acaba de escribir).
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.entries(), key=lambda entry: entry[3])
+        total = sum(size for _, _, size, _ in entries)
+        for key, _, size, _ in entries:
+            if total <= max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._path(key), ignore_errors=True)
+            total -= size
+
+    def invalidate(self, stage=None, params=None, seed=None):
+        """
+        Elimina entradas de la caché.
+
+        Sin argumentos elimina todas; con `stage` sólo las de esa etapa, y con `params` (y
+        `seed`) sólo la entrada de esa clave.
+
+        Retorna:
+        int: Número de entradas eliminadas.
+        """
+        if stage is not None and params is not None:
+            path = self._path(cache_key(stage, params, seed))
+            removed = os.path.isdir(path)
+            shutil.rmtree(path, ignore_errors=True)
+            return int(removed)
+        removed = 0
+        for key, entry_stage, _, _ in self.entries():
+            if stage is None or entry_stage == stage:
+                shutil.rmtree(self._path(key), ignore_errors=True)
+                removed += 1
+        return removed
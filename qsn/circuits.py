@@ -0,0 +1,46 @@
+"""Circuitos cuánticos de la QSN. qiskit se importa sólo al construir un circuito."""
+from qsn.instrument import CIRCUIT_BUILD, CIRCUIT_RUN, instrumented
+
+
+@instrumented(CIRCUIT_BUILD, items=lambda qc: qc.num_qubits)
+def create_ising_circuit(num_qubits, interactions, theta=0.5):
+    """Crea un circuito cuántico para un modelo de Ising simplificado (theta: ángulo RZZ, admite un Parameter)."""
+    from qiskit import QuantumCircuit
+
+    qc = QuantumCircuit(num_qubits)
+    # Estado inicial: superposición
+    for i in range(num_qubits):
+        qc.h(i)
+    # Interacciones tipo Ising (ZZ)
+    for i, j in interactions:
+        qc.rzz(theta, i, j)  # Puerta RZZ para interacción
+    # Medición
+    qc.measure_all()
+    return qc
+
+@instrumented(CIRCUIT_BUILD, items=lambda qc: qc.num_qubits)
+def create_correlation_circuit(num_qubits, interactions, theta=0.5):
+    """Crea un circuito cuántico con correlaciones entrelazadas (theta: ángulo RZZ, admite un Parameter)."""
+    from qiskit import QuantumCircuit
+
+    qc = QuantumCircuit(num_qubits)
+    for i in range(num_qubits):
+        qc.h(i)  # Superposición
+    for i, j in interactions:
+        qc.rzz(theta, i, j)  # Correlaciones Ising
+        qc.cx(i, j)  # Entrelazamiento
+    qc.measure_all()
+    return qc
+
+def ring_interactions(num_qubits):
+    """Interacciones entre vecinos de un anillo de `num_qubits` qubits."""
+    return [(i, (i+1)%num_qubits) for i in range(num_qubits)]
+
+@instrumented(CIRCUIT_RUN, items=lambda counts: sum(counts.values()))
+def simulate_counts(qc, shots=1000, seed=None):
+    """Simula un circuito con AerSimulator y devuelve sus cuentas."""
+    from qiskit_aer import AerSimulator
+
+    simulator = AerSimulator()
+    job = simulator.run(qc, shots=shots, seed_simulator=seed)
+    return job.result().get_counts()
@@ -0,0 +1,191 @@
+"""Motor de corte y proyección (cut-and-project) E8 -> 4D -> 3D que entrega los puntos por bloques."""
+import numpy as np
+
+PHI = (1 + np.sqrt(5)) / 2  # Proporción áurea
+PHI_CONJUGATE = 1 - PHI  # Conjugado de Galois de phi (sqrt(5) -> -sqrt(5))
+
+# Proyección de Elser-Sloane: E8 es isométrico al anillo de los icosianos con la forma
+# N(a + b*sqrt(5)) = a - b, y cada icosiano x se reparte en espacio físico (x) y
+# perpendicular (x^sigma). En coordenadas estándar v de E8:
+#     x_par  = v (A + phi B) / 4,    x_perp = v (A + phi' B) / 4
+# Las 240 raíces caen sobre dos 600-celdas de radios 1 y phi en el espacio físico.
+ELSER_SLOANE_A = np.array([
+    [1, 0, -2, -1],
+    [-1, 2, 0, 1],
+    [-1, -2, 0, 1],
+    [-1, 0, 0, -1],
+    [-1, 0, 0, -1],
+    [-1, 0, 0, -1],
+    [-1, 0, -2, 1],
+    [1, 0, 0, 1]
+])
+ELSER_SLOANE_B = np.array([
+    [1, 0, 1, 0],
+    [1, 0, 1, 0],
+    [1, 0, 1, 0],
+    [-1, -2, 1, 0],
+    [-1, 2, 1, 0],
+    [1, 0, -1, 2],
+    [-1, 0, -1, 0],
+    [-1, 0, 1, 2]
+])
+ELSER_SLOANE_DENOMINATOR = 4
+
+PARALLEL_PROJECTION = (ELSER_SLOANE_A + PHI * ELSER_SLOANE_B) / ELSER_SLOANE_DENOMINATOR
+PERPENDICULAR_PROJECTION = (ELSER_SLOANE_A + PHI_CONJUGATE * ELSER_SLOANE_B) / ELSER_SLOANE_DENOMINATOR
+for _matrix in (PARALLEL_PROJECTION, PERPENDICULAR_PROJECTION):
+    _matrix.setflags(write=False)
+
+# Raíces simples de E8 (etiquetado de Bourbaki) en coordenadas dobladas (2v)
+E8_SIMPLE_ROOTS_DOUBLED = np.array([
+    [1, -1, -1, -1, -1, -1, -1, 1],
+    [2, 2, 0, 0, 0, 0, 0, 0],
+    [-2, 2, 0, 0, 0, 0, 0, 0],
+    [0, -2, 2, 0, 0, 0, 0, 0],
+    [0, 0, -2, 2, 0, 0, 0, 0],
+    [0, 0, 0, -2, 2, 0, 0, 0],
+    [0, 0, 0, 0, -2, 2, 0, 0],
+    [0, 0, 0, 0, 0, -2, 2, 0]
+], dtype=np.int64)
+
+def project_parallel(vectors):
+    """Proyecta vectores de E8 (coordenadas estándar) al espacio físico 4D de Elser-Sloane."""
+    return np.asarray(vectors) @ PARALLEL_PROJECTION
+
+def project_perpendicular(vectors):
+    """Proyecta vectores de E8 (coordenadas estándar) al espacio perpendicular 4D."""
+    return np.asarray(vectors) @ PERPENDICULAR_PROJECTION
+
+def _children(counts, lo, start, stop):
+    """Devuelve (fila padre, valor) de los hijos con índice global en [start, stop)."""
+    ends = np.cumsum(counts)
+    index = np.arange(start, stop)
+    parent = np.searchsorted(ends, index, side='right')
+    return parent, lo[parent] + index - (ends[parent] - counts[parent])
+
+def _enumerate(level, fixed, acc, partial, r, t, bound, chunk_size):
+    """Enumeración de Fincke-Pohst por niveles, procesando a lo sumo `chunk_size` ramas a la vez."""
+    if level < 0:
+        yield fixed
+        return
+    diagonal = r[level, level]
+    center = t[level] - acc[:, level] / diagonal
+    width = np.sqrt(np.maximum(bound - partial, 0)) / abs(diagonal)
+    lo = np.ceil(center - width).astype(np.int64)
+    counts = np.maximum(np.floor(center + width).astype(np.int64) - lo + 1, 0)
+    total = int(counts.sum())
+    for start in range(0, total, chunk_size):
+        parent, values = _children(counts, lo, start, min(start + chunk_size, total))
+        delta = values - t[level]
+        child_fixed = fixed[parent]
+        child_fixed[:, level] = values
+        child_acc = acc[parent] + delta[:, None] * r[:, level]
+        term = child_acc[:, level]
+        yield from _enumerate(level - 1, child_fixed, child_acc, partial[parent] + term ** 2,
+                              r, t, bound, chunk_size)
+
+def cut_and_project(radius, window_radius=1.0, window_center=None, dims=3, slab_half_width=0.5,
+                    slab_center=0.0, chunk_size=2**14, return_lattice=False, center=None, unique=True):
+    """
+    Genera un parche del cuasicristal de Elser-Sloane por corte y proyección de E8.
+
+    Se enumeran los puntos de E8 cuya proyección física cae en la región pedida y cuya
+    proyección perpendicular cae dentro de una ventana esférica de aceptación. La enumeración
+    (Fincke-Pohst sobre un elipsoide que contiene la región) avanza por bloques, así que la
+    memoria se mantiene constante aunque el parche tenga millones de puntos.
+
+    Parámetros:
+    radius (float): Radio del parche en el espacio físico.
+    window_radius (float): Radio de la ventana de aceptación en el espacio perpendicular.
+    window_center (array | None): Centro 4D de la ventana (desplazamiento de fasón).
+    dims (int): 4 para el cuasicristal 4D, 3 para la sección 3D (puntos con |x0 - slab_center|
+        <= slab_half_width, proyectados sobre las componentes imaginarias x1, x2, x3).
+    slab_half_width (float): Semiancho de la sección 3D. Sólo se usa con dims=3.
+    slab_center (float): Posición de la sección 3D sobre el eje x0. Sólo se usa con dims=3.
+    chunk_size (int): Número aproximado de candidatos procesados por bloque.
+    return_lattice (bool): Si es True, entrega también las coordenadas dobladas (2v) en E8.
+    center (array | None): Centro del parche en el espacio físico: 4 componentes con dims=4, o
+        las 3 componentes x1, x2, x3 con dims=3. Por defecto, el origen.
+    unique (bool): Sólo con dims=3. La sección descarta x0, así que puntos distintos de E8 (que
+        difieren en x0 y en el espacio perpendicular) pueden caer en el mismo punto 3D; con True
+        (por defecto) se entrega sólo el de menor x0 de cada posición. Cada punto se descarta si
+        otro punto aceptado está a una de las pocas diferencias de E8 que sólo cambian x0 y el
+        espacio perpendicular, así que no se guardan los puntos ya entregados y la memoria sigue
+        siendo constante. Con False se entregan todos, p. ej. para aplicar después otra ventana.
+
+    Retorna:
+    generator: Bloques np.ndarray (K, dims) de puntos aceptados, o tuplas (puntos, retícula).
+    """
+    if dims not in (3, 4):
+        raise ValueError(f"dims debe ser 3 o 4: {dims}")
+    window_center = np.zeros(4) if window_center is None else np.asarray(window_center, dtype=float)
+    center = np.zeros(dims) if center is None else np.asarray(center, dtype=float).reshape(dims)
+
+    # Cada restricción normalizada vale <= 1, así que la región está dentro de |s|^2 <= k
+    if dims == 4:
+        scale = np.array([radius] * 4 + [window_radius] * 4, dtype=float)
+        origin = np.concatenate([center, window_center])
+        bound = 2.0
+    else:
+        scale = np.array([slab_half_width] + [radius] * 3 + [window_radius] * 4, dtype=float)
+        origin = np.concatenate([[slab_center], center, window_center])
+        bound = 3.0
+
+    # n en Z^8 -> s = (n L - origin) / scale, con L la base de E8 proyectada
+    basis = E8_SIMPLE_ROOTS_DOUBLED / 2.0
+    h = np.hstack([basis @ PARALLEL_PROJECTION, basis @ PERPENDICULAR_PROJECTION]) / scale
+    t = np.linalg.solve(h.T, origin / scale)
+    r = np.linalg.qr(h.T, mode='r')
+
+    def accept(lattice):
+        parallel = project_parallel(lattice / 2.0)
+        perpendicular = project_perpendicular(lattice / 2.0)
+        accepted = np.sum((perpendicular - window_center) ** 2, axis=1) <= window_radius ** 2
+        if dims == 4:
+            accepted &= np.sum((parallel - center) ** 2, axis=1) <= radius ** 2
+            return accepted, parallel
+        accepted &= np.abs(parallel[:, 0] - slab_center) <= slab_half_width
+        accepted &= np.sum((parallel[:, 1:] - center) ** 2, axis=1) <= radius ** 2
+        return accepted, parallel[:, 1:]
+
+    shifts = _section_shifts(slab_half_width, window_radius) if dims == 3 and unique else ()
+    pending, pending_size = [], 0
+    leaves = _enumerate(7, np.zeros((1, 8), dtype=np.int64), np.zeros((1, 8)), np.zeros(1),
+                        r, t, bound + 1e-9, chunk_size)
+    for coefficients in leaves:
+        lattice = coefficients @ E8_SIMPLE_ROOTS_DOUBLED
+        accepted, points = accept(lattice)
+        if not accepted.any():
+            continue
+        points, lattice = points[accepted], lattice[accepted]
+        # La misma prueba de aceptación sobre el vecino decide, sin recordar nada, qué punto de
+        # cada posición 3D se entrega: el de menor x0
+        for shift in shifts:
+            kept = ~accept(lattice + shift)[0]
+            points, lattice = points[kept], lattice[kept]
+        pending.append((points, lattice))
+        pending_size += len(points)
+        if pending_size >= chunk_size:
+            yield _flush(pending, return_lattice)
+            pending, pending_size = [], 0
+    if pending:
+        yield _flush(pending, return_lattice)
+
+def _section_shifts(slab_half_width, window_radius):
+    """
+    Diferencias de E8 (coordenadas dobladas) entre puntos de la sección 3D que caen en el mismo
+    punto: las que sólo tienen x0 en el espacio físico, con x0 < 0 y dentro del doble de la
+    sección y de la ventana.
+    """
+    shifts = np.concatenate([lattice for _, lattice in cut_and_project(
+        2 * slab_half_width + 1e-9, 2 * window_radius + 1e-9, dims=4, return_lattice=True)])
+    # x1, x2, x3 son nulos si lo son sus dos partes enteras en Z[phi]
+    flat = np.all(shifts @ ELSER_SLOANE_A[:, 1:] == 0, axis=1) & np.all(shifts @ ELSER_SLOANE_B[:, 1:] == 0, axis=1)
+    shifts = shifts[flat]
+    return shifts[project_parallel(shifts / 2.0)[:, 0] < 0]
+
+def _flush(pending, return_lattice):
+    points = np.concatenate([p for p, _ in pending])
+    if not return_lattice:
+        return points
+    return points, np.concatenate([l for _, l in pending])
@@ -0,0 +1,76 @@
+"""Sistema de raíces y vectores de la retícula E8, generados una sola vez y compartidos."""
+from functools import lru_cache
+
+import numpy as np
+
+def _read_only(array):
+    array.setflags(write=False)
+    return array
+
+@lru_cache(maxsize=None)
+def e8_shell_doubled(shell):
+    """
+    Genera los vectores de E8 con norma al cuadrado 2*shell en coordenadas dobladas (2x).
+
+    En coordenadas dobladas la retícula E8 son los vectores enteros y con todas las
+    componentes pares o todas impares y suma múltiplo de 4, lo que permite enumerarlos
+    con aritmética entera exacta.
+
+    Parámetros:
+    shell (int): Índice de la capa; 0 es el origen y 1 son las 240 raíces.
+
+    Retorna:
+    np.ndarray: Arreglo de sólo lectura (K, 8) de enteros.
+    """
+    if shell < 0:
+        raise ValueError(f"La capa debe ser no negativa: {shell}")
+    target = 8 * shell  # |2x|^2 = 4 * 2 * shell
+    limit = int(np.sqrt(target))
+    shells = []
+    for parity in (0, 1):
+        values = np.arange(-limit, limit + 1)
+        values = values[values % 2 == parity]
+        partial = np.zeros((1, 0), dtype=np.int64)
+        norms = np.zeros(1, dtype=np.int64)
+        # Se extiende coordenada a coordenada, podando con la norma mínima de las restantes
+        for dim in range(7):
+            remaining = 7 - dim
+            new_norms = norms[:, None] + values[None, :] ** 2
+            keep = new_norms + remaining * parity <= target
+            rows, cols = np.nonzero(keep)
+            partial = np.column_stack([partial[rows], values[cols]])
+            norms = new_norms[rows, cols]
+        # La última coordenada queda determinada salvo signo por la norma restante
+        rest = target - norms
+        last = np.rint(np.sqrt(rest)).astype(np.int64)
+        valid = (last ** 2 == rest) & (last % 2 == parity)
+        for sign in (1, -1) if shell else (1,):
+            candidates = np.column_stack([partial[valid], sign * last[valid]])
+            if sign == -1:
+                candidates = candidates[candidates[:, 7] != 0]
+            shells.append(candidates[candidates.sum(axis=1) % 4 == 0])
+    vectors = np.concatenate(shells)
+    vectors = vectors[np.lexsort(vectors.T[::-1])[::-1]]
+    return _read_only(vectors.astype(np.int8 if limit < 128 else np.int64))
+
+@lru_cache(maxsize=None)
+def e8_shell(shell):
+    """Devuelve los vectores de E8 con norma al cuadrado 2*shell como arreglo de sólo lectura."""
+    return _read_only(e8_shell_doubled(shell) / 2.0)
+
+def e8_roots():
+    """Devuelve las 240 raíces de E8 (vértices del politopo de Gosset) como arreglo de sólo lectura."""
+    return e8_shell(1)
+
+@lru_cache(maxsize=None)
+def e8_lattice_points(max_shell):
+    """
+    Devuelve todos los vectores de E8 con norma al cuadrado <= 2*max_shell, ordenados por capa.
+
+    Parámetros:
+    max_shell (int): Última capa incluida.
+
+    Retorna:
+    np.ndarray: Arreglo de sólo lectura (K, 8), empezando por el origen.
+    """
+    return _read_only(np.concatenate([e8_shell(k) for k in range(max_shell + 1)]))
@@ -0,0 +1,140 @@
+"""Ejecución de conjuntos (semillas x parámetros) en un pool de procesos con agregación en streaming."""
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+import itertools
+import os
+
+import numpy as np
+
+def parameter_grid(**values):
+    """Producto cartesiano de listas de valores: parameter_grid(a=[1, 2], b=[0.5]) -> [{'a': 1, 'b': 0.5}, ...]."""
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*values.values())]
+
+def task_seed(entropy, index):
+    """SeedSequence de la tarea `index`: la misma que `SeedSequence(entropy).spawn(...)[index]`."""
+    return np.random.SeedSequence(entropy, spawn_key=(index,))
+
+def _merge(a, b):
+    """Une dos agregados (n, media, M2, mínimo, máximo, histograma) con la fórmula de Chan."""
+    if a is None:
+        return b
+    n = a[0] + b[0]
+    delta = b[1] - a[1]
+    mean = a[1] + delta * b[0] / n
+    m2 = a[2] + b[2] + delta ** 2 * a[0] * b[0] / n
+    histogram = None if a[5] is None else a[5] + b[5]
+    return n, mean, m2, np.minimum(a[3], b[3]), np.maximum(a[4], b[4]), histogram
+
+def _run_batch(task, params, entropy, indices, bins):
+    """Ejecuta un lote de semillas para un conjunto de parámetros y devuelve sus agregados por métrica."""
+    results = [task(params, np.random.default_rng(task_seed(entropy, index))) for index in indices]
+    stats = {}
+    for name in results[0]:
+        values = np.asarray([result[name] for result in results], dtype=float)
+        mean = values.mean(axis=0)
+        histogram = None
+        if name in bins:
+            edges = np.asarray(bins[name], dtype=float)
+            # Cubetas [por debajo, ..., por encima] para no perder muestras fuera del rango
+            positions = np.searchsorted(edges, values.ravel(), side='right')
+            positions[values.ravel() == edges[-1]] = len(edges) - 1
+            histogram = np.bincount(positions, minlength=len(edges) + 1)
+        stats[name] = (len(values), mean, np.sum((values - mean) ** 2, axis=0),
+                       values.min(axis=0), values.max(axis=0), histogram)
+    return stats
+
+def run_ensemble(task, params, num_seeds, seed=None, bins=None, max_workers=None, batch_size=64):
+    """
+    Ejecuta `task(params, rng)` para cada conjunto de parámetros y `num_seeds` semillas.
+
+    Cada tarea recibe un generador propio derivado con SeedSequence (índice = fila * num_seeds +
+    repetición), así que el resultado no depende del número de procesos ni del orden de
+    ejecución. Los lotes se reparten en un pool de procesos y cada uno devuelve sólo sus
+    agregados (media, M2 de Welford, mínimo, máximo, histograma), que se combinan en streaming:
+    la memoria no crece con el número de realizaciones.
+
+    Parámetros:
+    task (callable): Función de nivel de módulo f(params, rng) -> dict de métricas (escalares o
+        arrays de forma fija).
+    params (list | dict): Lista de diccionarios de parámetros, o un dict de listas que se expande
+        con `parameter_grid`.
+    num_seeds (int): Realizaciones por conjunto de parámetros.
+    seed (int | None): Entropía base del conjunto. None elige una aleatoria.
+    bins (dict | None): Bordes del histograma de cada métrica escalar {nombre: bordes}.
+    max_workers (int | None): Procesos del pool. 1 ejecuta todo en el proceso actual.
+    batch_size (int): Realizaciones por lote enviado a un proceso.
+
+    Retorna:
+    np.ndarray: Tabla estructurada con una fila por conjunto de parámetros y columnas para cada
+        parámetro, 'count' y, por métrica m, 'm_mean', 'm_var' (varianza muestral), 'm_min',
+        'm_max' y, si tiene bordes en `bins`, 'm_hist' (len(bordes) + 1 cubetas, la primera y la
+        última para los valores fuera de rango).
+
+    Lanza:
+    ValueError: Si num_seeds es menor que 1.
+    """
+    if num_seeds < 1:
+        raise ValueError(f"Se necesita al menos una semilla por conjunto de parámetros: {num_seeds}")
+    if isinstance(params, dict):
+        params = parameter_grid(**params)
+    bins = bins or {}
+    entropy = np.random.SeedSequence(seed).entropy
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers) if max_workers > 1 else None
+
+    jobs = ((row, range(row * num_seeds + start, row * num_seeds + min(start + batch_size, num_seeds)))
+            for row in range(len(params)) for start in range(0, num_seeds, batch_size))
+    totals = [dict() for _ in params]
+    pending = {}
+    try:
+        for row, indices in jobs:
+            if executor is None:
+                stats = _run_batch(task, params[row], entropy, indices, bins)
+                totals[row] = {name: _merge(totals[row].get(name), s) for name, s in stats.items()}
+                continue
+            pending[executor.submit(_run_batch, task, params[row], entropy, indices, bins)] = row
+            # Como mucho dos lotes en vuelo por proceso: la memoria queda acotada
+            if len(pending) >= 2 * max_workers:
+                _collect(pending, totals, wait_all=False)
+        if pending:
+            _collect(pending, totals, wait_all=True)
+    finally:
+        if executor:
+            executor.shutdown()
+    return _table(params, totals)
+
+def _collect(pending, totals, wait_all):
+    """Combina los agregados de los lotes terminados (al menos uno, o todos si wait_all)."""
+    done, _ = wait(list(pending), return_when=ALL_COMPLETED if wait_all else FIRST_COMPLETED)
+    for future in done:
+        row = pending.pop(future)
+        for name, stats in future.result().items():
+            totals[row][name] = _merge(totals[row].get(name), stats)
+
+def _table(params, totals):
+    """Construye la tabla estructurada a partir de los agregados de cada fila."""
+    names = list(params[0]) if params else []
+    metrics = list(totals[0]) if totals else []
+    columns = {name: np.asarray([p[name] for p in params]) for name in names}
+    fields = [(name, column.dtype, column.shape[1:]) for name, column in columns.items()]
+    fields.append(('count', np.int64))
+    for metric in metrics:
+        _, mean, _, _, _, histogram = totals[0][metric]
+        shape = np.shape(mean)
+        fields += [(f"{metric}_{stat}", float, shape) for stat in ('mean', 'var', 'min', 'max')]
+        if histogram is not None:
+            fields.append((f"{metric}_hist", np.int64, histogram.shape))
+    table = np.zeros(len(params), dtype=fields)
+    for row, (p, total) in enumerate(zip(params, totals)):
+        for name in names:
+            table[name][row] = columns[name][row]
+        for metric, (n, mean, m2, lo, hi, histogram) in total.items():
+            table['count'][row] = n
+            table[f"{metric}_mean"][row] = mean
+            table[f"{metric}_var"][row] = m2 / (n - 1) if n > 1 else np.nan
+            table[f"{metric}_min"][row] = lo
+            table[f"{metric}_max"][row] = hi
+            if histogram is not None:
+                table[f"{metric}_hist"][row] = histogram
+    return table
@@ -0,0 +1,242 @@
+"""
+Coordenadas exactas de la QSN: E8 en coordenadas dobladas (enteros) y puntos proyectados en Z[phi].
+
+La proyección de Elser-Sloane de un vector doblado d = 2v es x = (a + phi b) / 8 en el espacio
+físico y x^sigma = (a + phi' b) / 8 en el perpendicular, con a = d A y b = d B enteros. El par
+(a, b) identifica el punto sin redondeos, así que deduplicar, comprobar pertenencia y unir
+bloques solapados se reduce a buscar filas de enteros en una tabla hash.
+"""
+import numpy as np
+
+from qsn.cut_project import ELSER_SLOANE_A, ELSER_SLOANE_B, ELSER_SLOANE_DENOMINATOR, PHI, PHI_CONJUGATE
+
+# Denominador común de las coordenadas Z[phi] proyectadas desde coordenadas dobladas
+ZPHI_DENOMINATOR = 2 * ELSER_SLOANE_DENOMINATOR
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX = np.uint64(0xBF58476D1CE4E5B9)
+
+def is_e8_doubled(doubled):
+    """
+    Comprueba qué filas son vectores de E8 en coordenadas dobladas: enteros todos pares o todos
+    impares y con suma múltiplo de 4.
+
+    Retorna:
+    np.ndarray: Máscara booleana (N,).
+    """
+    doubled = np.asarray(doubled).reshape(-1, 8)
+    parity = doubled % 2
+    return (parity == parity[:, :1]).all(axis=1) & (doubled.sum(axis=1) % 4 == 0)
+
+def to_doubled(vectors):
+    """
+    Convierte vectores de E8 en coma flotante (coordenadas estándar) a coordenadas dobladas.
+
+    Parámetros:
+    vectors (array): Vectores (N, 8).
+
+    Retorna:
+    np.ndarray: Enteros (N, 8) int64.
+
+    Lanza:
+    ValueError: Si algún vector no está en E8.
+    """
+    vectors = np.asarray(vectors, dtype=float).reshape(-1, 8)
+    doubled = np.rint(2 * vectors).astype(np.int64)
+    valid = np.all(np.abs(doubled - 2 * vectors) < 1e-6, axis=1) & is_e8_doubled(doubled)
+    if not valid.all():
+        raise ValueError(f"{np.count_nonzero(~valid)} vectores no pertenecen a E8")
+    return doubled
+
+def zphi_project(doubled):
+    """
+    Proyección exacta de Elser-Sloane de vectores doblados.
+
+    Retorna:
+    np.ndarray: Enteros (N, 4, 2): [..., 0] = a, [..., 1] = b, con x = (a + phi b) / ZPHI_DENOMINATOR
+        en el espacio físico y (a + phi' b) / ZPHI_DENOMINATOR en el perpendicular.
+    """
+    doubled = np.asarray(doubled, dtype=np.int64).reshape(-1, 8)
+    return np.stack([doubled @ ELSER_SLOANE_A, doubled @ ELSER_SLOANE_B], axis=-1)
+
+def zphi_scale(coords, power=1):
+    """
+    Multiplica coordenadas Z[phi] por phi**power de forma exacta.
+
+    phi (a + phi b) = b + phi (a + b) y phi^-1 (a + phi b) = (b - a) + phi a, porque phi^2 = phi + 1.
+    """
+    a, b = coords[..., 0], coords[..., 1]
+    for _ in range(abs(power)):
+        a, b = (b, a + b) if power > 0 else (b - a, a)
+    return np.stack([a, b], axis=-1)
+
+def zphi_to_float(coords, conjugate=False):
+    """Valor en coma flotante de coordenadas Z[phi] (con phi' en lugar de phi si conjugate=True)."""
+    golden = PHI_CONJUGATE if conjugate else PHI
+    return (coords[..., 0] + golden * coords[..., 1]) / ZPHI_DENOMINATOR
+
+def hash_rows(keys):
+    """Hash de 64 bits de cada fila de enteros (mezcla multiplicativa por columna)."""
+    h = np.zeros(len(keys), dtype=np.uint64)
+    for column in keys.T:
+        h = (h ^ column.astype(np.uint64)) * _GOLDEN
+        h ^= h >> np.uint64(29)
+    h *= _MIX
+    return h ^ (h >> np.uint64(32))
+
+class ExactPointIndex:
+    """
+    Tabla hash de direccionamiento abierto (sondeo lineal) sobre filas de enteros, vectorizada.
+
+    Cada fila distinta recibe un identificador consecutivo en orden de primera aparición. Las
+    operaciones procesan lotes completos con NumPy y cuestan O(1) amortizado por punto: sirven
+    para deduplicar un parche, comprobar si un punto ya pertenece a él y unir bloques solapados
+    (los de `cut_and_project` con return_lattice=True, o parches por teselas) sin tolerancias.
+
+    Parámetros:
+    width (int): Número de enteros por clave (8 para coordenadas dobladas de E8, 2·D para un
+        punto de D dimensiones en Z[phi]).
+    capacity (int): Número inicial de claves previsto.
+    """
+
+    def __init__(self, width, capacity=1024):
+        self.width = width
+        self._keys = np.empty((max(capacity, 1), width), dtype=np.int64)
+        self._size = 0
+        self._table = np.full(1 << max(int(2 * capacity - 1).bit_length(), 4), -1, dtype=np.int64)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def keys(self):
+        """Claves indexadas (M, width), en orden de identificador."""
+        return self._keys[:self._size]
+
+    def _as_keys(self, keys):
+        return np.ascontiguousarray(keys, dtype=np.int64).reshape(-1, self.width)
+
+    def _start(self, keys):
+        # Hash de Fibonacci: los bits altos del hash indexan la tabla
+        shift = np.uint64(64 - (len(self._table).bit_length() - 1))
+        return (hash_rows(keys) >> shift).astype(np.int64)
+
+    def _reserve(self, extra):
+        """Garantiza espacio para `extra` claves nuevas con factor de carga <= 1/2."""
+        needed = self._size + extra
+        if needed > len(self._keys):
+            keys = np.empty((max(needed, 2 * len(self._keys)), self.width), dtype=np.int64)
+            keys[:self._size] = self.keys
+            self._keys = keys
+        if 2 * needed <= len(self._table):
+            return
+        size = len(self._table)
+        while 2 * needed > size:
+            size *= 2
+        self._table = np.full(size, -1, dtype=np.int64)
+        # Reinsertar las claves existentes (todas distintas): cada una busca la primera celda libre
+        ids = np.arange(self._size)
+        slot = self._start(self.keys)
+        mask = size - 1
+        while len(ids):
+            free = self._table[slot] < 0
+            winners = np.unique(slot[free], return_index=True)[1]
+            placed = np.flatnonzero(free)[winners]
+            self._table[slot[placed]] = ids[placed]
+            keep = np.ones(len(ids), dtype=bool)
+            keep[placed] = False
+            ids, slot = ids[keep], (slot[keep] + (~free[keep]).astype(np.int64)) & mask
+
+    def _probe(self, keys, insert):
+        """
+        Busca (e inserta si `insert`) cada clave.
+
+        Retorna:
+        tuple: (identificador de cada clave, -1 si falta; posiciones del lote que insertaron una
+            clave nueva, es decir, la primera aparición de cada clave nueva).
+        """
+        n = len(keys)
+        ids = np.full(n, -1, dtype=np.int64)
+        slot = self._start(keys)
+        mask = len(self._table) - 1
+        active = np.arange(n)
+        base = self._size
+        claimed = []
+        while len(active):
+            s = slot[active]
+            occupant = self._table[s]
+            free = occupant < 0
+            # Celdas ocupadas: comparar con la clave guardada (o con la reclamada en este lote)
+            busy = active[~free]
+            owner = occupant[~free]
+            reference = np.empty((len(busy), self.width), dtype=np.int64)
+            old = owner < base
+            reference[old] = self._keys[owner[old]]
+            reference[~old] = keys[owner[~old] - base]
+            same = (reference == keys[busy]).all(axis=1)
+            ids[busy[same]] = owner[same]
+            slot[busy[~same]] = (slot[busy[~same]] + 1) & mask
+            if not insert:
+                active = busy[~same]
+                continue
+            # Celdas libres: la clave de menor posición reclama la celda con un identificador
+            # provisional; las demás repiten en la misma celda y después se comparan con ella.
+            # Las copias de una clave recorren la misma secuencia de celdas, así que gana siempre
+            # su primera aparición
+            empty = active[free]
+            winners = empty[np.unique(s[free], return_index=True)[1]]
+            self._table[slot[winners]] = base + winners
+            ids[winners] = base + winners
+            claimed.append(winners)
+            active = active[ids[active] < 0]
+        if not insert:
+            return ids, None
+        # Identificadores definitivos consecutivos en orden de primera aparición
+        claimed = np.sort(np.concatenate(claimed)) if claimed else np.empty(0, dtype=np.int64)
+        final = np.empty(n, dtype=np.int64)
+        final[claimed] = base + np.arange(len(claimed))
+        fresh = ids >= base
+        ids[fresh] = final[ids[fresh] - base]
+        self._table[slot[claimed]] = ids[claimed]
+        self._keys[base:base + len(claimed)] = keys[claimed]
+        self._size += len(claimed)
+        return ids, claimed
+
+    def insert(self, keys):
+        """
+        Inserta un lote de claves, deduplicando también dentro del lote.
+
+        Retorna:
+        tuple: (identificador de cada clave (N,), máscara (N,) de las que eran nuevas y aparecen
+            aquí por primera vez).
+        """
+        keys = self._as_keys(keys)
+        self._reserve(len(keys))
+        ids, claimed = self._probe(keys, insert=True)
+        first = np.zeros(len(keys), dtype=bool)
+        first[claimed] = True
+        return ids, first
+
+    def lookup(self, keys):
+        """Identificador de cada clave, o -1 si no está indexada."""
+        keys = self._as_keys(keys)
+        if self._size == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        return self._probe(keys, insert=False)[0]
+
+    def contains(self, keys):
+        """Máscara (N,) de las claves que ya están indexadas."""
+        return self.lookup(keys) >= 0
+
+def deduplicate(keys):
+    """
+    Elimina filas repetidas de un arreglo de enteros conservando el orden de primera aparición.
+
+    Retorna:
+    tuple: (índices de las filas únicas (M,), índice de la fila única de cada fila original (N,)).
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    keys = keys.reshape(len(keys), -1)
+    index = ExactPointIndex(keys.shape[1], capacity=len(keys))
+    inverse, first = index.insert(keys)
+    return np.flatnonzero(first), inverse
@@ -0,0 +1,218 @@
+"""Almacén en disco, solo de añadido y mapeado en memoria, de fotogramas del autómata y métricas."""
+import hashlib
+import json
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from qsn.automaton import pack_states, unpack_states
+
+MAGIC = b'QSNFRAME'
+VERSION = 1
+ALIGNMENT = 64
+# Cabecera fija: magic, versión, longitud del JSON de metadatos
+_PREFIX = struct.Struct('<8sII')
+
+def geometry_hash(*arrays):
+    """Hash SHA-256 del contenido de la geometría (puntos, tetraedros, ...)."""
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype.str, array.shape)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+def _record_dtype(state_bytes, num_metrics):
+    """Registro [fotograma, métricas, estados empaquetados, CRC32] rellenado a múltiplo de 8 bytes."""
+    base = np.dtype([('frame', '<u8'), ('metrics', '<f8', (num_metrics,)), ('states', 'u1', (state_bytes,)),
+                     ('crc', '<u4')])
+    return np.dtype({'names': list(base.names), 'formats': [base.fields[n][0] for n in base.names],
+                     'offsets': [base.fields[n][1] for n in base.names], 'itemsize': -(-base.itemsize // 8) * 8})
+
+def _check_metadata(metadata, expect):
+    """Lanza ValueError si algún metadato esperado no coincide con el guardado."""
+    for key, value in (expect or {}).items():
+        if metadata.get(key) != value:
+            raise ValueError(f"El metadato {key!r} no coincide: {metadata.get(key)!r} != {value!r}")
+
+class FrameStore:
+    """
+    Archivo de fotogramas de tamaño fijo con cabecera de metadatos.
+
+    Estructura: cabecera (magic, versión, JSON con num_cells, métricas, hash de la geometría,
+    semilla y parámetros de la regla) alineada a 64 bytes, seguida de registros
+    [fotograma, métricas float64, estados empaquetados a 2 bits, CRC32]. Los fotogramas se leen
+    con acceso aleatorio a través de np.memmap sin cargar la ejecución completa, y al reabrir un
+    archivo para escribir se descartan los registros incompletos o corruptos del final, de modo
+    que una ejecución interrumpida continúa desde su último fotograma completo.
+
+    Usar `FrameStore.create` para un archivo nuevo y `FrameStore.open` para leer o reanudar.
+    """
+
+    def __init__(self, path, metadata, data_offset, writable):
+        self.path = path
+        self.metadata = metadata
+        self.num_cells = metadata['num_cells']
+        self.metric_names = list(metadata['metrics'])
+        self.state_bytes = -(-self.num_cells // 4)
+        self.dtype = _record_dtype(self.state_bytes, len(self.metric_names))
+        self.data_offset = data_offset
+        self._file = open(path, 'r+b' if writable else 'rb')
+        self._map = None
+        self._count = (os.path.getsize(path) - data_offset) // self.dtype.itemsize
+        if writable:
+            self._recover()
+
+    @classmethod
+    def create(cls, path, num_cells, metrics=(), overwrite=False, **metadata):
+        """
+        Crea un almacén vacío.
+
+        Parámetros:
+        path (str): Ruta del archivo.
+        num_cells (int): Número de celdas por fotograma.
+        metrics (tuple): Nombres de las métricas guardadas en cada fotograma.
+        overwrite (bool): Permite sobrescribir un archivo existente.
+        **metadata: Metadatos adicionales serializables en JSON (geometry_hash, seed, rule, params...).
+        """
+        if os.path.exists(path) and not overwrite:
+            raise FileExistsError(f"El almacén ya existe: {path}")
+        header = dict(metadata, num_cells=int(num_cells), metrics=list(metrics))
+        payload = json.dumps(header, sort_keys=True).encode()
+        data_offset = -(-(_PREFIX.size + len(payload)) // ALIGNMENT) * ALIGNMENT
+        with open(path, 'wb') as f:
+            f.write(_PREFIX.pack(MAGIC, VERSION, len(payload)))
+            f.write(payload)
+            f.write(b'\0' * (data_offset - _PREFIX.size - len(payload)))
+        return cls(path, header, data_offset, writable=True)
+
+    @classmethod
+    def open(cls, path, writable=False, expect=None):
+        """
+        Abre un almacén existente para leer o para reanudar la escritura.
+
+        Parámetros:
+        path (str): Ruta del archivo.
+        writable (bool): Si es True se descartan los registros incompletos y se puede añadir.
+        expect (dict | None): Metadatos que deben coincidir (p. ej. geometry_hash, seed); si alguno
+            difiere se lanza ValueError en lugar de mezclar ejecuciones distintas.
+        """
+        with open(path, 'rb') as f:
+            magic, version, length = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"No es un almacén de fotogramas QSN: {path}")
+            if version != VERSION:
+                raise ValueError(f"Versión de almacén no soportada: {version}")
+            metadata = json.loads(f.read(length))
+        _check_metadata(metadata, expect)
+        data_offset = -(-(_PREFIX.size + length) // ALIGNMENT) * ALIGNMENT
+        return cls(path, metadata, data_offset, writable)
+
+    def _crc(self, record):
+        return zlib.crc32(record.tobytes()[:self.dtype.fields['crc'][1]])
+
+    def _recover(self):
+        """Trunca el archivo tras el último registro completo con CRC válido."""
+        records = self._records()
+        while self._count and self._crc(records[self._count - 1]) != records[self._count - 1]['crc']:
+            self._count -= 1
+        self._file.truncate(self.data_offset + self._count * self.dtype.itemsize)
+        self._map = None
+
+    def _records(self):
+        if self._map is None or len(self._map) != self._count:
+            self._map = np.memmap(self._file, dtype=self.dtype, mode='r', offset=self.data_offset,
+                                  shape=(self._count,)) if self._count else np.empty(0, self.dtype)
+        return self._map
+
+    def __len__(self):
+        return self._count
+
+    def append(self, states, metrics=(), frame=None, packed=False, sync=False):
+        """
+        Añade un fotograma al final del archivo.
+
+        Parámetros:
+        states (array): Estados de las celdas (N,), o ya empaquetados si packed=True.
+        metrics (sequence): Valores de las métricas, en el orden de `metric_names`.
+        frame (int | None): Número de fotograma. Por defecto, el siguiente al último guardado.
+        packed (bool): Indica que `states` ya está empaquetado con `pack_states`.
+        sync (bool): Fuerza os.fsync tras escribir, para sobrevivir a caídas del sistema.
+        """
+        record = np.zeros(1, dtype=self.dtype)
+        record['frame'] = self.last_frame + 1 if frame is None else frame
+        record['metrics'] = np.asarray(metrics, dtype=float).reshape(len(self.metric_names))
+        record['states'] = np.asarray(states, dtype=np.uint8) if packed else pack_states(states)
+        record['crc'] = self._crc(record[0])
+        self._file.seek(self.data_offset + self._count * self.dtype.itemsize)
+        self._file.write(record.tobytes())
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        self._count += 1
+
+    @property
+    def last_frame(self):
+        """Número del último fotograma guardado, o -1 si el almacén está vacío."""
+        return int(self._records()[-1]['frame']) if self._count else -1
+
+    @property
+    def frames(self):
+        """Números de fotograma de todos los registros (mapeados en memoria)."""
+        return self._records()['frame']
+
+    @property
+    def metrics(self):
+        """Métricas de todos los fotogramas, forma (F, M) (mapeadas en memoria)."""
+        return self._records()['metrics']
+
+    def read_packed(self, index):
+        """Estados empaquetados del registro `index` (admite índices negativos)."""
+        return np.array(self._records()[index]['states'])
+
+    def read_states(self, index):
+        """Estados desempaquetados del registro `index` (admite índices negativos)."""
+        return unpack_states(self.read_packed(index), self.num_cells)
+
+    def close(self):
+        self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def record_run(automaton, store, num_frames, sync_every=0, expect=None):
+    """
+    Avanza el autómata guardando cada fotograma y su censo (off, left, right) en el almacén.
+
+    El primer fotograma es el estado inicial, así que la ejecución completa tiene `num_frames`
+    registros. Si el almacén ya tiene fotogramas, el autómata se reanuda desde el último
+    completo, después de comprobar que el almacén es de esta ejecución.
+
+    Parámetros:
+    automaton (QSNAutomaton): Autómata a avanzar.
+    store (FrameStore): Almacén abierto para escritura, con métricas ('off', 'left', 'right').
+    num_frames (int): Número total de fotogramas que debe tener la ejecución.
+    sync_every (int): Llama a os.fsync cada tantos fotogramas (0 para no hacerlo).
+    expect (dict | None): Metadatos que deben coincidir con los del almacén para reanudar (p. ej.
+        geometry_hash, seed, rule, params).
+
+    Lanza:
+    ValueError: Si se reanuda un almacén con otro número de celdas o con metadatos distintos de
+        `expect`.
+    """
+    if len(store):
+        _check_metadata(store.metadata, dict(expect or {}, num_cells=automaton.num_cells))
+        automaton.packed = store.read_packed(-1)
+        automaton.frame = store.last_frame
+    else:
+        store.append(automaton.packed, automaton.census(), frame=automaton.frame, packed=True)
+    while len(store) < num_frames:
+        automaton.step()
+        sync = bool(sync_every) and automaton.frame % sync_every == 0
+        store.append(automaton.packed, automaton.census(), frame=automaton.frame, packed=True, sync=sync)
@@ -0,0 +1,179 @@
+"""Generación de la geometría de la QSN: tetraedros cuasicristalinos, vértices del E8 y su proyección a 3D."""
+import numpy as np
+
+from qsn.cut_project import PHI, project_parallel
+from qsn.e8 import e8_roots, e8_shell_doubled
+from qsn.exact import deduplicate, zphi_project, zphi_scale, zphi_to_float
+from qsn.instrument import PROJECTION, TETRAHEDRALIZATION, VERTICES, WINDOWING, instrumented, stage
+
+def random_rotation_matrices(num, rng):
+    """Genera `num` matrices de rotación SO(3) uniformes a partir de cuaterniones aleatorios."""
+    # Cuaterniones unitarios uniformes (método de Shoemake)
+    u1, u2, u3 = rng.random((3, num))
+    a = np.sqrt(1 - u1)
+    b = np.sqrt(u1)
+    w = a * np.sin(2 * np.pi * u2)
+    x = a * np.cos(2 * np.pi * u2)
+    y = b * np.sin(2 * np.pi * u3)
+    z = b * np.cos(2 * np.pi * u3)
+
+    rotations = np.empty((num, 3, 3))
+    rotations[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    rotations[:, 0, 1] = 2 * (x * y - z * w)
+    rotations[:, 0, 2] = 2 * (x * z + y * w)
+    rotations[:, 1, 0] = 2 * (x * y + z * w)
+    rotations[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    rotations[:, 1, 2] = 2 * (y * z - x * w)
+    rotations[:, 2, 0] = 2 * (x * z - y * w)
+    rotations[:, 2, 1] = 2 * (y * z + x * w)
+    rotations[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    return rotations
+
+@instrumented(VERTICES, items=len)
+def generate_quasicrystal_tetrahedra(num_tetrahedra, size=1.0, seed=None):
+    """
+    Genera `num_tetrahedra` tetraedros cuasicristalinos en una sola llamada vectorizada.
+
+    Parámetros:
+    num_tetrahedra (int): Número de tetraedros a generar.
+    size (float): Escala de los tetraedros. Por defecto es 1.0.
+    seed (int | np.random.Generator | None): Semilla o generador para reproducibilidad.
+
+    Retorna:
+    np.ndarray: Arreglo (N, 4, 3) con los vértices de cada tetraedro.
+    """
+    rng = np.random.default_rng(seed)
+    vertices = np.array([
+        [0, 0, 0],
+        [1, 0, 0],
+        [PHI, PHI, 0],
+        [PHI, 0, PHI]
+    ])
+
+    rotations = random_rotation_matrices(num_tetrahedra, rng)
+    offsets = rng.uniform(-5, 5, (num_tetrahedra, 1, 3))
+    # (N, 3, 3) x (4, 3) -> (N, 4, 3): v' = size * R v + offset
+    return size * np.einsum('nij,kj->nki', rotations, vertices) + offsets
+
+def generate_quasicrystal_tetrahedron(size=1.0, seed=None):
+    return generate_quasicrystal_tetrahedra(1, size=size, seed=seed)[0]
+
+@instrumented(VERTICES, items=len)
+def generate_e8_vertices(num_vertices=None, doubled=False):
+    """
+    Genera las raíces del E8 en 8D escaladas por phi (las `num_vertices` primeras, o las 240).
+
+    Con doubled=True devuelve las raíces exactas en coordenadas dobladas (enteros 2v) sin el
+    factor phi, que `project_to_3d_exact` aplica en Z[phi] sin redondeos.
+    """
+    if doubled:
+        return e8_shell_doubled(1)[:num_vertices].astype(np.int64)
+    return e8_roots()[:num_vertices] * PHI
+
+@instrumented(PROJECTION, items=len)
+def project_to_4d(vertices):
+    """Proyecta vértices de 8D a 4D usando la proyección fija de Elser-Sloane."""
+    return project_parallel(vertices)
+
+def project_to_3d(vertices, window_size=2.0):
+    """
+    Proyecta vértices a 3D y conserva los que caen dentro de una ventana esférica.
+
+    Parámetros:
+    vertices (array): Vértices en 8D (se proyectan antes a 4D) o ya en 4D, forma (N, 8) o (N, 4).
+    window_size (float): Radio de la ventana de corte. Por defecto es 2.0.
+
+    Retorna:
+    np.ndarray: Puntos 3D dentro de la ventana (componentes imaginarias x1, x2, x3 del icosiano).
+    """
+    vertices = np.asarray(vertices)
+    vertices_4d = project_to_4d(vertices) if vertices.shape[1] == 8 else vertices
+    projected = vertices_4d[:, 1:]
+    with stage(WINDOWING, items=len(projected)):
+        window = np.sum(projected**2, axis=1) < window_size**2
+        return projected[window]
+
+def project_to_3d_exact(doubled, window_size=2.0, phi_power=1):
+    """
+    Proyecta vértices de E8 en coordenadas dobladas a 3D de forma exacta y sin duplicados.
+
+    Las coordenadas se calculan en Z[phi] (ver `qsn.exact`), así que los vértices que coinciden al
+    descartar la componente real x0 se detectan por igualdad de enteros y se conserva sólo su
+    primera aparición: la triangulación no recibe puntos repetidos ni casi repetidos.
+
+    Parámetros:
+    doubled (array): Vértices de E8 en coordenadas dobladas, forma (N, 8).
+    window_size (float): Radio de la ventana de corte. Por defecto es 2.0.
+    phi_power (int): Potencia de phi que escala los vértices; 1 equivale a `generate_e8_vertices()`.
+
+    Retorna:
+    tuple: (puntos 3D (M, 3) en coma flotante, coordenadas exactas (M, 3, 2) en Z[phi]).
+    """
+    with stage(PROJECTION, items=len(doubled), function=f"{__name__}.project_to_3d_exact"):
+        exact = zphi_scale(zphi_project(doubled), phi_power)[:, 1:]
+        projected = zphi_to_float(exact)
+    with stage(WINDOWING, items=len(projected)):
+        window = np.sum(projected**2, axis=1) < window_size**2
+        exact, projected = exact[window], projected[window]
+        unique, _ = deduplicate(exact.reshape(len(exact), -1))
+        return projected[unique], exact[unique]
+
+@instrumented(TETRAHEDRALIZATION, items=lambda result: len(result[1]))
+def generate_tetrahedra(points, tiled=False):
+    """Genera tetraedros usando triangulación de Delaunay (por bloques en paralelo si tiled=True)."""
+    if tiled:
+        from qsn.tetrahedralize import tetrahedralize_tiled
+
+        simplices, failures = tetrahedralize_tiled(points)
+        for failure in failures:
+            print(f"Error en Delaunay (bloque {failure.block}, {failure.kind}): {failure.message}")
+        return points, simplices
+    from scipy.spatial import Delaunay
+
+    try:
+        tri = Delaunay(points)
+        return tri.points, tri.simplices
+    except Exception as e:
+        print(f"Error en Delaunay: {e}")
+        return points, []
+
+def hexagonal_axial_coordinates(num_rings):
+    """
+    Coordenadas axiales (q, r) de todas las celdas de una rejilla hexagonal hasta el anillo `num_rings`.
+
+    El anillo de una celda es su distancia hexagonal al centro, max(|q|, |r|, |q + r|); el anillo k
+    tiene 6k celdas, así que hay 1 + 3N(N + 1) en total.
+
+    Retorna:
+    tuple: (coordenadas (M, 2) int64, anillo de cada celda (M,)), ordenadas por anillo y, dentro
+        de cada anillo, por ángulo empezando en el eje +x.
+    """
+    q, r = np.mgrid[-num_rings:num_rings + 1, -num_rings:num_rings + 1].reshape(2, -1)
+    ring = np.maximum(np.maximum(np.abs(q), np.abs(r)), np.abs(q + r))
+    inside = ring <= num_rings
+    q, r, ring = q[inside], r[inside], ring[inside]
+    # Ángulo del centro en el plano (x ∝ q + r/2, y ∝ √3/2 r), en [0, 2π)
+    angle = np.mod(np.arctan2(np.sqrt(3) / 2 * r, q + r / 2), 2 * np.pi)
+    order = np.lexsort((angle, ring))
+    return np.stack([q[order], r[order]], axis=1), ring[order]
+
+@instrumented(VERTICES, items=len)
+def generate_hexagonal_grid(radius=0.3, num_rings=2, spacing=None):
+    """
+    Genera los centros de la Flor de la Vida: anillos hexagonales completos de una red triangular.
+
+    Parámetros:
+    radius (float): Radio de los círculos. Por defecto es 0.3.
+    num_rings (int): Número de anillos alrededor del centro.
+    spacing (float | None): Distancia entre centros vecinos. Por defecto radius * PHI (escalado
+        con la proporción áurea).
+
+    Retorna:
+    np.ndarray: Centros (1 + 3N(N + 1), 2), el primero en el origen y después anillo a anillo.
+    """
+    if spacing is None:
+        spacing = radius * PHI
+    axial, _ = hexagonal_axial_coordinates(num_rings)
+    # Base de la red: e_q = (1, 0), e_r = (1/2, √3/2)
+    basis = spacing * np.array([[1.0, 0.0], [0.5, np.sqrt(3) / 2]])
+    return axial @ basis
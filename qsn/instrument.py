@@ -0,0 +1,331 @@
+"""
+Instrumentación opcional por etapas: tiempo de pared, tiempo de CPU, memoria reservada y número
+de elementos de cada etapa del pipeline, con exportación a JSON y a Chrome trace.
+
+Está desactivada por defecto y, así, cada etapa instrumentada cuesta una comprobación de un
+booleano. Se activa desde el código con `enable()` o sin tocarlo con variables de entorno:
+
+    QSN_PROFILE=traza.json python3 life.py salida.png     # Chrome trace al terminar
+    QSN_PROFILE=resumen.json QSN_PROFILE_FORMAT=json ...  # resumen y eventos en JSON
+    QSN_PROFILE_MEMORY=1 ...                              # además, memoria con tracemalloc
+
+La traza se abre en chrome://tracing o en https://ui.perfetto.dev. La memoria se mide con
+tracemalloc (sólo reservas de Python y NumPy, no la memoria interna de qiskit-aer) y ralentiza
+bastante la ejecución, por eso va aparte.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Etapas del pipeline (el nombre de cada evento; la función instrumentada va en sus argumentos)
+VERTICES = 'vertices'
+PROJECTION = 'projection'
+WINDOWING = 'windowing'
+TETRAHEDRALIZATION = 'tetrahedralization'
+CIRCUIT_BUILD = 'circuit.build'
+CIRCUIT_TRANSPILE = 'circuit.transpile'
+CIRCUIT_RUN = 'circuit.run'
+RENDER = 'render'
+
+class StageRecord:
+    """Medidas de una ejecución de una etapa; `items` se puede fijar dentro del bloque `with`."""
+
+    __slots__ = ('name', 'function', 'thread', 'depth', 'nested', 'start', 'wall', 'cpu', 'alloc_peak',
+                 'alloc_net', 'items')
+
+    def __init__(self, name, function, thread, depth, nested=False):
+        self.name = name
+        self.function = function
+        self.thread = thread
+        self.depth = depth
+        self.nested = nested  # Abierta dentro de otra ejecución de la misma etapa en el mismo hilo
+        self.start = 0.0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.alloc_peak = None
+        self.alloc_net = None
+        self.items = None
+
+class _Recorder:
+    """Estado global: registros terminados, pila de etapas abiertas por hilo y ganchos."""
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.records = []
+        self.hooks = []
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def stack(self):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+_recorder = _Recorder()
+
+def enable(memory=False, reset=True):
+    """
+    Activa la instrumentación.
+
+    Parámetros:
+    memory (bool): Mide también el pico y el neto de memoria reservada por etapa con tracemalloc.
+    reset (bool): Descarta los registros anteriores. Por defecto es True.
+    """
+    if reset:
+        reset_records()
+    _recorder.memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _recorder.enabled = True
+
+def disable():
+    """Desactiva la instrumentación (los registros se conservan hasta exportarlos o `reset_records()`)."""
+    _recorder.enabled = False
+    if _recorder.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _recorder.memory = False
+
+def is_enabled():
+    return _recorder.enabled
+
+def reset_records():
+    """Descarta los registros y reinicia el origen de tiempos de la traza."""
+    with _recorder.lock:
+        _recorder.records = []
+        _recorder.origin = time.perf_counter()
+
+def records():
+    """Lista de StageRecord terminados, en orden de finalización."""
+    return list(_recorder.records)
+
+def add_hook(callback):
+    """
+    Registra un gancho `callback(event, record)` que se llama con event='start' al entrar en cada
+    etapa y event='stop' al salir. Sirve para enganchar un perfilador de muestreo sólo en las
+    etapas que interesan (ver `attach_profiler`).
+
+    Retorna:
+    callable: Función sin argumentos que elimina el gancho.
+    """
+    _recorder.hooks.append(callback)
+    return lambda: _recorder.hooks.remove(callback)
+
+def attach_profiler(profiler, stages=None):
+    """
+    Arranca y detiene un perfilador de muestreo con las etapas instrumentadas.
+
+    Vale cualquier objeto con start()/stop(), por ejemplo `pyinstrument.Profiler()`. Un
+    perfilador externo como py-spy no necesita gancho: basta `py-spy record --pid <pid>` y la
+    traza de la QSN indica qué etapa corría en cada instante.
+
+    Parámetros:
+    profiler: Perfilador con métodos start() y stop().
+    stages (iterable | None): Nombres de las etapas a perfilar. None perfila todas.
+
+    Retorna:
+    callable: Función sin argumentos que desengancha el perfilador.
+    """
+    stages = None if stages is None else set(stages)
+    active = []
+
+    def hook(event, record):
+        if stages is not None and record.name not in stages:
+            return
+        # Sólo la etapa más externa de las seleccionadas arranca y detiene el perfilador
+        if event == 'start':
+            if not active:
+                profiler.start()
+            active.append(record)
+        elif active and active[-1] is record:
+            active.pop()
+            if not active:
+                profiler.stop()
+
+    return add_hook(hook)
+
+class stage:
+    """
+    Mide un bloque como una etapa del pipeline:
+
+        with stage(TETRAHEDRALIZATION, items=len(points)) as record:
+            ...
+            record.items = len(simplices)
+
+    Las etapas se pueden anidar; la memoria de una etapa incluye la de las que contiene. Con la
+    instrumentación desactivada, `record` es None y el bloque no mide nada.
+
+    Parámetros:
+    name (str): Nombre de la etapa.
+    items (int | None): Número de elementos procesados (vértices, tetraedros, qubits...).
+    function (str | None): Función instrumentada, para distinguir llamadas de la misma etapa.
+    """
+
+    __slots__ = ('name', 'items', 'function', 'record', 'cpu0', 'alloc0', 'carried_peak')
+
+    def __init__(self, name, items=None, function=None):
+        self.name = name
+        self.items = items
+        self.function = function
+        self.record = None
+
+    def __enter__(self):
+        if not _recorder.enabled:
+            return None
+        stack = _recorder.stack()
+        nested = any(outer.name == self.name for outer in stack)
+        record = self.record = StageRecord(self.name, self.function, threading.get_ident(), len(stack), nested)
+        record.items = self.items
+        for hook in list(_recorder.hooks):
+            hook('start', record)
+        self.carried_peak = 0
+        if _recorder.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # El pico de tracemalloc es global: la etapa exterior guarda el suyo antes de reiniciarlo
+            if stack:
+                stack[-1].carried_peak = max(stack[-1].carried_peak, peak)
+            self.alloc0 = current
+            tracemalloc.reset_peak()
+        else:
+            self.alloc0 = None
+        stack.append(self)
+        self.cpu0 = time.process_time()
+        record.start = time.perf_counter()
+        return record
+
+    def __exit__(self, *exc):
+        record = self.record
+        if record is None:
+            return False
+        record.wall = time.perf_counter() - record.start
+        record.cpu = time.process_time() - self.cpu0
+        if self.alloc0 is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            record.alloc_peak = max(peak, self.carried_peak) - self.alloc0
+            record.alloc_net = current - self.alloc0
+        stack = _recorder.stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        for hook in list(_recorder.hooks):
+            hook('stop', record)
+        with _recorder.lock:
+            _recorder.records.append(record)
+        self.record = None
+        return False
+
+def instrumented(name, items=None):
+    """
+    Decorador que mide cada llamada a la función como la etapa `name`.
+
+    Parámetros:
+    name (str): Nombre de la etapa.
+    items (callable | None): f(resultado) -> número de elementos producidos.
+    """
+    def decorator(func):
+        function = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _recorder.enabled:
+                return func(*args, **kwargs)
+            with stage(name, function=function) as record:
+                result = func(*args, **kwargs)
+                if items is not None and record is not None:
+                    record.items = items(result)
+                return result
+        return wrapper
+    return decorator
+
+def summary():
+    """
+    Totales por etapa: llamadas, tiempo de pared y de CPU, pico de memoria y elementos.
+
+    El tiempo de pared total cuenta una sola vez las llamadas anidadas de la misma etapa.
+
+    Retorna:
+    dict: {etapa: {'calls', 'wall', 'cpu', 'alloc_peak', 'items'}}.
+    """
+    totals = {}
+    for record in _recorder.records:
+        total = totals.setdefault(record.name, {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'alloc_peak': None,
+                                                'items': None})
+        total['calls'] += 1
+        if not record.nested:
+            total['wall'] += record.wall
+            total['cpu'] += record.cpu
+        if record.alloc_peak is not None:
+            total['alloc_peak'] = max(total['alloc_peak'] or 0, record.alloc_peak)
+        if record.items is not None:
+            total['items'] = (total['items'] or 0) + record.items
+    return totals
+
+def chrome_trace():
+    """
+    Eventos en el formato Trace Event de Chrome (eventos completos 'X', tiempos en µs).
+
+    Retorna:
+    dict: {'traceEvents': [...], 'displayTimeUnit': 'ms'}.
+    """
+    events = []
+    for record in sorted(_recorder.records, key=lambda r: r.start):
+        args = {'cpu_ms': record.cpu * 1e3}
+        if record.function:
+            args['function'] = record.function
+        if record.items is not None:
+            args['items'] = record.items
+        if record.alloc_peak is not None:
+            args['alloc_peak_bytes'] = record.alloc_peak
+            args['alloc_net_bytes'] = record.alloc_net
+        events.append({'name': record.name, 'cat': 'qsn', 'ph': 'X', 'pid': _recorder.pid, 'tid': record.thread,
+                       'ts': (record.start - _recorder.origin) * 1e6, 'dur': record.wall * 1e6, 'args': args})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+def export(path, format='chrome'):
+    """
+    Escribe los registros en disco.
+
+    Parámetros:
+    path (str): Ruta del archivo JSON.
+    format (str): 'chrome' para un Chrome trace o 'json' para el resumen por etapa más la lista
+        de eventos.
+    """
+    if format == 'chrome':
+        payload = chrome_trace()
+    elif format == 'json':
+        payload = {'pid': _recorder.pid, 'stages': summary(), 'events': chrome_trace()['traceEvents']}
+    else:
+        raise ValueError(f"Formato de exportación desconocido: {format!r}")
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=1)
+
+def print_summary():
+    """Imprime la tabla de totales por etapa, ordenada por tiempo de pared."""
+    for name, total in sorted(summary().items(), key=lambda item: -item[1]['wall']):
+        memory = '' if total['alloc_peak'] is None else f" {total['alloc_peak'] / 2**20:9.2f} MiB"
+        items = '' if total['items'] is None else f" {total['items']:>10d} elem."
+        print(f"{name:20s} {total['calls']:5d} llamadas {total['wall'] * 1e3:10.2f} ms pared "
+              f"{total['cpu'] * 1e3:10.2f} ms CPU{memory}{items}")
+
+def _enable_from_environment():
+    """Activa la instrumentación si $QSN_PROFILE indica una ruta, y exporta al salir del proceso."""
+    path = os.environ.get('QSN_PROFILE')
+    if not path:
+        return
+    enable(memory=os.environ.get('QSN_PROFILE_MEMORY', '') not in ('', '0'))
+    format = os.environ.get('QSN_PROFILE_FORMAT', 'chrome')
+    pid = os.getpid()
+
+    def finish():
+        # Los procesos hijos (pools de procesos) heredan el gancho pero no escriben la traza
+        if os.getpid() == pid and _recorder.records:
+            export(path, format)
+    atexit.register(finish)
+
+_enable_from_environment()
@@ -0,0 +1,187 @@
+"""Backend exacto en NumPy para circuitos de Ising diagonales (Hadamard + puertas ZZ que conmutan)."""
+from dataclasses import dataclass
+
+import numpy as np
+
+from qsn.instrument import CIRCUIT_RUN, instrumented
+
+# Puertas de fase de un qubit como el ángulo de rz equivalente, salvo fase global. Todas las
+# puertas diagonales se acumulan en la fase exp(-i/2 (sum_e J_e z_i z_j + sum_q h_q z_q))
+_PHASE_GATES = {'z': np.pi, 's': np.pi / 2, 'sdg': -np.pi / 2, 't': np.pi / 4, 'tdg': -np.pi / 4}
+
+@dataclass
+class DiagonalIsing:
+    """Circuito H + puertas diagonales reducido a un Hamiltoniano de Ising clásico."""
+    num_qubits: int
+    hadamard: np.ndarray  # (n,) bool: qubits en superposición tras la capa de Hadamard
+    edges: np.ndarray  # (E, 2) pares de qubits con acoplamiento ZZ
+    couplings: np.ndarray  # (E,) ángulos J_e (rzz(J_e))
+    fields: np.ndarray  # (n,) ángulos h_q (rz(h_q))
+    measured: list  # Pares (qubit, clbit) medidos
+    clbit_registers: list  # Tamaño de cada registro clásico, en el orden del circuito
+
+def diagonal_ising(qc):
+    """
+    Reconoce un circuito de Ising diagonal: cada qubit recibe a lo sumo una Hadamard antes de
+    cualquier otra operación, y después sólo puertas diagonales (rzz, rz, p, z, s, t, cz, cp...),
+    barreras y medidas finales.
+
+    Parámetros:
+    qc (QuantumCircuit): Circuito a analizar.
+
+    Retorna:
+    DiagonalIsing | None: Los términos del Hamiltoniano, o None si el circuito no es de esa clase.
+    """
+    n = qc.num_qubits
+    hadamard = np.zeros(n, dtype=bool)
+    touched = np.zeros(n, dtype=bool)
+    measured_qubits = np.zeros(n, dtype=bool)
+    edges, couplings, fields = [], [], np.zeros(n)
+    measured = []
+    for instruction in qc.data:
+        op = instruction.operation
+        qubits = [qc.find_bit(q).index for q in instruction.qubits]
+        if op.name == 'barrier':
+            continue
+        if op.name == 'measure':
+            measured.append((qubits[0], qc.find_bit(instruction.clbits[0]).index))
+            measured_qubits[qubits[0]] = touched[qubits[0]] = True
+            continue
+        if measured_qubits[qubits].any():
+            # Una puerta tras la medida ya no es un circuito de Ising con medidas finales
+            return None
+        try:
+            params = [float(p) for p in op.params]
+        except TypeError:
+            # Parámetros sin asignar
+            return None
+        if op.name == 'h':
+            if touched[qubits[0]]:
+                return None
+            hadamard[qubits[0]] = True
+        elif op.name == 'rzz':
+            edges.append(qubits)
+            couplings.append(params[0])
+        elif op.name in ('rz', 'p', 'u1'):
+            fields[qubits[0]] += params[0]
+        elif op.name in _PHASE_GATES:
+            fields[qubits[0]] += _PHASE_GATES[op.name]
+        elif op.name in ('cz', 'cp', 'cu1'):
+            # cp(l) = rzz(-l/2) rz_i(l/2) rz_j(l/2), salvo fase global
+            angle = np.pi if op.name == 'cz' else params[0]
+            edges.append(qubits)
+            couplings.append(-angle / 2)
+            fields[qubits] += angle / 2
+        else:
+            return None
+        touched[qubits] = True
+    return DiagonalIsing(n, hadamard, np.asarray(edges, dtype=np.intp).reshape(-1, 2),
+                         np.asarray(couplings, dtype=float), fields, measured,
+                         [creg.size for creg in qc.cregs])
+
+def ising_energies(spins, edges, couplings, fields=None):
+    """
+    Energía de Ising de cada configuración, vectorizada sobre el grafo de interacción.
+
+    Parámetros:
+    spins (array): Espines +-1, forma (S, n).
+    edges (array): Pares de qubits que interactúan, forma (E, 2).
+    couplings (array): Acoplamiento de cada arista, forma (E,).
+    fields (array | None): Campo local de cada qubit, forma (n,).
+
+    Retorna:
+    np.ndarray: Energías sum_e J_e z_i z_j + sum_q h_q z_q, forma (S,).
+    """
+    spins = np.asarray(spins, dtype=float)
+    edges = np.asarray(edges, dtype=np.intp).reshape(-1, 2)
+    energies = (spins[:, edges[:, 0]] * spins[:, edges[:, 1]]) @ np.asarray(couplings, dtype=float)
+    if fields is not None:
+        energies += spins @ np.asarray(fields, dtype=float)
+    return energies
+
+def ising_statevector(terms, chunk_size=2**16):
+    """
+    Vector de estado exacto de un circuito de Ising diagonal (sin las medidas).
+
+    El índice k sigue el orden de qiskit: el qubit q es el bit q de k.
+
+    Parámetros:
+    terms (DiagonalIsing): Términos devueltos por `diagonal_ising`.
+    chunk_size (int): Estados de la base procesados a la vez.
+
+    Retorna:
+    np.ndarray: Amplitudes complejas, forma (2**n,).
+    """
+    n = terms.num_qubits
+    shifts = np.arange(n, dtype=np.int64)
+    superposed = np.count_nonzero(terms.hadamard)
+    state = np.zeros(2 ** n, dtype=complex)
+    for start in range(0, 2 ** n, chunk_size):
+        index = np.arange(start, min(start + chunk_size, 2 ** n), dtype=np.int64)
+        bits = (index[:, None] >> shifts) & 1
+        # Los qubits sin Hadamard siguen en |0>
+        support = ~np.any(bits[:, ~terms.hadamard], axis=1)
+        spins = 1 - 2 * bits[support]
+        energies = ising_energies(spins, terms.edges, terms.couplings, terms.fields)
+        state[index[support]] = np.exp(-0.5j * energies) / np.sqrt(2.0 ** superposed)
+    return state
+
+def ising_probabilities(terms):
+    """Probabilidades exactas de medir cada estado de la base, forma (2**n,)."""
+    return np.abs(ising_statevector(terms)) ** 2
+
+def sample_ising(terms, shots=1000, seed=None):
+    """
+    Muestrea medidas de un circuito de Ising diagonal sin construir el vector de estado.
+
+    Las puertas diagonales sólo cambian fases, así que en la base computacional cada qubit con
+    Hadamard es un bit uniforme independiente y el resto vale 0: el coste es O(shots * n) y no
+    hay límite práctico de qubits.
+
+    Retorna:
+    np.ndarray: Bits medidos, forma (shots, n) de uint8, con el qubit q en la columna q.
+    """
+    rng = np.random.default_rng(seed)
+    samples = np.zeros((shots, terms.num_qubits), dtype=np.uint8)
+    samples[:, terms.hadamard] = rng.integers(0, 2, (shots, np.count_nonzero(terms.hadamard)), dtype=np.uint8)
+    return samples
+
+def _counts(measured, clbit_registers, samples):
+    """Convierte muestras por qubit en un diccionario de cuentas con el formato de qiskit."""
+    clbits = np.zeros((len(samples), sum(clbit_registers)), dtype=np.uint8)
+    for qubit, clbit in measured:
+        clbits[:, clbit] = samples[:, qubit]
+    rows, counts = np.unique(clbits, axis=0, return_counts=True)
+    bounds = np.cumsum([0] + clbit_registers)
+    result = {}
+    for row, count in zip(rows, counts):
+        # Cada registro se escribe con el bit más significativo primero; los registros, del último al primero
+        registers = [''.join('1' if b else '0' for b in row[lo:hi][::-1])
+                     for lo, hi in zip(bounds[:-1], bounds[1:])]
+        result[' '.join(registers[::-1])] = int(count)
+    return result
+
+@instrumented(CIRCUIT_RUN, items=lambda counts: sum(counts.values()))
+def run_circuit(qc, shots=1000, seed=None, simulator=None):
+    """
+    Ejecuta un circuito y devuelve sus cuentas, con un camino rápido exacto para Ising diagonal.
+
+    Si el circuito es H + puertas diagonales + medidas (ver `diagonal_ising`), las muestras se
+    obtienen directamente en NumPy; si no, se recurre a AerSimulator.
+
+    Parámetros:
+    qc (QuantumCircuit): Circuito con medidas.
+    shots (int): Número de disparos. Por defecto es 1000.
+    seed (int | None): Semilla del muestreo.
+    simulator (AerSimulator | None): Simulador para el caso general.
+
+    Retorna:
+    dict: Cuentas {cadena de bits: número de disparos} como las de `Result.get_counts()`.
+    """
+    terms = diagonal_ising(qc)
+    if terms is not None:
+        return _counts(terms.measured, terms.clbit_registers, sample_ising(terms, shots, seed))
+    if simulator is None:
+        from qiskit_aer import AerSimulator
+        simulator = AerSimulator()
+    return simulator.run(qc, shots=shots, seed_simulator=seed).result().get_counts()
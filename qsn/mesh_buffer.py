@@ -0,0 +1,140 @@
+"""
+Buffers binarios de la malla de la QSN (puntos, tetraedros y estado por celda) para el visor nativo.
+
+Formato, versión 1 (little-endian). Cabecera fija de 64 bytes:
+
+    desplazamiento  tipo      campo
+    0               char[8]   magic b'QSNMESH\\0'
+    8               uint32    versión (1)
+    12              uint32    tamaño de la cabecera (64)
+    16              uint64    num_points
+    24              uint64    num_cells
+    32              uint64    desplazamiento de los puntos     float32[num_points][3]
+    40              uint64    desplazamiento de los tetraedros uint32[num_cells][4]
+    48              uint64    desplazamiento de los estados    uint8[num_cells]
+    56              uint64    state_version
+
+Cada sección empieza en un múltiplo de 64 bytes, de modo que el visor la usa directamente desde
+el archivo mapeado en memoria. Los estados son los del autómata (0 apagada, 1 izquierda,
+2 derecha) o 255 para "sin estado". Al cambiar los estados se escribe primero la sección y
+después se incrementa state_version: el visor sólo vuelve a leer los estados cuando ese contador
+cambia. La geometría no se modifica nunca en sitio; para otra geometría se escribe un archivo nuevo.
+"""
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+MAGIC = b'QSNMESH\0'
+VERSION = 1
+ALIGNMENT = 64
+STATE_NONE = 255
+_HEADER = struct.Struct('<8sIIQQQQQQ')
+_STATE_VERSION_OFFSET = 56
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+class MeshBuffer:
+    """
+    Archivo de buffers de la malla mapeado en memoria.
+
+    Usar `MeshBuffer.create` para escribir uno nuevo y `MeshBuffer.open` para leerlo o para
+    actualizar sus estados.
+    """
+
+    def __init__(self, path, writable=False):
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"Archivo de malla truncado: {path}")
+        (magic, version, header_size, self.num_points, self.num_cells, points_offset, simplices_offset,
+         states_offset, _) = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"No es un archivo de malla QSN: {path}")
+        if version != VERSION:
+            raise ValueError(f"Versión de malla no soportada: {version}")
+        self.path = path
+        self.writable = writable
+        self._map = np.memmap(path, dtype=np.uint8, mode='r+' if writable else 'r')
+        if states_offset + self.num_cells > len(self._map):
+            raise ValueError(f"Archivo de malla truncado: {path}")
+        self.points = self._map[points_offset:points_offset + 12 * self.num_points].view('<f4').reshape(-1, 3)
+        self.simplices = self._map[simplices_offset:simplices_offset + 16 * self.num_cells].view('<u4').reshape(-1, 4)
+        self.states = self._map[states_offset:states_offset + self.num_cells]
+        self._state_version = self._map[_STATE_VERSION_OFFSET:_STATE_VERSION_OFFSET + 8].view('<u8')
+
+    @classmethod
+    def create(cls, path, points, simplices, states=None):
+        """
+        Escribe un archivo de malla nuevo (de forma atómica: temporal + rename, así que un visor
+        que tenga abierto el archivo anterior sigue viendo una versión completa).
+
+        Parámetros:
+        path (str): Ruta del archivo.
+        points (array): Coordenadas de los vértices, forma (P, 3); se guardan en float32.
+        simplices (array): Índices de los vértices de cada tetraedro, forma (T, 4); uint32.
+        states (array | None): Estado de cada celda (T,). Por defecto STATE_NONE.
+
+        Retorna:
+        MeshBuffer: El archivo abierto para actualizar estados.
+        """
+        points = np.ascontiguousarray(points, dtype='<f4').reshape(-1, 3)
+        simplices = np.asarray(simplices).reshape(-1, 4)
+        if len(simplices) and (simplices.min() < 0 or simplices.max() >= len(points)):
+            raise ValueError("Los tetraedros hacen referencia a vértices inexistentes")
+        simplices = np.ascontiguousarray(simplices, dtype='<u4')
+        states = np.full(len(simplices), STATE_NONE, dtype=np.uint8) if states is None else \
+            np.ascontiguousarray(states, dtype=np.uint8).reshape(len(simplices))
+
+        points_offset = _align(_HEADER.size)
+        simplices_offset = _align(points_offset + points.nbytes)
+        states_offset = _align(simplices_offset + simplices.nbytes)
+        header = _HEADER.pack(MAGIC, VERSION, _HEADER.size, len(points), len(simplices), points_offset,
+                              simplices_offset, states_offset, 0)
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for offset, data in ((0, header), (points_offset, points.tobytes()),
+                                     (simplices_offset, simplices.tobytes()), (states_offset, states.tobytes())):
+                    f.seek(offset)
+                    f.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        return cls(path, writable=True)
+
+    @classmethod
+    def open(cls, path, writable=False):
+        """Abre un archivo de malla existente (writable=True para actualizar sus estados)."""
+        return cls(path, writable=writable)
+
+    @property
+    def state_version(self):
+        """Contador que se incrementa con cada `update_states`."""
+        return int(self._state_version[0])
+
+    def update_states(self, states):
+        """Reescribe los estados en sitio y después incrementa state_version para avisar al visor."""
+        if not self.writable:
+            raise ValueError("Archivo de malla abierto sólo para lectura")
+        self.states[:] = np.asarray(states, dtype=np.uint8).reshape(self.num_cells)
+        self._map.flush()
+        self._state_version[0] += 1
+        self._map.flush()
+
+    def close(self):
+        if self._map is not None:
+            if self.writable:
+                self._map.flush()
+            self._map = None
+            self.points = self.simplices = self.states = self._state_version = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,235 @@
+"""Simulación por estados de producto de matrices (MPS) de circuitos sobre el grafo de tetraedros."""
+from dataclasses import dataclass
+
+import numpy as np
+
+from qsn.automaton import face_adjacency
+from qsn.instrument import CIRCUIT_RUN, instrumented
+from qsn.ising import _counts
+
+_SWAP = np.eye(4).reshape(2, 2, 2, 2).transpose(1, 0, 2, 3)
+
+@dataclass
+class MPSMetrics:
+    """Métricas de una ejecución MPS."""
+    method: str
+    num_qubits: int
+    max_bond_dimension: int
+    truncation_error: float  # Suma de pesos descartados en las SVD (NaN si el backend no la informa)
+    memory_bytes: int  # Pico de memoria de los tensores (estimado a partir de las dimensiones en Aer)
+    num_swaps: int
+
+def tetrahedra_interactions(simplices, reorder=True):
+    """
+    Grafo de interacción entre qubits a partir de la adyacencia por caras de los tetraedros.
+
+    Cada tetraedro es un qubit. Con reorder=True los qubits se numeran en el orden de
+    Cuthill-McKee inverso, que reduce el ancho de banda del grafo y con él los SWAP y la
+    dimensión de enlace que necesita un MPS.
+
+    Parámetros:
+    simplices (array): Tetraedros, forma (N, 4).
+    reorder (bool): Renumera los qubits para reducir el ancho de banda.
+
+    Retorna:
+    tuple: (interacciones (E, 2) con i < j, tetraedro de cada qubit (N,), ancho de banda).
+    """
+    from scipy.sparse import triu
+    from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+    adjacency = face_adjacency(simplices)
+    num_cells = adjacency.shape[0]
+    order = reverse_cuthill_mckee(adjacency, symmetric_mode=True) if reorder else np.arange(num_cells)
+    position = np.empty(num_cells, dtype=np.intp)
+    position[order] = np.arange(num_cells)
+    upper = triu(adjacency, k=1).tocoo()
+    interactions = np.sort(np.column_stack([position[upper.row], position[upper.col]]), axis=1)
+    interactions = interactions[np.lexsort(interactions.T[::-1])]
+    bandwidth = int(np.max(interactions[:, 1] - interactions[:, 0])) if len(interactions) else 0
+    return interactions, np.asarray(order, dtype=np.intp), bandwidth
+
+class MatrixProductState:
+    """
+    MPS de `num_qubits` qubits en |0...0> con truncamiento de la dimensión de enlace.
+
+    Se mantiene la forma canónica mixta, de modo que el peso descartado en cada SVD es el error
+    de truncamiento real. Las puertas de dos qubits no vecinos se aplican tras acercarlos con
+    SWAP, que se deshacen de forma perezosa antes de la siguiente puerta que los necesite.
+
+    Parámetros:
+    num_qubits (int): Número de qubits.
+    max_bond_dimension (int): Dimensión de enlace máxima.
+    truncation_threshold (float): Peso relativo máximo descartado en cada SVD.
+    """
+
+    def __init__(self, num_qubits, max_bond_dimension=64, truncation_threshold=1e-10):
+        self.tensors = [np.array([1, 0], dtype=complex).reshape(1, 2, 1) for _ in range(num_qubits)]
+        self.max_bond_dimension = max_bond_dimension
+        self.truncation_threshold = truncation_threshold
+        self.site = np.arange(num_qubits)  # Qubit de cada posición de la cadena
+        self.position = np.arange(num_qubits)  # Posición de cada qubit
+        self.center = 0
+        self.truncation_error = 0.0
+        self.num_swaps = 0
+        self._pending = []  # SWAP aplicados desde la disposición inicial
+        self.peak_bytes = self.memory_bytes
+
+    @property
+    def memory_bytes(self):
+        return sum(tensor.nbytes for tensor in self.tensors)
+
+    @property
+    def bond_dimensions(self):
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+
+    def _move_center(self, target):
+        tensors = self.tensors
+        while self.center < target:
+            c = self.center
+            left, _, right = tensors[c].shape
+            q, r = np.linalg.qr(tensors[c].reshape(left * 2, right))
+            tensors[c] = q.reshape(left, 2, -1)
+            tensors[c + 1] = np.einsum('ab,bpr->apr', r, tensors[c + 1])
+            self.center += 1
+        while self.center > target:
+            c = self.center
+            left, _, right = tensors[c].shape
+            q, r = np.linalg.qr(tensors[c].reshape(left, 2 * right).conj().T)
+            tensors[c] = q.conj().T.reshape(-1, 2, right)
+            tensors[c - 1] = np.einsum('lpa,ab->lpb', tensors[c - 1], r.conj().T)
+            self.center -= 1
+
+    def _apply_sites(self, k, gate):
+        """Aplica gate[out_k, out_k1, in_k, in_k1] a las posiciones k y k+1 y trunca."""
+        self._move_center(k)
+        a, b = self.tensors[k], self.tensors[k + 1]
+        left, right = a.shape[0], b.shape[2]
+        theta = np.tensordot(a, b, axes=(2, 0))  # (l, 2, 2, r)
+        if gate is _SWAP:
+            theta = theta.transpose(0, 2, 1, 3)
+        else:
+            theta = np.tensordot(gate, theta, axes=([2, 3], [1, 2])).transpose(2, 0, 1, 3)
+        theta = theta.reshape(left * 2, 2 * right)
+        u, s, vh = np.linalg.svd(theta, full_matrices=False)
+        weights = s ** 2 / np.sum(s ** 2)
+        # Menor rango cuyo peso descartado (la cola) no supera el umbral, acotado por el máximo
+        tail = np.cumsum(weights[::-1])[::-1]
+        keep = max(1, min(self.max_bond_dimension, int(np.count_nonzero(tail > self.truncation_threshold))))
+        self.truncation_error += float(np.sum(weights[keep:]))
+        s = s[:keep] / np.linalg.norm(s[:keep])
+        self.tensors[k] = u[:, :keep].reshape(left, 2, keep)
+        self.tensors[k + 1] = (s[:, None] * vh[:keep]).reshape(keep, 2, right)
+        self.center = k + 1
+        self.peak_bytes = max(self.peak_bytes, self.memory_bytes)
+
+    def apply_1q(self, qubit, matrix):
+        """Aplica una puerta de un qubit (matriz 2x2)."""
+        k = self.position[qubit]
+        self.tensors[k] = np.einsum('pq,lqr->lpr', matrix, self.tensors[k])
+
+    def _swap(self, k):
+        self._apply_sites(k, _SWAP)
+        self.site[[k, k + 1]] = self.site[[k + 1, k]]
+        self.position[self.site[[k, k + 1]]] = [k, k + 1]
+        self.num_swaps += 1
+
+    def apply_2q(self, qubit_a, qubit_b, matrix):
+        """
+        Aplica una puerta de dos qubits con la matriz 4x4 en el orden de qiskit
+        (índice b_a + 2 b_b, es decir, qubit_a es el bit menos significativo).
+        """
+        if abs(self.position[qubit_a] - self.position[qubit_b]) > 1:
+            # Deshace los SWAP de la puerta anterior para volver a la disposición inicial (de ancho
+            # de banda reducido) sólo cuando hace falta: puertas seguidas sobre el mismo par no los pagan
+            while self._pending:
+                self._swap(self._pending.pop())
+        # Acerca qubit_b a qubit_a con SWAP
+        while abs(self.position[qubit_a] - self.position[qubit_b]) > 1:
+            k = self.position[qubit_b]
+            k = k - 1 if k > self.position[qubit_a] else k
+            self._swap(k)
+            self._pending.append(k)
+        gate = np.asarray(matrix, dtype=complex).reshape(2, 2, 2, 2)  # [out_b, out_a, in_b, in_a]
+        if self.position[qubit_a] < self.position[qubit_b]:
+            gate = gate.transpose(1, 0, 3, 2)
+        self._apply_sites(min(self.position[qubit_a], self.position[qubit_b]), gate)
+
+    def sample(self, shots, seed=None):
+        """
+        Muestrea medidas de todos los qubits en la base computacional.
+
+        Retorna:
+        np.ndarray: Bits medidos, forma (shots, n) de uint8, con el qubit q en la columna q.
+        """
+        rng = np.random.default_rng(seed)
+        self._move_center(0)
+        samples = np.zeros((shots, len(self.tensors)), dtype=np.uint8)
+        env = np.ones((shots, 1), dtype=complex)
+        for k, tensor in enumerate(self.tensors):
+            # El resto de la cadena es canónico por la derecha: la norma de cada rama es su probabilidad
+            amplitudes = np.einsum('sl,lpr->spr', env, tensor)
+            weights = np.sum(np.abs(amplitudes) ** 2, axis=2)
+            bits = rng.random(shots) * weights.sum(axis=1) < weights[:, 1]
+            samples[:, self.site[k]] = bits
+            env = amplitudes[np.arange(shots), bits.astype(np.intp)]
+            env /= np.linalg.norm(env, axis=1, keepdims=True)
+        return samples
+
+@instrumented(CIRCUIT_RUN, items=lambda result: sum(result[0].values()))
+def run_mps(qc, shots=1000, max_bond_dimension=64, truncation_threshold=1e-10, method='native', seed=None):
+    """
+    Ejecuta un circuito con un simulador MPS y devuelve las cuentas y sus métricas.
+
+    Parámetros:
+    qc (QuantumCircuit): Circuito con puertas de uno o dos qubits y medidas finales.
+    shots (int): Número de disparos. Por defecto es 1000.
+    max_bond_dimension (int): Dimensión de enlace máxima.
+    truncation_threshold (float): Peso relativo máximo descartado en cada SVD.
+    method (str): 'native' (MPS en NumPy) o 'aer' (AerSimulator con method='matrix_product_state').
+    seed (int | None): Semilla del muestreo.
+
+    Retorna:
+    tuple: (cuentas como las de `Result.get_counts()`, MPSMetrics).
+    """
+    if method == 'aer':
+        return _run_aer(qc, shots, max_bond_dimension, truncation_threshold, seed)
+    if method != 'native':
+        raise ValueError(f"Método MPS desconocido: {method}")
+    mps = MatrixProductState(qc.num_qubits, max_bond_dimension, truncation_threshold)
+    measured = []
+    for instruction in qc.data:
+        op = instruction.operation
+        qubits = [qc.find_bit(q).index for q in instruction.qubits]
+        if op.name == 'barrier':
+            continue
+        if op.name == 'measure':
+            measured.append((qubits[0], qc.find_bit(instruction.clbits[0]).index))
+        elif len(qubits) == 1:
+            mps.apply_1q(qubits[0], op.to_matrix())
+        elif len(qubits) == 2:
+            mps.apply_2q(qubits[0], qubits[1], op.to_matrix())
+        else:
+            raise ValueError(f"Puerta no soportada por el MPS nativo: {op.name}")
+    counts = _counts(measured, [creg.size for creg in qc.cregs], mps.sample(shots, seed))
+    metrics = MPSMetrics('native', qc.num_qubits, max(mps.bond_dimensions, default=1), mps.truncation_error,
+                         mps.peak_bytes, mps.num_swaps)
+    return counts, metrics
+
+def _run_aer(qc, shots, max_bond_dimension, truncation_threshold, seed):
+    import re
+    from qiskit_aer import AerSimulator
+
+    simulator = AerSimulator(method='matrix_product_state',
+                             matrix_product_state_max_bond_dimension=max_bond_dimension,
+                             matrix_product_state_truncation_threshold=truncation_threshold,
+                             mps_log_data=True)
+    # Sin transpilar: el mapa de acoplamiento de AerSimulator limita el ancho al de un vector de estado
+    result = simulator.run(qc, shots=shots, seed_simulator=seed).result()
+    log = result.results[0].metadata.get('MPS_log_data', '')
+    # Aer registra las dimensiones de enlace tras cada puerta, pero no el peso descartado
+    bonds = [np.array(b.split(), dtype=np.int64) for b in re.findall(r'BD=\[([\d ]*)\]', log)]
+    max_bond = int(max((b.max() for b in bonds if len(b)), default=1))
+    peak = max((int(16 * 2 * np.sum(np.concatenate([[1], b]) * np.concatenate([b, [1]]))) for b in bonds),
+               default=32 * qc.num_qubits)
+    swaps = log.count('internal_swap')
+    return result.get_counts(), MPSMetrics('aer', qc.num_qubits, max_bond, float('nan'), peak, swaps)
@@ -0,0 +1,298 @@
+"""
+Servicio local de parches de la QSN: un servidor asyncio (socket Unix o localhost) que calcula
+parches por región, ventana y semilla, los guarda en una caché LRU acotada en memoria y los
+comparte entre todos los procesos cliente.
+
+Protocolo: cada mensaje es una cabecera JSON precedida de su longitud (uint32 little-endian)
+seguida de los buffers crudos de los arrays que la cabecera describe en 'arrays'
+([nombre, dtype, forma] en orden). Las peticiones son {'op': 'patch', 'params': {...}} u
+{'op': 'stats'}; una respuesta de error ({'ok': False, 'error': ...}) no lleva arrays.
+"""
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import json
+import socket
+import struct
+
+import numpy as np
+
+from qsn.cache import cache_key
+
+_LENGTH = struct.Struct('<I')
+
+# Parámetros de región admitidos y sus valores por defecto (radius es obligatorio)
+PATCH_DEFAULTS = {
+    'radius': None,
+    'center': None,
+    'window_radius': 1.0,
+    'window_center': None,
+    'dims': 3,
+    'slab_half_width': 0.5,
+    'slab_center': 0.0,
+    'seed': None,
+}
+
+def normalize_params(params):
+    """
+    Completa y valida los parámetros de un parche, con la forma canónica que indexa la caché.
+
+    Lanza:
+    ValueError: Si falta el radio, hay parámetros desconocidos o se pide una semilla con dims
+        distinto de 3 (el autómata sólo tiene estados para tetraedros).
+    """
+    unknown = set(params) - set(PATCH_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Parámetros de parche desconocidos: {sorted(unknown)}")
+    params = dict(PATCH_DEFAULTS, **params)
+    if params['radius'] is None:
+        raise ValueError("Falta el radio del parche")
+    params['dims'] = int(params['dims'])
+    for name in ('radius', 'window_radius', 'slab_half_width', 'slab_center'):
+        params[name] = float(params[name])
+    for name, size in (('center', params['dims']), ('window_center', 4)):
+        value = params[name]
+        params[name] = [0.0] * size if value is None else [float(v) for v in np.reshape(value, size)]
+    if params['seed'] is not None:
+        if params['dims'] != 3:
+            raise ValueError(f"La semilla sólo se admite con dims=3: dims={params['dims']}")
+        params['seed'] = int(params['seed'])
+    return params
+
+def region_params(params):
+    """Parámetros que determinan la geometría del parche (todos menos la semilla)."""
+    return {name: value for name, value in params.items() if name != 'seed'}
+
+def initial_states(simplices, seed):
+    """Estados iniciales del autómata para los tetraedros (T, 4) de un parche 3D, como uint8 (T,)."""
+    from qsn.automaton import QSNAutomaton
+
+    return QSNAutomaton(simplices, seed=seed).states.astype(np.uint8)
+
+def compute_patch(params):
+    """
+    Calcula un parche: corte y proyección, tetraedrización y, con semilla, estados iniciales.
+
+    Retorna:
+    dict: {'points': (P, dims) float64, 'simplices': (T, dims + 1) int64} y 'states' (T,) uint8
+        si params tiene una semilla distinta de None.
+    """
+    from qsn.cut_project import cut_and_project
+    from qsn.geometry import generate_tetrahedra
+
+    # cut_and_project ya descarta los puntos de E8 que coinciden en el espacio físico 3D
+    region = region_params(params)
+    points = np.concatenate([np.empty((0, region['dims']))] + list(cut_and_project(**region)))
+    points, simplices = generate_tetrahedra(points, tiled=len(points) > 200_000)
+    patch = {'points': np.asarray(points, dtype=float),
+             'simplices': np.asarray(simplices, dtype=np.int64).reshape(-1, region['dims'] + 1)}
+    if params.get('seed') is not None:
+        patch['states'] = initial_states(patch['simplices'], params['seed'])
+    return patch
+
+def _encode(header, arrays=None):
+    """Serializa un mensaje: longitud, cabecera JSON y los buffers de los arrays."""
+    arrays = {name: np.ascontiguousarray(array) for name, array in (arrays or {}).items()}
+    header = dict(header, arrays=[[name, array.dtype.str, list(array.shape)] for name, array in arrays.items()])
+    payload = json.dumps(header).encode()
+    return [_LENGTH.pack(len(payload)), payload] + [memoryview(array).cast('B') for array in arrays.values()]
+
+def _decode_arrays(header, buffer):
+    """Reconstruye los arrays de un mensaje sobre su buffer, sin copiarlos."""
+    arrays, offset = {}, 0
+    for name, dtype, shape in header.get('arrays', []):
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset).reshape(shape)
+        offset += count * dtype.itemsize
+    return arrays
+
+def _payload_size(header):
+    return sum(int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+               for _, dtype, shape in header.get('arrays', []))
+
+class PatchService:
+    """
+    Servidor de parches con caché LRU en memoria y coalescencia de peticiones concurrentes.
+
+    La caché guarda la geometría por región (parámetros normalizados sin la semilla): la semilla
+    sólo cambia los estados iniciales, que se derivan en cada petición de los tetraedros
+    guardados. Las peticiones de la misma región que llegan mientras se calcula comparten el
+    mismo futuro, así que cada región se calcula una sola vez. Los cálculos corren en un pool de
+    procesos para no bloquear el bucle de eventos.
+
+    Parámetros:
+    max_bytes (int): Tamaño máximo de la caché en memoria. Por defecto es 1 GiB.
+    max_workers (int | None): Procesos del pool de cálculo.
+    disk_cache (ArtifactCache | None): Caché en disco opcional detrás de la de memoria.
+    """
+
+    def __init__(self, max_bytes=2**30, max_workers=None, disk_cache=None):
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.disk_cache = disk_cache
+        self._cache = OrderedDict()  # clave -> (parche, bytes), del menos al más reciente
+        self._bytes = 0
+        self._inflight = {}
+        self._executor = None
+        self.stats = {'requests': 0, 'hits': 0, 'coalesced': 0, 'computed': 0, 'evicted': 0}
+
+    def _remember(self, key, patch):
+        size = sum(array.nbytes for array in patch.values())
+        if size > self.max_bytes:
+            return
+        self._cache[key] = (patch, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted) = self._cache.popitem(last=False)
+            self._bytes -= evicted
+            self.stats['evicted'] += 1
+
+    async def _compute(self, region):
+        """Lee la geometría de la caché en disco o la calcula en el pool, sin bloquear el bucle."""
+        loop = asyncio.get_running_loop()
+        if self.disk_cache is not None:
+            patch = await loop.run_in_executor(None, self.disk_cache.get, 'patch_service', region)
+            if patch is not None:
+                return patch
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.max_workers)
+        patch = await loop.run_in_executor(self._executor, compute_patch, region)
+        self.stats['computed'] += 1
+        if self.disk_cache is not None:
+            await loop.run_in_executor(None, lambda: self.disk_cache.put('patch_service', region, **patch))
+        return patch
+
+    async def get_patch(self, params):
+        """Devuelve el parche de `params`: la geometría cacheada (o en cálculo) y, con semilla, sus estados."""
+        params = normalize_params(params)
+        self.stats['requests'] += 1
+        patch = await self._geometry(region_params(params))
+        if params['seed'] is None:
+            return patch
+        states = await asyncio.get_running_loop().run_in_executor(None, initial_states, patch['simplices'],
+                                                                  params['seed'])
+        return dict(patch, states=states)
+
+    async def _geometry(self, region):
+        """Geometría de una región, desde la caché, uniéndose a un cálculo en curso o calculándola."""
+        key = cache_key('patch_service', region)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats['hits'] += 1
+            return self._cache[key][0]
+        if key in self._inflight:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(self._inflight[key])
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            patch = {name: np.asarray(array) for name, array in (await self._compute(region)).items()}
+            self._remember(key, patch)
+            future.set_result(patch)
+            return patch
+        except BaseException as e:
+            future.set_exception(e)
+            # Recoger la excepción aunque ninguna otra petición espere este futuro
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _handle(self, reader, writer):
+        """Atiende las peticiones de una conexión hasta que el cliente la cierra."""
+        try:
+            while True:
+                try:
+                    length, = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+                except asyncio.IncompleteReadError:
+                    break
+                payload = await reader.readexactly(length)
+                try:
+                    request = json.loads(payload)
+                    if not isinstance(request, dict):
+                        raise ValueError("La petición debe ser un objeto JSON")
+                    if request.get('op') == 'patch':
+                        message = _encode({'ok': True}, await self.get_patch(request.get('params', {})))
+                    elif request.get('op') == 'stats':
+                        message = _encode(dict(self.stats, bytes=self._bytes, entries=len(self._cache)))
+                    else:
+                        raise ValueError(f"Operación desconocida: {request.get('op')!r}")
+                except Exception as e:
+                    message = _encode({'ok': False, 'error': f"{type(e).__name__}: {e}"})
+                writer.writelines(message)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, path=None, host='127.0.0.1', port=8765):
+        """Sirve en el socket Unix `path` o, si es None, en host:port, hasta que se cancele."""
+        if path is not None:
+            server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            server = await asyncio.start_server(self._handle, host=host, port=port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+
+class PatchClient:
+    """
+    Cliente bloqueante del servicio de parches, para scripts, notebooks y procesos por lotes.
+
+    Parámetros:
+    path (str | None): Socket Unix del servidor. Si es None se usa host:port.
+    host (str): Dirección del servidor TCP. Por defecto 127.0.0.1.
+    port (int): Puerto del servidor TCP. Por defecto 8765.
+    """
+
+    def __init__(self, path=None, host='127.0.0.1', port=8765):
+        if path is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(path)
+        else:
+            self._socket = socket.create_connection((host, port))
+
+    def _receive(self, size):
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        while view:
+            received = self._socket.recv_into(view)
+            if not received:
+                raise ConnectionError("El servidor de parches cerró la conexión")
+            view = view[received:]
+        return buffer
+
+    def _request(self, header):
+        self._socket.sendall(b''.join(bytes(part) for part in _encode(header)))
+        length, = _LENGTH.unpack(self._receive(_LENGTH.size))
+        response = json.loads(self._receive(length))
+        if 'error' in response:
+            raise RuntimeError(f"Error del servidor de parches: {response['error']}")
+        return response, _decode_arrays(response, self._receive(_payload_size(response)))
+
+    def get_patch(self, radius, **params):
+        """
+        Pide un parche al servidor (ver PATCH_DEFAULTS para los parámetros).
+
+        Retorna:
+        dict: {'points', 'simplices'} y 'states' si se pasa una semilla.
+        """
+        return self._request({'op': 'patch', 'params': dict(params, radius=radius)})[1]
+
+    def stats(self):
+        """Contadores del servidor: peticiones, aciertos, coalescidas, calculadas, expulsadas y bytes."""
+        response, _ = self._request({'op': 'stats'})
+        response.pop('arrays', None)
+        return response
+
+    def close(self):
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
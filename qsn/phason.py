@@ -0,0 +1,497 @@
+"""
+Actualizaciones incrementales de fasón: desplazar la ventana de aceptación en el espacio
+perpendicular sin recalcular ni retriangular todo el parche.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from qsn.cut_project import cut_and_project, project_perpendicular
+from qsn.exact import ExactPointIndex, deduplicate, hash_rows, zphi_project
+from qsn.tetrahedralize import circumspheres
+
+_FACES = np.array([[1, 2, 3], [0, 2, 3], [0, 1, 3], [0, 1, 2]])
+_TOLERANCE = 1e-9  # Holgura relativa de la prueba de circunesfera
+_JITTER = 1e-7  # Amplitud de la perturbación fija de los vértices
+
+@dataclass
+class PhasonUpdate:
+    """Cambios producidos por un desplazamiento de la ventana."""
+    entered: np.ndarray  # Puntos que entran en la ventana (índices de candidato)
+    left: np.ndarray  # Puntos que salen (índices de candidato anteriores a `remap`)
+    removed_cells: np.ndarray  # Identificadores de las celdas eliminadas
+    added_cells: np.ndarray  # Identificadores de las celdas nuevas (reutilizan los liberados)
+    full: bool  # True si se ha retriangulado todo el parche
+    remap: np.ndarray = None  # Índice nuevo de cada candidato anterior (-1 si sale), si se regeneraron
+    error: str = None  # Mensaje de Qhull si falló la retriangulación completa y se conservó la anterior
+
+    @property
+    def changed_cells(self):
+        """Identificadores de todas las celdas afectadas, ordenados."""
+        return np.union1d(self.removed_cells, self.added_cells)
+
+def _faces(simplices):
+    """Caras ordenadas (4T, 3) de cada tetraedro; la fila 4t + k es la opuesta a su vértice k."""
+    return np.sort(simplices[:, _FACES], axis=2).reshape(-1, 3)
+
+def _orientation(points, faces, apexes):
+    """Signo del volumen orientado de cada cara (K, 3) con su vértice `apexes` (K,)."""
+    corners = points[faces]
+    edges = np.stack([corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0],
+                      points[apexes] - corners[:, 0]], axis=1)
+    return np.sign(np.linalg.det(edges))
+
+class PhasonPatch:
+    """
+    Parche 3D de la QSN cuya ventana de aceptación se desplaza de forma incremental.
+
+    Los candidatos se generan una vez con una ventana ampliada en `margin` y se indexan por la
+    holgura | |x_perp - c_ref| - R | respecto a un centro de referencia: al mover la ventana de
+    c a c', sólo los candidatos con holgura <= max(|c - c_ref|, |c' - c_ref|) pueden cambiar de
+    estado, y se obtienen con una búsqueda binaria sobre la holgura ordenada. La referencia se
+    renueva cuando esa capa supera `rebase_fraction` de los candidatos.
+
+    Cada desplazamiento sólo retriangula la cavidad: las celdas que tocan un punto que sale, las
+    que tienen en su circunesfera un punto que entra y las caras del casco que ve un punto que
+    entra por fuera. Las celdas conservan su identificador entre actualizaciones y los
+    identificadores liberados se reutilizan. La triangulación es la de Delaunay de los vértices
+    con una perturbación fija de 1e-7 (los grupos cosféricos del cuasicristal la hacen ambigua),
+    así que la local y la global coinciden. Si la cavidad es demasiado grande o no encaja con su
+    frontera, se retriangula todo el parche conservando los identificadores de las celdas que no
+    cambian. Si la ventana se aleja más de `margin` del centro de los candidatos, se regeneran.
+
+    Parámetros:
+    radius (float): Radio del parche en el espacio físico.
+    window_radius (float): Radio de la ventana de aceptación. Por defecto es 1.0.
+    window_center (array | None): Centro inicial de la ventana (4,). Por defecto, el origen.
+    margin (float): Desplazamiento máximo sin regenerar los candidatos. Por defecto es 0.25.
+    center (array | None): Centro del parche en el espacio físico (3,).
+    slab_half_width (float): Semiancho de la sección 3D. Por defecto es 0.5.
+    slab_center (float): Posición de la sección 3D sobre el eje x0. Por defecto es 0.0.
+    rebase_fraction (float): Fracción de candidatos en la capa que fuerza a renovar la referencia.
+    max_cavity_fraction (float): Fracción de celdas a partir de la cual se retriangula todo.
+    """
+
+    def __init__(self, radius, window_radius=1.0, window_center=None, margin=0.25, center=None,
+                 slab_half_width=0.5, slab_center=0.0, rebase_fraction=0.05, max_cavity_fraction=0.25):
+        self.radius = radius
+        self.window_radius = window_radius
+        self.margin = margin
+        self.center = center
+        self.slab_half_width = slab_half_width
+        self.slab_center = slab_center
+        self.rebase_fraction = rebase_fraction
+        self.max_cavity_fraction = max_cavity_fraction
+        self.window_center = np.zeros(4) if window_center is None else \
+            np.asarray(window_center, dtype=float).reshape(4)
+        self.stats = {'updates': 0, 'local': 0, 'full': 0, 'regenerations': 0}
+        self._simplices = np.empty((0, 4), dtype=np.int64)
+        self._alive = np.empty(0, dtype=bool)
+        self._centers = np.empty((0, 3))
+        self._radii2 = np.empty(0)
+        self._free = []
+        self._incident = {}  # vértice -> celdas vivas que lo contienen
+        self._face_cells = {}  # cara (terna ordenada) -> celdas vivas que la contienen (1 o 2)
+        self._hull = {}  # vértice -> caras del casco convexo que lo contienen
+        self._count = 0
+        self._generate(self.window_center)
+        self._accept(self._inside_window(np.arange(len(self.points)), self.window_center))
+        self._rebase()
+        self._full_update()
+
+    @property
+    def num_cells(self):
+        return self._count
+
+    @property
+    def cell_ids(self):
+        """Identificadores de las celdas vivas, en orden creciente."""
+        return np.flatnonzero(self._alive)
+
+    @property
+    def simplices(self):
+        """Tetraedros vivos, alineados con `cell_ids` (cada vértice es el candidato `representative`)."""
+        return self._simplices[self._alive]
+
+    def _generate(self, window_center):
+        """Genera los candidatos (deduplicados por sus coordenadas exactas) de la ventana ampliada."""
+        from scipy.spatial import cKDTree
+
+        self._lattice_index = ExactPointIndex(8)
+        chunks, lattices = [np.empty((0, 3))], [np.empty((0, 8), dtype=np.int64)]
+        for points, lattice in cut_and_project(self.radius, window_radius=self.window_radius + self.margin,
+                                               window_center=window_center, dims=3,
+                                               slab_half_width=self.slab_half_width, slab_center=self.slab_center,
+                                               return_lattice=True, center=self.center, unique=False):
+            _, new = self._lattice_index.insert(lattice)
+            chunks.append(points[new])
+            lattices.append(lattice[new])
+        self.points = np.concatenate(chunks)
+        self.lattice = np.concatenate(lattices)
+        self.perpendicular = project_perpendicular(self.lattice / 2.0)
+        # Candidatos distintos de E8 pueden coincidir en el espacio físico (sólo difieren en x0): la
+        # triangulación usa como vértice el de menor índice de cada grupo
+        physical = zphi_project(self.lattice)[:, 1:].reshape(-1, 6)
+        unique, inverse = deduplicate(physical)
+        self.representative = unique[inverse]
+        # El parche tiene muchos grupos cosféricos y su Delaunay no es único: una perturbación
+        # mínima y fija por posición exacta hace que la triangulación local y la global coincidan
+        jitter = np.column_stack([hash_rows(np.column_stack([physical, np.full(len(physical), k)])) >> np.uint64(11)
+                                  for k in range(3)])
+        self._positions = self.points + _JITTER * (jitter / 2.0**53 - 0.5)
+        self._candidate_center = window_center.copy()
+        self._tree = cKDTree(self.points)
+
+    def _accept(self, accepted):
+        self.accepted = accepted
+        self._multiplicity = np.bincount(self.representative[accepted], minlength=len(self.points))
+
+    def _activate(self, entered, left):
+        """Aplica los cambios de aceptación y devuelve los vértices que aparecen y desaparecen."""
+        self.accepted[entered] = True
+        self.accepted[left] = False
+        touched = np.unique(self.representative[np.concatenate([entered, left])])
+        before = self._multiplicity[touched] > 0
+        np.add.at(self._multiplicity, self.representative[entered], 1)
+        np.subtract.at(self._multiplicity, self.representative[left], 1)
+        after = self._multiplicity[touched] > 0
+        return touched[after & ~before], touched[before & ~after]
+
+    def _inside_window(self, ids, window_center):
+        """Misma prueba de aceptación que `cut_and_project` para los candidatos `ids`."""
+        return np.sum((self.perpendicular[ids] - window_center) ** 2, axis=1) <= self.window_radius ** 2
+
+    def _rebase(self):
+        """Ordena los candidatos por su holgura respecto al centro actual de la ventana."""
+        self._reference = self.window_center.copy()
+        distance = np.linalg.norm(self.perpendicular - self._reference, axis=1)
+        slack = np.abs(distance - self.window_radius)
+        self._order = np.argsort(slack, kind='stable')
+        self._slack = slack[self._order]
+
+    def _shell(self, window_center):
+        """Candidatos que pueden cambiar de estado al mover la ventana a `window_center`."""
+        reach = max(np.linalg.norm(self.window_center - self._reference),
+                    np.linalg.norm(window_center - self._reference))
+        count = np.searchsorted(self._slack, reach, side='right')
+        if count > self.rebase_fraction * len(self._order):
+            self._rebase()
+            count = np.searchsorted(self._slack, np.linalg.norm(window_center - self._reference), side='right')
+        return self._order[:count]
+
+    def shift(self, window_center):
+        """
+        Mueve la ventana de aceptación y actualiza los puntos y las celdas afectadas.
+
+        Parámetros:
+        window_center (array): Nuevo centro de la ventana en el espacio perpendicular (4,).
+
+        Retorna:
+        PhasonUpdate: Puntos que entran y salen y celdas eliminadas y añadidas.
+        """
+        window_center = np.asarray(window_center, dtype=float).reshape(4)
+        self.stats['updates'] += 1
+        if np.linalg.norm(window_center - self._candidate_center) > self.margin:
+            return self._regenerate(window_center)
+        shell = self._shell(window_center)
+        inside = self._inside_window(shell, window_center)
+        entered = np.sort(shell[inside & ~self.accepted[shell]])
+        left = np.sort(shell[~inside & self.accepted[shell]])
+        self.window_center = window_center
+        appeared, vanished = self._activate(entered, left)
+        if not len(appeared) and not len(vanished):
+            empty = np.empty(0, dtype=np.int64)
+            return PhasonUpdate(entered, left, empty, empty, False)
+        cavity, cells = self._retriangulate(appeared, vanished)
+        if cells is None:
+            self.stats['full'] += 1
+            removed, added, error = self._full_update()
+            return PhasonUpdate(entered, left, removed, added, True, error=error)
+        self.stats['local'] += 1
+        self._remove_cells(cavity)
+        return PhasonUpdate(entered, left, np.sort(cavity), self._add_cells(cells), False)
+
+    def _regenerate(self, window_center):
+        """Regenera los candidatos alrededor de la ventana y retriangula conservando lo que no cambia."""
+        self.stats['regenerations'] += 1
+        self.stats['full'] += 1
+        previous_lattice, previous_accepted = self.lattice, self.accepted
+        self._generate(window_center)
+        remap = self._lattice_index.lookup(previous_lattice)
+        # Renumerar las celdas vivas; las que pierden un vértice se eliminan en _full_update
+        alive = self.cell_ids
+        renumbered = remap[self._simplices[alive]]
+        self._simplices[alive] = np.where(renumbered >= 0, self.representative[renumbered], -1)
+        self._incident, self._face_cells, self._hull = {}, {}, {}
+        self._index_cells(alive[(self._simplices[alive] >= 0).all(axis=1)])
+        self.window_center = window_center
+        self._accept(self._inside_window(np.arange(len(self.points)), window_center))
+        self._rebase()
+        was_accepted = np.zeros(len(self.points), dtype=bool)
+        was_accepted[remap[previous_accepted & (remap >= 0)]] = True
+        entered = np.flatnonzero(self.accepted & ~was_accepted)
+        left = np.flatnonzero(previous_accepted & ((remap < 0) | ~self.accepted[np.maximum(remap, 0)]))
+        removed, added, error = self._full_update()
+        return PhasonUpdate(entered, left, removed, added, True, remap, error)
+
+    def _nearest_vertex(self, point):
+        """Vértice de la triangulación actual más cercano a `point`, o None si no hay ninguno."""
+        k = 8
+        while True:
+            _, neighbours = self._tree.query(point, k=min(k, len(self.points)))
+            for vertex in self.representative[np.atleast_1d(neighbours)].tolist():
+                if self._incident.get(vertex):
+                    return vertex
+            if k >= len(self.points):
+                return None
+            k *= 4
+
+    def _outer_apex(self, faces):
+        """Vértice opuesto a cada cara del casco (K, 3) en su única celda."""
+        apexes = []
+        for face in map(tuple, faces.tolist()):
+            cell, = self._face_cells[face]
+            apexes.append(next(v for v in self._simplices[cell].tolist() if v not in face))
+        return np.array(apexes, dtype=np.int64)
+
+    def _conflicts(self, vertex):
+        """
+        Celdas cuya circunesfera contiene el vértice nuevo y caras del casco que ve desde fuera
+        (las celdas "fantasma" del punto del infinito), recorridas desde el vértice más cercano.
+
+        El vecino más cercano forma arista de Delaunay con el punto nuevo, así que es vértice de
+        la cavidad, y la cavidad (celdas y fantasmas) es conexa.
+        """
+        point = self._positions[vertex]
+        start = self._nearest_vertex(point)
+        cells, ghosts = set(), set()
+        if start is None:
+            return cells, ghosts
+        tested_cells, tested_ghosts = set(), set()
+        frontier = seen = {start}
+        while frontier:
+            layer = {cell for v in frontier for cell in self._incident.get(v, ())} - tested_cells
+            hull = {face for v in frontier for face in self._hull.get(v, ())} - tested_ghosts
+            tested_cells |= layer
+            tested_ghosts |= hull
+            reached = set()
+            if layer:
+                layer = np.fromiter(layer, dtype=np.int64, count=len(layer))
+                distance2 = np.sum((self._centers[layer] - point) ** 2, axis=1)
+                hit = layer[distance2 <= self._radii2[layer] * (1 + _TOLERANCE)]
+                cells.update(hit.tolist())
+                reached.update(np.unique(self._simplices[hit]).tolist())
+            if hull:
+                faces = np.array(list(hull), dtype=np.int64)
+                outside = _orientation(self._positions, faces, self._outer_apex(faces)) * \
+                    _orientation(self._positions, faces, np.full(len(faces), vertex)) < 0
+                ghosts.update(map(tuple, faces[outside].tolist()))
+                reached.update(np.unique(faces[outside]).tolist())
+            frontier = reached - seen
+            seen = seen | frontier
+        return cells, ghosts
+
+    def _retriangulate(self, appeared, vanished):
+        """
+        Celdas a eliminar y tetraedros que las sustituyen, o (None, None) si hay que retriangular todo.
+        """
+        cavity, ghosts = set(), set()
+        for vertex in vanished.tolist():
+            cavity |= self._incident.get(vertex, set())
+        for vertex in appeared.tolist():
+            cells, faces = self._conflicts(vertex)
+            cavity |= cells
+            ghosts |= faces
+        # Con puntos casi cosféricos la triangulación local puede no encajar: se amplía la cavidad
+        for _ in range(3):
+            if len(cavity) > self.max_cavity_fraction * self._count:
+                break
+            cells = self._local_cells(cavity, ghosts, appeared, vanished)
+            if cells is not None:
+                return np.fromiter(cavity, dtype=np.int64, count=len(cavity)), cells
+            cavity = {cell for vertex in np.unique(self._simplices[list(cavity)]).tolist()
+                      for cell in self._incident[vertex]}
+        return None, None
+
+    def _local_cells(self, cavity, ghosts, appeared, vanished):
+        """
+        Tetraedros de Delaunay que rellenan la cavidad, o None si no encajan con su frontera.
+
+        La frontera de la cavidad son las caras que comparte con celdas que se conservan, las del
+        casco que siguen en él y las caras del casco vistas por un punto nuevo cuya celda se
+        conserva. Se triangulan los vértices de la cavidad y, en esa triangulación, se toman las
+        componentes conexas (sin cruzar la frontera) que tocan el lado interior de alguna cara
+        de la frontera.
+        """
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+        from scipy.spatial import Delaunay
+
+        if not cavity and not ghosts:
+            return None
+        cavity_ids = np.fromiter(cavity, dtype=np.int64, count=len(cavity))
+        old = self._simplices[cavity_ids].reshape(-1, 4)
+        vanished = set(vanished.tolist())
+        boundary, apexes, inner = [], [], []
+        for face, apex in zip(map(tuple, _faces(old).tolist()), old.reshape(-1).tolist()):
+            owners = self._face_cells[face]
+            if owners <= cavity:
+                # Cara interior de la cavidad, o del casco: desaparece si la ve un punto nuevo o
+                # si pierde un vértice
+                if len(owners) == 2 or face in ghosts or not vanished.isdisjoint(face):
+                    continue
+            boundary.append(face)
+            apexes.append(apex)
+            inner.append(1)
+        for face in ghosts:
+            cell, = self._face_cells[face]
+            if cell not in cavity:
+                boundary.append(face)
+                apexes.append(next(v for v in self._simplices[cell].tolist() if v not in face))
+                inner.append(-1)
+        boundary = np.array(boundary, dtype=np.int64).reshape(-1, 3)
+        vertices = np.setdiff1d(np.union1d(np.union1d(old, boundary), appeared), list(vanished))
+        if len(vertices) < 4 or not len(boundary):
+            return None
+        try:
+            local = vertices[Delaunay(self._positions[vertices]).simplices]
+        except Exception:
+            return None
+
+        faces = _faces(local)
+        index = ExactPointIndex(3, capacity=2 * len(faces))
+        face_ids, _ = index.insert(faces)
+        boundary_ids = index.lookup(boundary)
+        if (boundary_ids < 0).any():
+            return None
+        side = np.zeros(len(index))
+        side[boundary_ids] = np.asarray(inner) * _orientation(self._positions, boundary, np.asarray(apexes))
+        on_boundary = side[face_ids] != 0
+        rows = np.flatnonzero(on_boundary)
+        seeds = rows[_orientation(self._positions, faces[rows], local.reshape(-1)[rows]) == side[face_ids[rows]]] // 4
+        rows = np.flatnonzero(~on_boundary)
+        rows = rows[np.argsort(face_ids[rows], kind='stable')]
+        pair = face_ids[rows[1:]] == face_ids[rows[:-1]]
+        graph = coo_matrix((np.ones(int(pair.sum())), (rows[:-1][pair] // 4, rows[1:][pair] // 4)),
+                           shape=(len(local), len(local)))
+        _, labels = connected_components(graph, directed=False)
+        local = local[np.isin(labels, labels[seeds])]
+
+        # Comprobaciones: cada punto nuevo tiene celdas y las caras libres de la región nueva que
+        # no son de la frontera son del casco (no las comparte ninguna celda que se conserva)
+        if not np.isin(appeared, local).all():
+            return None
+        faces, counts = np.unique(_faces(local), axis=0, return_counts=True)
+        free = faces[counts == 1]
+        free = free[index.lookup(free) >= 0]
+        for face in map(tuple, free[~np.isin(index.lookup(free), boundary_ids)].tolist()):
+            if not self._face_cells.get(face, set()) <= cavity:
+                return None
+        return local
+
+    def _full_update(self):
+        """
+        Retriangula todos los puntos aceptados conservando el identificador de las celdas iguales.
+
+        Si Qhull falla se conserva la triangulación anterior (salvo las celdas que perdieron un
+        vértice al regenerar) y se devuelve su mensaje; sin triangulación anterior, el error se
+        propaga.
+
+        Retorna:
+        tuple: (celdas eliminadas, celdas añadidas, mensaje de error de Qhull o None).
+
+        Lanza:
+        QhullError: Si falla la triangulación y no queda ninguna celda que conservar.
+        """
+        from scipy.spatial import Delaunay, QhullError
+
+        # Tras regenerar los candidatos puede haber celdas con vértices perdidos (-1) o repetidas
+        alive = self.cell_ids
+        broken = alive[(self._simplices[alive] < 0).any(axis=1)]
+        self._remove_cells(broken)
+        accepted = np.flatnonzero(self._multiplicity > 0)
+        simplices = np.empty((0, 4), dtype=np.int64)
+        if len(accepted) >= 4:
+            try:
+                simplices = accepted[Delaunay(self._positions[accepted]).simplices]
+            except QhullError as e:
+                if not self._count:
+                    raise
+                return np.sort(broken), np.empty(0, dtype=np.int64), str(e)
+        alive = self.cell_ids
+        previous = ExactPointIndex(4, capacity=2 * len(alive) + 16)
+        ids, first = previous.insert(np.sort(self._simplices[alive], axis=1))
+        match = previous.lookup(np.sort(simplices, axis=1))
+        kept = first & np.isin(ids, match[match >= 0])
+        removed = alive[~kept]
+        self._remove_cells(removed)
+        return np.sort(np.concatenate([broken, removed])), self._add_cells(simplices[match < 0]), None
+
+    def _update_hull(self, faces):
+        """Actualiza el casco con el número final de celdas de cada cara tocada."""
+        for face in faces:
+            owners = self._face_cells.get(face)
+            on_hull = owners is not None and len(owners) == 1
+            for vertex in face:
+                if on_hull:
+                    self._hull.setdefault(vertex, set()).add(face)
+                elif vertex in self._hull:
+                    self._hull[vertex].discard(face)
+                    if not self._hull[vertex]:
+                        del self._hull[vertex]
+
+    def _index_cells(self, ids):
+        """Registra las celdas en la incidencia de vértices, en la de caras y en el casco."""
+        simplices = self._simplices[ids]
+        touched = set()
+        for cell, simplex, faces in zip(ids.tolist(), simplices.tolist(), _faces(simplices).reshape(-1, 4, 3).tolist()):
+            for vertex in simplex:
+                self._incident.setdefault(vertex, set()).add(cell)
+            for face in map(tuple, faces):
+                self._face_cells.setdefault(face, set()).add(cell)
+                touched.add(face)
+        self._update_hull(touched)
+
+    def _remove_cells(self, ids):
+        simplices = self._simplices[ids]
+        touched = set()
+        for cell, simplex, faces in zip(ids.tolist(), simplices.tolist(), _faces(simplices).reshape(-1, 4, 3).tolist()):
+            for vertex in simplex:
+                cells = self._incident.get(vertex)
+                if cells is not None:
+                    cells.discard(cell)
+                    if not cells:
+                        del self._incident[vertex]
+            for face in map(tuple, faces):
+                owners = self._face_cells.get(face)
+                if owners is not None:
+                    owners.discard(cell)
+                    if not owners:
+                        del self._face_cells[face]
+                    touched.add(face)
+        self._update_hull(touched)
+        self._alive[ids] = False
+        self._simplices[ids] = -1
+        self._free.extend(ids.tolist())
+        self._count -= len(ids)
+
+    def _add_cells(self, simplices):
+        """Da de alta tetraedros, reutilizando primero los identificadores libres, y devuelve sus ids."""
+        reused = [self._free.pop() for _ in range(min(len(simplices), len(self._free)))]
+        start = len(self._alive)
+        ids = np.array(reused + list(range(start, start + len(simplices) - len(reused))), dtype=np.int64)
+        if len(ids) and ids.max() >= start:
+            capacity = max(2 * start, int(ids.max()) + 1)
+            self._simplices = np.concatenate([self._simplices, np.full((capacity - start, 4), -1, dtype=np.int64)])
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - start, dtype=bool)])
+            self._centers = np.concatenate([self._centers, np.zeros((capacity - start, 3))])
+            self._radii2 = np.concatenate([self._radii2, np.zeros(capacity - start)])
+            self._free.extend(range(capacity - 1, int(ids.max()), -1))
+        self._simplices[ids] = simplices
+        self._alive[ids] = True
+        self._count += len(ids)
+        centers, radii = circumspheres(self._positions, simplices)
+        self._centers[ids] = centers
+        self._radii2[ids] = radii ** 2
+        self._index_cells(ids)
+        return np.sort(ids)
@@ -0,0 +1,143 @@
+"""Índice espacial sobre nubes de puntos proyectadas de la QSN."""
+import numpy as np
+
+class QSNPointIndex:
+    """
+    Índice KD sobre puntos proyectados con consultas por lotes e inserción incremental.
+
+    Los puntos se guardan en varios KD-trees de tamaños geométricamente decrecientes
+    (método logarítmico de Bentley-Saxe): insertar un bloque construye un árbol nuevo y sólo
+    fusiona los árboles de tamaño comparable, por lo que cada punto se reindexa O(log n) veces.
+    Las consultas recorren todos los árboles y devuelven índices globales en orden de inserción.
+
+    Parámetros:
+    points (array | None): Puntos iniciales, forma (N, D).
+    leafsize (int): Tamaño de hoja de los KD-trees. Por defecto es 16.
+    """
+
+    def __init__(self, points=None, leafsize=16):
+        self.leafsize = leafsize
+        self._chunks = []
+        self._trees = []  # Lista de (árbol, índices globales), de mayor a menor
+        self._size = 0
+        if points is not None:
+            self.insert(points)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def points(self):
+        """Todos los puntos indexados, en orden de inserción."""
+        if not self._chunks:
+            return np.empty((0, 0))
+        if len(self._chunks) > 1:
+            self._chunks = [np.concatenate(self._chunks)]
+        return self._chunks[0]
+
+    def insert(self, points):
+        """
+        Inserta un bloque de puntos en el índice.
+
+        Parámetros:
+        points (array): Puntos nuevos, forma (M, D).
+
+        Retorna:
+        np.ndarray: Índices globales asignados a los puntos nuevos.
+        """
+        from scipy.spatial import cKDTree
+
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        ids = np.arange(self._size, self._size + len(points))
+        if not len(points):
+            return ids
+        self._chunks.append(points)
+        self._size += len(points)
+
+        # Fusiona con los árboles menores hasta que el nuevo sea al menos el doble de pequeño
+        data, index = points, ids
+        while self._trees and self._trees[-1][1].size <= 2 * index.size:
+            tree, tree_index = self._trees.pop()
+            data = np.concatenate([tree.data, data])
+            index = np.concatenate([tree_index, index])
+        self._trees.append((cKDTree(data, leafsize=self.leafsize), index))
+        return ids
+
+    def _pairs(self, queries, radius):
+        """Pares (consulta, punto, distancia) con distancia <= radius sobre todos los árboles."""
+        from scipy.spatial import cKDTree
+
+        query_tree = cKDTree(queries, leafsize=self.leafsize)
+        rows, cols, dists = [], [], []
+        for tree, index in self._trees:
+            pairs = query_tree.sparse_distance_matrix(tree, radius, output_type='ndarray')
+            rows.append(pairs['i'])
+            cols.append(index[pairs['j']])
+            dists.append(pairs['v'])
+        if not rows:
+            return np.empty(0, np.intp), np.empty(0, np.intp), np.empty(0)
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(dists)
+
+    @staticmethod
+    def _to_csr(num_queries, rows, cols, dists):
+        order = np.lexsort((cols, rows))
+        offsets = np.zeros(num_queries + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_queries), out=offsets[1:])
+        return offsets, cols[order], dists[order]
+
+    def radius_query(self, queries, radius):
+        """
+        Busca, para cada consulta, los puntos a distancia <= radius.
+
+        Parámetros:
+        queries (array): Puntos de consulta, forma (M, D).
+        radius (float): Radio de búsqueda.
+
+        Retorna:
+        tuple: (offsets (M+1,), índices, distancias) en formato CSR: los vecinos de la consulta
+            q son indices[offsets[q]:offsets[q+1]], ordenados por índice.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=float))
+        return self._to_csr(len(queries), *self._pairs(queries, radius))
+
+    def shell_query(self, queries, radius, tol=1e-9):
+        """
+        Busca, para cada consulta, los puntos a distancia radius +- tol (capa de vecinos).
+
+        Parámetros:
+        queries (array): Puntos de consulta, forma (M, D).
+        radius (float): Distancia de la capa.
+        tol (float): Tolerancia absoluta sobre la distancia. Por defecto es 1e-9.
+
+        Retorna:
+        tuple: (offsets (M+1,), índices, distancias) en formato CSR.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=float))
+        rows, cols, dists = self._pairs(queries, radius + tol)
+        keep = dists >= radius - tol
+        return self._to_csr(len(queries), rows[keep], cols[keep], dists[keep])
+
+    def knn(self, queries, k=1):
+        """
+        Busca los k vecinos más cercanos de cada consulta.
+
+        Parámetros:
+        queries (array): Puntos de consulta, forma (M, D).
+        k (int): Número de vecinos. Por defecto es 1.
+
+        Retorna:
+        tuple: (distancias (M, k), índices (M, k)), ordenados por distancia. Si hay menos de k
+            puntos, las posiciones sobrantes tienen distancia inf e índice len(self).
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=float))
+        dists, ids = [], []
+        for tree, index in self._trees:
+            d, i = tree.query(queries, k=k)
+            d, i = d.reshape(len(queries), k), i.reshape(len(queries), k)
+            ids.append(np.where(i < len(index), index[np.minimum(i, len(index) - 1)], self._size))
+            dists.append(d)
+        if not dists:
+            return np.full((len(queries), k), np.inf), np.full((len(queries), k), self._size)
+        dists, ids = np.hstack(dists), np.hstack(ids)
+        order = np.argsort(dists, axis=1, kind='stable')[:, :k]
+        return np.take_along_axis(dists, order, axis=1), np.take_along_axis(ids, order, axis=1)
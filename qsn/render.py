@@ -0,0 +1,112 @@
+"""Renderizado por lotes de tetraedros con una sola colección de matplotlib (importado al dibujar)."""
+import numpy as np
+
+from qsn.instrument import RENDER, stage
+
+# Caras de un tetraedro como índices locales de sus 4 vértices
+TETRAHEDRON_FACES = np.array([
+    [0, 1, 2],
+    [0, 1, 3],
+    [0, 2, 3],
+    [1, 2, 3]
+])
+
+def tetrahedra_faces(simplices, boundary_only=False):
+    """
+    Construye las caras de todos los tetraedros como un único arreglo de índices.
+
+    Parámetros:
+    simplices (array): Índices de los vértices de cada tetraedro, forma (N, 4).
+    boundary_only (bool): Si es True, descarta las caras compartidas por dos tetraedros y devuelve
+        sólo la superficie exterior. Por defecto es False.
+
+    Retorna:
+    np.ndarray: Arreglo (F, 3) con los índices de los vértices de cada cara.
+    """
+    simplices = np.asarray(simplices, dtype=np.intp).reshape(-1, 4)
+    faces = simplices[:, TETRAHEDRON_FACES].reshape(-1, 3)
+    if boundary_only and len(faces):
+        _, inverse, counts = np.unique(np.sort(faces, axis=1), axis=0,
+                                       return_inverse=True, return_counts=True)
+        faces = faces[counts[inverse.ravel()] == 1]
+    return faces
+
+def plot_tetrahedra(ax, points, simplices, color='b', alpha=0.3, boundary_only=False,
+                    rasterized=False, label=None):
+    """
+    Visualiza todos los tetraedros en 3D con una sola Poly3DCollection.
+
+    Parámetros:
+    ax (Axes3D): Eje 3D donde dibujar.
+    points (array): Coordenadas de los vértices, forma (P, 3).
+    simplices (array): Índices de los vértices de cada tetraedro, forma (N, 4).
+    color: Color de las caras. Por defecto es 'b'.
+    alpha (float): Transparencia de las caras. Por defecto es 0.3.
+    boundary_only (bool): Dibuja sólo las caras exteriores. Por defecto es False.
+    rasterized (bool): Rasteriza la colección al exportar a formatos vectoriales (SVG/PDF).
+    label (str | None): Etiqueta para la leyenda.
+
+    Retorna:
+    Poly3DCollection: La colección añadida al eje.
+    """
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+    faces = tetrahedra_faces(simplices, boundary_only=boundary_only)
+    with stage(RENDER, items=len(faces), function=f"{__name__}.plot_tetrahedra"):
+        collection = Poly3DCollection(np.asarray(points)[faces], facecolors=color, alpha=alpha,
+                                      linewidths=0, label=label)
+        collection.set_rasterized(rasterized)
+        ax.add_collection3d(collection)
+    return collection
+
+def show_or_save(fig, output=None, dpi=150):
+    """
+    Muestra la figura o, en modo sin pantalla, la escribe en disco sin llamar a `plt.show()`.
+
+    Parámetros:
+    fig (Figure): Figura a mostrar o exportar.
+    output (str | None): Ruta de salida; el formato (PNG, SVG, ...) se deduce de la extensión.
+        Si es None se llama a `plt.show()`.
+    dpi (int): Resolución para formatos rasterizados. Por defecto es 150.
+    """
+    import matplotlib.pyplot as plt
+
+    if output is None:
+        plt.show()
+        return
+    # Sólo se mide la exportación: con plt.show() el tiempo dependería de la ventana interactiva
+    with stage(RENDER, function=f"{__name__}.show_or_save"):
+        fig.savefig(output, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+def plot_flower_of_life(ax2d, centers, radius=0.3, color='r', alpha=0.2, rasterized=False):
+    """
+    Dibuja la Flor de la Vida con una sola EllipseCollection de círculos entrelazados.
+
+    Parámetros:
+    ax2d (Axes): Eje 2D donde dibujar.
+    centers (array): Centros de los círculos, forma (M, 2).
+    radius (float): Radio de los círculos en unidades de datos. Por defecto es 0.3.
+    color: Color de relleno. Por defecto es 'r'.
+    alpha (float): Transparencia. Por defecto es 0.2.
+    rasterized (bool): Rasteriza la colección al exportar a formatos vectoriales (SVG/PDF), para
+        que decenas de miles de círculos no produzcan un archivo enorme.
+
+    Retorna:
+    EllipseCollection: La colección añadida al eje.
+    """
+    from matplotlib.collections import EllipseCollection
+
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    with stage(RENDER, items=len(centers), function=f"{__name__}.plot_flower_of_life"):
+        diameters = np.full(len(centers), 2 * radius)
+        collection = EllipseCollection(diameters, diameters, np.zeros(len(centers)), units='xy',
+                                       offsets=centers, offset_transform=ax2d.transData,
+                                       facecolors=color, alpha=alpha, linewidths=0)
+        collection.set_rasterized(rasterized)
+        ax2d.add_collection(collection, autolim=False)
+        if len(centers):
+            ax2d.update_datalim(np.concatenate([centers.min(axis=0) - radius, centers.max(axis=0) + radius]
+                                               ).reshape(2, 2))
+            ax2d.autoscale_view()
+    return collection
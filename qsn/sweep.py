@@ -0,0 +1,86 @@
+"""Barridos de parámetros de los circuitos de correlación con plantillas transpiladas una sola vez."""
+from functools import lru_cache
+
+import numpy as np
+
+from qsn.instrument import CIRCUIT_RUN, CIRCUIT_TRANSPILE, instrumented, stage
+from qsn.ising import diagonal_ising, sample_ising
+
+# Máximo de bits clásicos para el tensor de cuentas denso (2**n columnas)
+MAX_COUNT_BITS = 24
+
+@lru_cache(maxsize=64)
+def _template(builder, num_qubits, interactions, options):
+    """Plantilla parametrizada, su versión transpilada y el simulador, cacheados por grafo y opciones."""
+    from qiskit import transpile
+    from qiskit.circuit import Parameter
+    from qiskit_aer import AerSimulator
+
+    theta = Parameter('theta')
+    qc = builder(num_qubits, [tuple(edge) for edge in interactions], theta)
+    simulator = AerSimulator(**dict(options))
+    with stage(CIRCUIT_TRANSPILE, items=num_qubits, function=f"{__name__}._template"):
+        transpiled = transpile(qc, simulator)
+    return qc, transpiled, theta, simulator
+
+def clear_template_cache():
+    """Vacía la caché de plantillas transpiladas."""
+    _template.cache_clear()
+
+@instrumented(CIRCUIT_RUN, items=lambda result: int(result[0].sum()))
+def sweep_counts(builder, num_qubits, interactions, thetas, repetitions=1, shots=1000, seed=None,
+                 **backend_options):
+    """
+    Ejecuta un barrido de ángulos de acoplamiento sobre un grafo de interacción.
+
+    La plantilla `builder(num_qubits, interactions, theta)` se construye con un Parameter y se
+    transpila una sola vez por (builder, grafo, opciones del simulador); todos los ángulos y
+    repeticiones se envían a AerSimulator en un único trabajo con `parameter_binds`. Si la
+    plantilla es un circuito de Ising diagonal (ver `qsn.ising`) se muestrea directamente en NumPy.
+
+    Parámetros:
+    builder (callable): Constructor del circuito, p. ej. `create_correlation_circuit`. Debe
+        aceptar un Parameter como ángulo y medir el qubit q en el bit clásico q (measure_all).
+    num_qubits (int): Número de qubits.
+    interactions (list): Pares (i, j) del grafo de interacción.
+    thetas (array): Ángulos de acoplamiento, forma (A,).
+    repetitions (int): Repeticiones independientes de cada ángulo.
+    shots (int): Disparos por experimento. Por defecto es 1000.
+    seed (int | None): Semilla base del barrido.
+    **backend_options: Opciones de AerSimulator (method, device...), parte de la clave de caché.
+
+    Retorna:
+    tuple: (cuentas (repetitions, A, 2**num_clbits) de int64 indexadas por el resultado leído
+        como entero, semillas (repetitions, A) usadas en cada experimento).
+    """
+    thetas = np.atleast_1d(np.asarray(thetas, dtype=float))
+    interactions = tuple(tuple(int(q) for q in edge) for edge in interactions)
+    options = tuple(sorted(backend_options.items()))
+    qc, transpiled, theta, simulator = _template(builder, num_qubits, interactions, options)
+    if qc.num_clbits > MAX_COUNT_BITS:
+        raise ValueError(f"Demasiados bits clásicos para un tensor de cuentas denso: {qc.num_clbits}")
+    counts = np.zeros((repetitions, len(thetas), 2 ** qc.num_clbits), dtype=np.int64)
+
+    terms = diagonal_ising(qc.assign_parameters({theta: thetas[0]})) if len(thetas) else None
+    if terms is not None:
+        # Las fases no cambian la distribución medida, así que basta muestrear una vez por experimento
+        weights = np.zeros(terms.num_qubits, dtype=np.int64)
+        for qubit, clbit in terms.measured:
+            weights[qubit] = 1 << clbit
+        seeds = np.random.SeedSequence(seed).generate_state(repetitions * len(thetas)).reshape(repetitions, -1)
+        for index in np.ndindex(*seeds.shape):
+            outcomes = sample_ising(terms, shots, int(seeds[index])) @ weights
+            counts[index] = np.bincount(outcomes, minlength=counts.shape[2])
+        return counts, seeds
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0] >> 1)
+    result = simulator.run([transpiled] * repetitions, parameter_binds=[{theta: thetas.tolist()}] * repetitions,
+                           shots=shots, seed_simulator=seed).result()
+    seeds = np.empty((repetitions, len(thetas)), dtype=np.int64)
+    for i, experiment in enumerate(result.results):
+        index = np.unravel_index(i, seeds.shape)
+        seeds[index] = experiment.seed_simulator
+        for key, value in result.data(i)['counts'].items():
+            counts[index + (int(key, 16),)] = value
+    return counts, seeds
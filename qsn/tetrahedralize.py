@@ -0,0 +1,385 @@
+"""Tetraedrización de Delaunay por bloques solapados, en paralelo sobre un pool de procesos."""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import itertools
+import os
+
+import numpy as np
+
+from qsn.exact import ExactPointIndex
+
+@dataclass
+class BlockFailure:
+    """Fallo de un bloque de la tetraedrización por bloques."""
+    block: tuple
+    num_points: int
+    kind: str  # 'qhull': falló Delaunay; 'unverified': tetraedros no vacíos; 'hole': huecos al coser;
+    # 'degenerate': tetraedros de volumen nulo descartados
+    message: str
+    num_unverified: int = 0  # Tetraedros o caras afectados
+
+def circumspheres(points, simplices):
+    """
+    Calcula los circuncentros y circunradios de los tetraedros de forma vectorizada.
+
+    Los tetraedros degenerados (volumen nulo) devuelven su centroide y radio infinito.
+
+    Retorna:
+    tuple: (centros (M, 3), radios (M,)).
+    """
+    vertices = points[simplices]
+    edges = vertices[:, 1:] - vertices[:, :1]
+    rhs = np.sum(edges ** 2, axis=2) / 2
+    degenerate = np.linalg.det(edges) == 0
+    safe = np.where(degenerate[:, None, None], np.eye(3), edges)
+    with np.errstate(all='ignore'):
+        offsets = np.linalg.solve(safe, rhs[:, :, None])[:, :, 0]
+        radii = np.linalg.norm(offsets, axis=1)
+    degenerate |= ~np.isfinite(radii)
+    centers = np.where(degenerate[:, None], vertices.mean(axis=1), vertices[:, 0] + offsets)
+    radii = np.where(degenerate, np.inf, radii)
+    return centers, radii
+
+# Vértices de la cara opuesta a cada vértice local (la cara k de tri.neighbors)
+_FACE_VERTICES = np.array([[1, 2, 3], [0, 2, 3], [0, 1, 3], [0, 1, 2]])
+
+def _block_of(centers, lo, size, num_blocks):
+    """Índice de bloque de cada centro, recortado a la rejilla (los externos van al bloque del borde)."""
+    cell = np.clip(np.floor((centers - lo) / size), 0, np.asarray(num_blocks) - 1)
+    return cell.astype(np.int64)
+
+def _triangulate_block(blocks, points, ids, lo, size, num_blocks, reach_lo, reach_hi, seeds=None):
+    """
+    Triangula unos puntos (un bloque con su halo, o la zona de un hueco) y reparte los tetraedros
+    entre los bloques de `blocks` según su centroide.
+
+    Un tetraedro de Delaunay global cuyos cuatro vértices están en el bloque o su halo también
+    es de Delaunay en la triangulación local (su circunesfera vacía no contiene ningún punto
+    local), así que asignarlo por su centroide, que está a menos de una arista de sus vértices,
+    lo encuentra aunque su circuncentro quede lejos (las láminas del casco convexo).
+
+    Con `blocks` None se reparten entre todos los bloques que reciben algún tetraedro, y con
+    `seeds` sólo se conservan los tetraedros que tocan alguno de esos puntos (la reparación de
+    un hueco).
+
+    Retorna:
+    list: Por bloque, (bloque, tetraedros propios con índices globales, (no comprobados,
+        circunesferas), caras de borde de los tetraedros propios, número de tetraedros
+        degenerados descartados, mensaje de error o None).
+    """
+    from scipy.spatial import Delaunay, QhullError
+
+    if len(points) < 4:
+        # Sin puntos suficientes no se puede triangular: se reintenta con un halo mayor
+        return [(block, None, None, None, 0, None) for block in blocks or [None]]
+    try:
+        tri = Delaunay(points)
+    except QhullError as e:
+        return [(block, None, None, None, 0, str(e)) for block in blocks or [None]]
+    # `ids` está ordenado, así que ordenar los índices locales ordena también los globales y
+    # el centroide de un mismo tetraedro se calcula igual en todos los bloques
+    local = np.sort(tri.simplices, axis=1)
+    owner = np.ravel_multi_index(_block_of(points[local].mean(axis=1), lo, size, num_blocks).T, num_blocks)
+    if seeds is not None:
+        owner[~np.isin(ids[local], seeds).any(axis=1)] = -1
+    centers, radii = circumspheres(points, local)
+    # Los tetraedros planos que Qhull deja al triangular facetas coplanares no se pueden coser:
+    # se descartan y se informan
+    degenerate = ~np.isfinite(radii)
+    # Caras de borde de los tetraedros propios de cada bloque: las que dan a un vecino de otro
+    # bloque, degenerado o inexistente (el orden de las caras es el de tri.simplices)
+    kept = np.where(degenerate, -1, owner)
+    across = np.where(tri.neighbors >= 0, kept[tri.neighbors], -1)
+    border = across != kept[:, None]
+    # Tetraedros agrupados por bloque propietario, para repartirlos sin recorrerlos por cada bloque
+    order = np.argsort(owner, kind='stable')
+    bounds = np.searchsorted(owner[order], np.arange(np.prod(num_blocks) + 1))
+    if blocks is None:
+        blocks = [tuple(int(i) for i in np.unravel_index(flat, num_blocks)) for flat in np.unique(owner[owner >= 0])]
+    results = []
+    for block in blocks:
+        flat = np.ravel_multi_index(block, num_blocks)
+        cells = order[bounds[flat]:bounds[flat + 1]]
+        num_degenerate = int(np.count_nonzero(degenerate[cells]))
+        cells = cells[~degenerate[cells]]
+        # Un tetraedro es de Delaunay global si su circunesfera no sale de la región cubierta por el
+        # halo; los demás (típicamente láminas del casco convexo) se comprueban contra todos los puntos
+        spheres = (centers[cells], radii[cells])
+        inside = np.all((spheres[0] - spheres[1][:, None] >= reach_lo) & (spheres[0] + spheres[1][:, None] <= reach_hi),
+                        axis=1)
+        cell, face = np.nonzero(border[cells])
+        faces = np.sort(ids[tri.simplices[cells[cell][:, None], _FACE_VERTICES[face]]], axis=1)
+        results.append((block, ids[local[cells]], (~inside, (spheres[0][~inside], spheres[1][~inside])), faces,
+                        num_degenerate, None))
+    return results
+
+def tetrahedralize_tiled(points, num_blocks=None, points_per_block=200_000, halo=None,
+                         max_halo_attempts=3, max_workers=None, perturbation=1e-9, seed=0):
+    """
+    Tetraedriza un conjunto grande de puntos dividiéndolo en bloques solapados.
+
+    Cada bloque se triangula junto con un halo de puntos vecinos en un pool de procesos y
+    conserva sólo los tetraedros cuyo centroide cae en su núcleo, de modo que el resultado
+    cosido no tiene duplicados. Los vértices del casco convexo y la capa de puntos pegada a sus
+    caras grandes entran en todos los bloques que tocan, porque las láminas del casco tienen
+    circunesferas enormes.
+
+    Los tetraedros cuya circunesfera sale del halo se verifican contra un KD-tree global y los
+    que no son de Delaunay se quitan. Todo tetraedro verificado es de Delaunay global, así que
+    los fallos sólo dejan huecos, que se detectan con las caras de borde de cada bloque y el
+    casco convexo. Cada hueco se repara triangulando sólo los puntos cercanos a sus vértices
+    (más los que caían dentro de las circunesferas no vacías), con el doble de halo en cada
+    intento; sólo un bloque que no se pudo triangular se repite entero. Nunca se triangula el
+    conjunto completo: lo que sigue fallando tras `max_halo_attempts` intentos se informa en la
+    lista de fallos, igual que los tetraedros de volumen nulo descartados.
+
+    Parámetros:
+    points (array): Puntos 3D, forma (N, 3).
+    num_blocks (int | tuple | None): Bloques por eje. Por defecto se elige según points_per_block.
+    points_per_block (int): Tamaño objetivo de cada bloque si num_blocks es None.
+    halo (float | None): Ancho inicial del halo. Por defecto, tres veces el espaciado medio.
+    max_halo_attempts (int): Número máximo de intentos, duplicando el halo de las reparaciones en cada uno.
+    max_workers (int | None): Procesos del pool. 1 ejecuta todo en el proceso actual.
+    perturbation (float): Amplitud relativa de la perturbación determinista de los puntos, que
+        rompe las degeneraciones coesféricas. 0 la desactiva.
+    seed (int): Semilla de la perturbación.
+
+    Retorna:
+    tuple: (simplices (M, 4) con índices sobre `points`, lista de BlockFailure).
+    """
+    from scipy.spatial import ConvexHull, QhullError, cKDTree
+
+    points = np.asarray(points, dtype=float)
+    if len(points) < 4:
+        return np.empty((0, 4), dtype=np.intp), [
+            BlockFailure((0, 0, 0), len(points), 'qhull', "se necesitan al menos 4 puntos")]
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    extent = np.maximum(hi - lo, 1e-12)
+    if perturbation:
+        # Los cuasicristales tienen muchos puntos coesféricos: una perturbación fija por punto
+        # hace la triangulación única e idéntica en todos los bloques que comparten el punto
+        rng = np.random.default_rng(seed)
+        points = points + rng.uniform(-perturbation, perturbation, points.shape) * extent.max()
+    if num_blocks is None:
+        num_blocks = max(1, int(np.ceil((len(points) / points_per_block) ** (1 / 3))))
+    num_blocks = np.broadcast_to(np.asarray(num_blocks, dtype=np.int64), (3,))
+    size = extent / num_blocks
+    if halo is None:
+        halo = 3 * (np.prod(extent) / len(points)) ** (1 / 3)
+
+    try:
+        hull = ConvexHull(points)
+    except QhullError as e:
+        return np.empty((0, 4), dtype=np.intp), [BlockFailure((0, 0, 0), len(points), 'qhull', str(e))]
+    # Las láminas del casco convexo tienen circunesferas enormes: sus vértices, y la capa de puntos
+    # pegada a cada cara grande del casco, se añaden a los bloques desde el primer intento
+    facets, (layer, layer_bounds) = _hull_layers(points, hull, halo)
+    hull, hull_vertices = np.sort(hull.simplices, axis=1), hull.vertices
+
+    blocks = list(itertools.product(*(range(n) for n in num_blocks)))
+    # Puntos de cada bloque agrupados una sola vez: los recuentos y la selección de cada halo
+    # recorren sólo los bloques que tocan, no todos los puntos por cada bloque
+    home = np.ravel_multi_index(_block_of(points, lo, size, num_blocks).T, num_blocks)
+    members = np.argsort(home, kind='stable')
+    bounds = np.searchsorted(home[members], np.arange(np.prod(num_blocks) + 1))
+    halos = dict.fromkeys(blocks, halo)
+    # Puntos lejanos que cada bloque necesita además de su halo: los que violan sus circunesferas
+    extra = {block: np.empty(0, dtype=np.intp) for block in blocks}
+    # Por bloque: (tetraedros verificados, caras de borde)
+    results, failed, degenerate = {}, {}, {}
+    tree = None
+    if max_workers is None:
+        max_workers = min(len(blocks), os.cpu_count() or 1)
+    executor = ProcessPoolExecutor(max_workers) if max_workers > 1 and len(blocks) > 1 else None
+
+    def far_points(reach_lo, reach_hi):
+        """Vértices del casco y capas de las caras grandes del casco que cruzan la caja dada."""
+        touched = np.flatnonzero(np.all((facets[1] >= reach_lo) & (facets[0] <= reach_hi), axis=1))
+        return np.concatenate([hull_vertices] + [layer[layer_bounds[f]:layer_bounds[f + 1]] for f in touched])
+
+    def num_points(block):
+        flat = np.ravel_multi_index(block, num_blocks)
+        return int(bounds[flat + 1] - bounds[flat])
+
+    try:
+        whole, repairs = blocks, {}
+        for _ in range(max_halo_attempts):
+            jobs = []
+            for block in whole:
+                core_lo = lo + np.asarray(block) * size
+                core_hi = core_lo + size
+                # Fuera de la caja global no hay puntos, así que ahí el halo se extiende sin límite
+                reach_lo = np.where(np.asarray(block) == 0, -np.inf, core_lo - halos[block])
+                reach_hi = np.where(np.asarray(block) == num_blocks - 1, np.inf, core_hi + halos[block])
+                # Sólo se filtran los puntos de los bloques que solapan con el halo
+                first = _block_of(np.maximum(reach_lo, lo)[None], lo, size, num_blocks)[0]
+                last = _block_of(np.minimum(reach_hi, lo + extent)[None], lo, size, num_blocks)[0]
+                near = itertools.product(*(range(i, j + 1) for i, j in zip(first, last)))
+                flats = [np.ravel_multi_index(other, num_blocks) for other in near]
+                ids = np.concatenate([members[bounds[flat]:bounds[flat + 1]] for flat in flats])
+                ids = ids[np.all((points[ids] >= reach_lo) & (points[ids] <= reach_hi), axis=1)]
+                ids = np.unique(np.concatenate([ids, extra[block], far_points(reach_lo, reach_hi)]))
+                jobs.append((block, None, ([block], points[ids], ids, lo, size, num_blocks, reach_lo, reach_hi)))
+            for block, seeds in repairs.items():
+                # Un hueco se repara triangulando sólo los puntos a menos de un halo de sus vértices;
+                # la zona no es una caja, así que todos sus tetraedros se verifican con el KD-tree
+                tree = cKDTree(points) if tree is None else tree
+                near = np.concatenate(tree.query_ball_point(points[seeds], halos[block])).astype(np.intp)
+                zone = points[seeds]
+                far = far_points(zone.min(axis=0) - halos[block], zone.max(axis=0) + halos[block])
+                ids = np.unique(np.concatenate([near, extra[block], far]))
+                jobs.append((block, seeds, (None, points[ids], ids, lo, size, num_blocks,
+                                            np.full(3, np.inf), np.full(3, -np.inf), seeds)))
+            jobs = [(source, seeds, executor.submit(_triangulate_block, *args) if executor else args)
+                    for source, seeds, args in jobs]
+
+            unverified, errors, lost = {}, {}, set()
+            for source, seeds, job in jobs:
+                entries = job.result() if executor else _triangulate_block(*job)
+                if seeds is not None:
+                    # La reparación sustituye, en todos los bloques, los tetraedros que tocan los vértices
+                    # del hueco por los de una sola triangulación local, que son coherentes entre sí
+                    # aunque haya puntos casi coesféricos que Qhull resuelva distinto en cada bloque
+                    empty = (np.empty((0, 4), dtype=np.intp), (np.empty(0, dtype=bool), (np.empty((0, 3)), np.empty(0))),
+                             None, 0, None)
+                    homes = {tuple(int(i) for i in block) for block in _block_of(points[seeds], lo, size, num_blocks)}
+                    present = {block for block, *_ in entries}
+                    entries = entries + [(block, *empty) for block in homes - present]
+                for block, simplices, check, faces, num_degenerate, error in entries:
+                    if error is not None:
+                        errors[source] = error
+                    if simplices is None:
+                        # Sin triangulación (o sin puntos suficientes) se repite el bloque entero
+                        if seeds is None:
+                            results.pop(block, None)
+                            lost.add(block)
+                        continue
+                    if seeds is not None and block not in results:
+                        continue
+                    unchecked, (centers, radii) = check
+                    wrong = np.zeros(len(simplices), dtype=bool)
+                    if len(centers):
+                        tree = cKDTree(points) if tree is None else tree
+                        # Vacía en sentido estricto: se encoge el radio para excluir los puntos sobre la
+                        # esfera. Basta el vecino más cercano al centro, sin contar todos los puntos de
+                        # las circunesferas enormes del casco
+                        distance, _ = tree.query(centers)
+                        bad = distance < radii * (1 - 1e-9)
+                        wrong[np.flatnonzero(unchecked)[bad]] = True
+                        if bad.any():
+                            inside_spheres = tree.query_ball_point(centers[bad], radii[bad])
+                            extra[source] = np.union1d(extra[source], np.concatenate(inside_spheres).astype(np.intp))
+                            unverified[block] = unverified.get(block, 0) + int(np.count_nonzero(bad))
+                    # Todo tetraedro verificado es de Delaunay global: se conserva y los que no lo son
+                    # se quitan, dejando huecos que se reparan en el siguiente intento
+                    if seeds is None:
+                        degenerate[block] = num_degenerate
+                        results[block] = (simplices[~wrong], _toggle_faces(faces, simplices[wrong]))
+                    else:
+                        stitched, border = results[block]
+                        removed = np.isin(stitched, seeds).any(axis=1)
+                        added = simplices[~wrong]
+                        results[block] = (np.concatenate([stitched[~removed], added]),
+                                          _toggle_faces(border, np.concatenate([stitched[removed], added])))
+
+            # Las caras sin pareja que no están en el casco convexo delatan huecos en el cosido
+            holes = _hole_blocks(points, results, hull, lo, size, num_blocks)
+            failed = {}
+            for block in sorted(lost | holes.keys()):
+                if block in errors:
+                    failed[block] = BlockFailure(block, num_points(block), 'qhull', errors[block])
+                elif block in lost:
+                    failed[block] = BlockFailure(block, num_points(block), 'unverified',
+                                                 f"menos de 4 puntos con halo {halos[block]:.3g}", 1)
+                elif unverified.get(block):
+                    failed[block] = BlockFailure(block, num_points(block), 'unverified',
+                                                 f"circunesferas no vacías con halo {halos[block]:.3g}",
+                                                 unverified[block])
+                else:
+                    failed[block] = BlockFailure(block, num_points(block), 'hole',
+                                                 f"{len(holes[block])} vértices de caras sin vecino con halo "
+                                                 f"{halos[block]:.3g}", len(holes[block]))
+            if not failed:
+                break
+            # Cada intento fallido dobla el halo del bloque
+            for block in set(whole) | repairs.keys():
+                if block in failed:
+                    halos[block] *= 2
+            whole = sorted(lost)
+            repairs = {block: vertices for block, vertices in holes.items() if block not in lost}
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    for block, num_degenerate in degenerate.items():
+        # Los huecos que dejan los tetraedros planos descartados se informan por su causa
+        if num_degenerate and (block not in failed or failed[block].kind == 'hole'):
+            failed[block] = BlockFailure(block, num_points(block), 'degenerate',
+                                         f"{num_degenerate} tetraedros de volumen nulo descartados", num_degenerate)
+    failures = [failed[block] for block in sorted(failed)]
+    if not results:
+        return np.empty((0, 4), dtype=np.intp), failures
+    simplices = np.unique(np.concatenate([simplices for simplices, _ in results.values()]), axis=0)
+    return simplices, failures
+
+def _hull_layers(points, hull, halo, chunk_size=2**22):
+    """
+    Capa de puntos bajo cada cara grande del casco convexo (con alguna arista mayor que el halo).
+
+    Bajo una cara que cruza varios bloques (las de un cubo de puntos uniformes cruzan caras
+    enteras) quedan tetraedros planos cuyas circunesferas enormes sólo son vacías con los puntos
+    de toda la capa, a menos de un tercio del halo de esa cara.
+
+    Retorna:
+    tuple: ((mínimo, máximo) de la caja de cada cara grande, (puntos de la capa agrupados por
+        cara, límites de cada grupo)).
+    """
+    corners = points[hull.simplices]
+    edges = np.linalg.norm(corners - np.roll(corners, 1, axis=1), axis=2).max(axis=1)
+    large = np.flatnonzero(edges > halo)
+    normals, offsets = hull.equations[large, :3], hull.equations[large, 3]
+    nearest = np.zeros(len(points), dtype=np.intp)
+    depth = np.full(len(points), np.inf)
+    # Profundidad de cada punto bajo cada cara, por bloques de filas para acotar la memoria
+    step = max(1, chunk_size // max(len(large), 1))
+    for start in range(0, len(points) if len(large) else 0, step):
+        below = -(points[start:start + step] @ normals.T + offsets)
+        nearest[start:start + step] = below.argmin(axis=1)
+        depth[start:start + step] = below.min(axis=1)
+    inner = np.flatnonzero(depth < halo / 3)
+    layer = inner[np.argsort(nearest[inner], kind='stable')]
+    layer_bounds = np.searchsorted(nearest[layer], np.arange(len(large) + 1))
+    return (corners[large].min(axis=1), corners[large].max(axis=1)), (layer, layer_bounds)
+
+def _toggle_faces(faces, simplices):
+    """Caras de borde tras añadir o quitar `simplices` (filas ordenadas): las de multiplicidad impar."""
+    if not len(simplices):
+        return faces
+    faces, counts = np.unique(np.concatenate([faces, simplices[:, _FACE_VERTICES].reshape(-1, 3)]),
+                              axis=0, return_counts=True)
+    return faces[counts % 2 == 1]
+
+def _hole_blocks(points, results, hull, lo, size, num_blocks):
+    """
+    Bloques con caras de borde que no encuentran pareja en otro bloque y no están en el casco convexo.
+
+    Sólo se cruzan las caras de borde de cada bloque (las internas ya están emparejadas).
+
+    Retorna:
+    dict: {bloque: vértices de sus caras sin pareja}.
+    """
+    faces = [faces for _, faces in results.values() if len(faces)]
+    if not faces:
+        return {}
+    faces, counts = np.unique(np.concatenate(faces), axis=0, return_counts=True)
+    # Una cara compartida por más de dos bloques delata tetraedros solapados
+    faces, counts = faces[counts != 2], counts[counts != 2]
+    index = ExactPointIndex(3, capacity=2 * len(hull) + 16)
+    index.insert(hull)
+    faces = faces[(index.lookup(faces) < 0) | (counts != 1)]
+    owners = _block_of(points[faces].mean(axis=1), lo, size, num_blocks)
+    holes = {}
+    for block in np.unique(owners, axis=0):
+        vertices = np.unique(faces[np.all(owners == block, axis=1)])
+        holes[tuple(int(i) for i in block)] = vertices
+    return holes
@@ -0,0 +1,96 @@
+"""Simulación de la transmisión de qubits con dos bits clásicos y randomness compartida."""
+from statistics import NormalDist
+
+import numpy as np
+
+def simulate_qubit_transmission_batch(qubit_states, measurement_bases, num_samples=1000,
+                                      chunk_size=2**18, target_ci=None, confidence=0.95, min_samples=100,
+                                      seed=None):
+    """
+    Simula la transmisión de muchos pares (qubit, base de medición) de forma vectorizada.
+
+    Cada par usa su propia randomness compartida (como llamadas independientes a
+    `simulate_qubit_transmission`), generada por bloques de a lo sumo `chunk_size` muestras en total,
+    de modo que la memoria queda acotada sin importar `num_samples` ni el número de pares.
+
+    Parámetros:
+    qubit_states (array): Estados de los qubits, forma (M, 3).
+    measurement_bases (array): Bases de medición, forma (M, 3) o (3,) para usar la misma en todos.
+    num_samples (int): Número máximo de muestras por par. Por defecto es 1000.
+    chunk_size (int): Número de muestras (sumando todos los pares) generadas por bloque.
+    target_ci (float | None): Semiancho objetivo del intervalo de confianza de Wilson. Si se indica,
+        cada par deja de muestrearse en cuanto su intervalo es menor que este valor.
+    confidence (float): Nivel de confianza del intervalo. Por defecto es 0.95.
+    min_samples (int): Muestras mínimas por par antes de poder parar por `target_ci`. Por defecto es 100.
+    seed (int | np.random.Generator | None): Semilla o generador para reproducibilidad.
+
+    Retorna:
+    tuple: (probabilidades estimadas (M,), número de muestras usadas por par (M,)).
+    """
+    rng = np.random.default_rng(seed)
+    states = np.atleast_2d(np.asarray(qubit_states, dtype=float))
+    bases = np.broadcast_to(np.asarray(measurement_bases, dtype=float), states.shape)
+    num_pairs = len(states)
+
+    result_count = np.zeros(num_pairs, dtype=np.int64)
+    samples_used = np.zeros(num_pairs, dtype=np.int64)
+    active = np.arange(num_pairs)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2) if target_ci is not None else None
+
+    while active.size:
+        # Todos los pares activos llevan el mismo número de muestras
+        n = min(max(chunk_size // active.size, 1), num_samples - samples_used[active[0]])
+        # Randomness compartida del bloque: (pares activos, n, 2, 3)
+        shared_randomness = rng.standard_normal((active.size, n, 2, 3))
+
+        # Alice envía los bits c = [s·lambda >= 0]; Bob invierte lambda cuando c == 0
+        signs = np.where(np.einsum('md,mnkd->mnk', states[active], shared_randomness) >= 0, 1.0, -1.0)
+        # Bob proyecta los vectores ajustados sobre su base de medición
+        p = signs * np.einsum('md,mnkd->mnk', bases[active], shared_randomness)
+        result_count[active] += np.count_nonzero(p[:, :, 0] >= p[:, :, 1], axis=1)
+        samples_used[active] += n
+
+        done = samples_used[active] >= num_samples
+        if z is not None:
+            # Intervalo de Wilson para una proporción: a diferencia del normal, su semiancho no se
+            # anula cuando todas las muestras coinciden (estimación 0 o 1)
+            used = samples_used[active]
+            estimate = result_count[active] / used
+            half_width = z / (1 + z**2 / used) * np.sqrt(estimate * (1 - estimate) / used + z**2 / (4 * used**2))
+            done |= (half_width <= target_ci) & (used >= min_samples)
+        active = active[~done]
+
+    estimated_probability = result_count / np.maximum(samples_used, 1)
+    return estimated_probability, samples_used
+
+def simulate_qubit_transmission(qubit_state, measurement_basis, num_samples=1000, seed=None):
+    """
+    Simula la transmisión de un qubit usando dos bits de comunicación clásica y randomness compartida.
+
+    Parámetros:
+    qubit_state (list): El estado del qubit representado como un vector [x, y, z].
+    measurement_basis (list): La base de medición representada como un vector [mx, my, mz].
+    num_samples (int): Número de muestras para estimar la probabilidad. Por defecto es 1000.
+    seed (int | np.random.Generator | None): Semilla o generador para reproducibilidad.
+
+    Retorna:
+    float: La probabilidad estimada del resultado de la medición.
+    """
+    estimated_probability, _ = simulate_qubit_transmission_batch(
+        [qubit_state], [measurement_basis], num_samples=num_samples, seed=seed)
+    return float(estimated_probability[0])
+
+def transmission_task(params, rng):
+    """
+    Tarea para `qsn.ensemble.run_ensemble`: una realización de la transmisión de un qubit.
+
+    Parámetros:
+    params (dict): 'qubit_state', 'measurement_basis' y opcionalmente 'num_samples'.
+    rng (np.random.Generator): Generador propio de la realización.
+
+    Retorna:
+    dict: {'probability': probabilidad estimada}.
+    """
+    probability = simulate_qubit_transmission(params['qubit_state'], params['measurement_basis'],
+                                              num_samples=params.get('num_samples', 1000), seed=rng)
+    return {'probability': probability}
@@ -0,0 +1,389 @@
+"""Clasificación vectorizada de los tipos de vértice de la QSN (Grupo 20 y demás configuraciones)."""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from qsn.cut_project import PHI
+from qsn.exact import ExactPointIndex, hash_rows
+
+# Aristas de un tetraedro como pares de índices locales y caras como ternas (la k es la opuesta
+# al vértice k)
+TETRAHEDRON_EDGES = np.array([[0, 1], [0, 2], [0, 3], [1, 2], [1, 3], [2, 3]])
+TETRAHEDRON_FACES = np.array([[1, 2, 3], [0, 2, 3], [0, 1, 3], [0, 1, 2]])
+_EDGE_INDEX = np.full((4, 4), -1)
+_EDGE_INDEX[TETRAHEDRON_EDGES[:, 0], TETRAHEDRON_EDGES[:, 1]] = np.arange(6)
+_EDGE_INDEX[TETRAHEDRON_EDGES[:, 1], TETRAHEDRON_EDGES[:, 0]] = np.arange(6)
+# Para el vértice local i y cada una de las otras tres caras k != i (la que comparte con un
+# vecino por una arista del enlace j-l): índice de la arista j-l y de las radiales i-j, i-l
+_OTHERS = np.array([[k for k in range(4) if k != i] for i in range(4)])
+_LINK_EDGE = np.array([[_EDGE_INDEX[tuple(j for j in range(4) if j not in (i, k))] for k in _OTHERS[i]]
+                       for i in range(4)])
+_RADIAL_EDGES = np.array([[[_EDGE_INDEX[i, j] for j in range(4) if j not in (i, k)] for k in _OTHERS[i]]
+                          for i in range(4)])
+_BOUNDARY = np.uint64(0x9E3779B97F4A7C15)  # Color de un lado del enlace sin vecino
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX = np.uint64(0xBF58476D1CE4E5B9)
+_HALF = (1 << 26) - 1  # Mitades del hash que se suman en float64 sin perder precisión
+_EXACT = 0  # Marca de las claves calculadas con longitudes exactas en Z[phi]
+
+# Tabla de tipos de la sesión: clave canónica (resolución o _EXACT, grado, hash) -> identificador estable
+_TYPES = ExactPointIndex(4, capacity=256)
+_NAMES = {}
+
+@dataclass
+class VertexCensus:
+    """Tipo de cada vértice y el histograma de tipos de un parche."""
+    type_ids: np.ndarray  # (P,) identificador del tipo de cada vértice; -1 si no tiene tetraedros
+    types: np.ndarray  # Tipos presentes, de más a menos frecuente
+    counts: np.ndarray  # Número de vértices de cada tipo
+    degrees: np.ndarray  # Tetraedros incidentes en los vértices de cada tipo
+
+    def names(self):
+        """Nombre de cada tipo presente (el registrado, o 'tipo-<id>')."""
+        return [vertex_type_name(t) for t in self.types]
+
+    def histogram(self):
+        """Diccionario {nombre del tipo: número de vértices}, de más a menos frecuente."""
+        return dict(zip(self.names(), self.counts.tolist()))
+
+def _snapped_labels(points, simplices, resolution, chunk_size):
+    """
+    Etiqueta entera de cada arista (T, 6) a partir de su longitud relativa a la más larga del tetraedro.
+
+    Las razones se ordenan y se agrupan mientras la distancia a la anterior no supere
+    resolution / 4; cada grupo recibe rint(mediana / resolution). Así todas las copias de una
+    misma longitud (que sólo difieren en el redondeo) comparten etiqueta aunque caigan cerca del
+    borde de un intervalo de cuantización. Las razones se calculan por bloques de `chunk_size`
+    tetraedros.
+    """
+    coordinates = np.ascontiguousarray(points.T)
+    ratios = np.empty((len(simplices), 6))
+    for start in range(0, len(simplices), chunk_size):
+        # Disposición por coordenada (3, 4, t): las restas por arista recorren memoria contigua
+        corners = coordinates[:, simplices[start:start + chunk_size].T]
+        lengths = ratios[start:start + chunk_size]
+        for k, (i, j) in enumerate(TETRAHEDRON_EDGES):
+            difference = corners[:, i] - corners[:, j]
+            lengths[:, k] = np.sqrt(np.einsum('ct,ct->t', difference, difference))
+        lengths /= lengths.max(axis=1, keepdims=True)
+    order = np.argsort(ratios.ravel())
+    ratios = ratios.ravel()[order]
+    steps = np.diff(ratios) > resolution / 4
+    breaks = np.flatnonzero(steps) + 1
+    starts, stops = np.r_[0, breaks], np.r_[breaks, len(ratios)]
+    values = np.rint(ratios[(starts + stops - 1) // 2] / resolution).astype(np.int64)
+    # Grupo y después etiqueta de cada razón ordenada, sobre el mismo arreglo
+    group = np.zeros(len(ratios), dtype=np.int64)
+    np.cumsum(steps, out=group[1:])
+    np.take(values, group, out=group)
+    labels = np.empty(len(ratios), dtype=np.int64)
+    labels[order] = group
+    return labels.reshape(-1, 6)
+
+def _exact_labels(exact, simplices, chunk_size):
+    """
+    Etiqueta de cada arista (T, 6) a partir de su longitud al cuadrado exacta en Z[phi] relativa
+    a la más larga del tetraedro.
+
+    Con x = a + phi b (el denominador común se cancela en las razones), |x|^2 = A + phi B con
+    A = sum(a^2 + b^2) y B = sum(2ab + b^2). La razón (A + phi B) / (C + phi D) se escribe como
+    (p + phi q) / N multiplicando por el conjugado, con N = C^2 + CD - D^2, y se reduce por
+    mcd(p, q, N) con N > 0: dos aristas tienen la misma etiqueta sólo si sus razones son iguales.
+    Se calcula por bloques de `chunk_size` tetraedros.
+    """
+    exact = np.asarray(exact, dtype=np.int64)
+    labels = np.empty((len(simplices), 6), dtype=np.int64)
+    for start in range(0, len(simplices), chunk_size):
+        chunk = simplices[start:start + chunk_size]
+        squared = np.empty((len(chunk), 6, 2), dtype=np.int64)
+        for k, (i, j) in enumerate(TETRAHEDRON_EDGES):
+            difference = exact[chunk[:, i]] - exact[chunk[:, j]]
+            a, b = difference[..., 0], difference[..., 1]
+            squared[:, k, 0] = np.sum(a * a + b * b, axis=1)
+            squared[:, k, 1] = np.sum(2 * a * b + b * b, axis=1)
+        longest = np.argmax(squared[..., 0] + PHI * squared[..., 1], axis=1)
+        c = squared[np.arange(len(chunk)), longest, 0][:, None]
+        d = squared[np.arange(len(chunk)), longest, 1][:, None]
+        a, b = squared[..., 0], squared[..., 1]
+        p, q, norm = a * c - b * d + a * d, b * c - a * d, c * c + c * d - d * d
+        p, q, norm = (np.where(norm < 0, -x, x) for x in (p, q, np.broadcast_to(norm, p.shape)))
+        divisor = np.maximum(np.gcd(np.gcd(p, q), norm), 1)
+        rows = np.stack([p // divisor, q // divisor, norm // divisor], axis=-1).reshape(-1, 3)
+        labels[start:start + chunk_size] = hash_rows(rows).view(np.int64).reshape(-1, 6)
+    return labels
+
+def _sorted_faces(simplices, faces):
+    """Vértices ordenados (F, 3) de las caras t * 4 + k (la opuesta al vértice local k de t)."""
+    corners = simplices[(faces // 4)[:, None], TETRAHEDRON_FACES[faces % 4]]
+    a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+    lo, hi = np.minimum(np.minimum(a, b), c), np.maximum(np.maximum(a, b), c)
+    return np.stack([lo, a + b + c - lo - hi, hi], axis=1)
+
+def _face_neighbours(simplices, chunk_size):
+    """Tetraedro vecino a través de la cara opuesta a cada vértice local, o -1, forma (T, 4)."""
+    num_faces = 4 * len(simplices)
+    hashes = np.empty(num_faces, dtype=np.uint64)
+    for start in range(0, num_faces, chunk_size):
+        faces = np.arange(start, min(start + chunk_size, num_faces))
+        hashes[faces] = hash_rows(_sorted_faces(simplices, faces))
+    # Las caras iguales tienen el mismo hash y quedan contiguas; se confirman comparándolas
+    order = np.argsort(hashes)
+    candidates = np.flatnonzero(hashes[order[1:]] == hashes[order[:-1]])
+    first, second = order[candidates], order[candidates + 1]
+    same = np.empty(len(first), dtype=bool)
+    for start in range(0, len(first), chunk_size):
+        stop = start + chunk_size
+        same[start:stop] = (_sorted_faces(simplices, first[start:stop])
+                            == _sorted_faces(simplices, second[start:stop])).all(axis=1)
+    first, second = first[same], second[same]
+    neighbours = np.full(num_faces, -1, dtype=np.int64)
+    neighbours[first] = second // 4
+    neighbours[second] = first // 4
+    return neighbours.reshape(-1, 4)
+
+def _mix(h):
+    """Mezcla de 64 bits de cada valor uint64 (la misma de `hash_rows`, sobre una sola columna)."""
+    h = h * _GOLDEN
+    h ^= h >> np.uint64(29)
+    h *= _MIX
+    h ^= h >> np.uint64(32)
+    return h
+
+def _distinct_per_group(colors, group, num_groups):
+    """
+    Número de colores distintos de cada grupo de incidencias.
+
+    El grupo ocupa los bits altos de una única clave uint64 y los bits altos del color el resto,
+    así que basta un np.sort (los colores son hashes: truncarlos no cambia la cuenta salvo una
+    colisión de probabilidad despreciable).
+    """
+    bits = np.uint64(max(int(num_groups - 1).bit_length(), 1))
+    keys = np.sort((group.astype(np.uint64) << (np.uint64(64) - bits)) | (colors >> bits))
+    new = np.ones(len(keys), dtype=bool)
+    new[1:] = keys[1:] != keys[:-1]
+    return np.bincount((keys[new] >> (np.uint64(64) - bits)).astype(np.int64), minlength=num_groups)
+
+def _link_sides(labels, incidences):
+    """
+    Hash de las longitudes de cada lado del triángulo del enlace de cada incidencia: la arista
+    del enlace y las dos radiales (ordenadas) que la unen al vértice.
+
+    Retorna:
+    list: Tres arreglos uint64 (n,), uno por lado.
+    """
+    cells, local = incidences // 4, incidences % 4
+    edges = labels.ravel()
+    link = edges.take(cells[:, None] * 6 + _LINK_EDGE[local]).astype(np.uint64)
+    radial = edges.take(cells[:, None, None] * 6 + _RADIAL_EDGES[local]).astype(np.uint64)
+    low, high = np.minimum(radial[..., 0], radial[..., 1]), np.maximum(radial[..., 0], radial[..., 1])
+    return list(np.ascontiguousarray(_mix(_mix(_mix(link) ^ low) ^ high).T))
+
+def _link_across(simplices, neighbours, incidences, rank):
+    """
+    Incidencia vecina de cada incidencia por cada lado: el mismo vértice en el tetraedro del otro
+    lado de la cara. Los lados sin vecino apuntan a la posición len(incidences).
+
+    Retorna:
+    list: Tres arreglos int64 (n,) de posiciones en `incidences`, uno por lado.
+    """
+    cells, local = incidences // 4, incidences % 4
+    corners = simplices.ravel()
+    vertex = corners[incidences]
+    other = neighbours.ravel().take(cells[:, None] * 4 + _OTHERS[local])
+    other = np.where(other >= 0, other * 4, -1)
+    position = np.zeros(other.shape, dtype=np.int64)
+    for j in range(1, 4):
+        position[corners.take(other + j) == vertex[:, None]] = j
+    return list(np.ascontiguousarray(np.where(other >= 0, rank.take(other + position), len(incidences)).T))
+
+def _link_colors(simplices, labels, neighbours, incidences, rank, rounds):
+    """
+    Color de cada incidencia (tetraedro, vértice local) tras refinar el enlace del vértice.
+
+    El enlace de un vértice es la superficie formada por las caras opuestas de sus tetraedros:
+    cada incidencia es un triángulo del enlace y linda, por sus tres aristas, con las
+    incidencias del mismo vértice en los tetraedros vecinos por una cara. El color inicial
+    resume las longitudes del tetraedro vistas desde el vértice, y en cada ronda se combina con
+    el multiconjunto de (longitudes de la arista compartida, color del vecino), como en el
+    refinamiento de Weisfeiler-Lehman; los multiconjuntos se resumen con la suma (módulo 2^64)
+    de sus elementos mezclados, que no depende del orden. El enlace de un vértice se deja de
+    refinar tras la primera ronda que no separa más sus incidencias (las siguientes sólo
+    renombrarían los colores de la misma forma en todos los enlaces con esos colores), o tras
+    `rounds` rondas; así el color sólo depende del enlace y no del resto del parche.
+
+    Parámetros:
+    incidences (array): Incidencias t * 4 + i de un conjunto de vértices completos, agrupadas por
+        vértice.
+    rank (array): Posición en `incidences` de cada incidencia de esos vértices (4 T,).
+
+    Retorna:
+    np.ndarray: Colores uint64 de cada incidencia.
+    """
+    vertex = simplices.ravel()[incidences]
+    sides = _link_sides(labels, incidences)
+    across = _link_across(simplices, neighbours, incidences, rank)
+
+    colors = np.empty(len(incidences) + 1, dtype=np.uint64)
+    colors[-1] = _BOUNDARY
+    colors[:-1] = _mix(sides[0] + sides[1] + sides[2])
+    group = np.cumsum(np.r_[False, vertex[1:] != vertex[:-1]])
+    num_groups = group[-1] + 1 if len(group) else 0
+    distinct = _distinct_per_group(colors[:-1], group, num_groups)
+    live = np.arange(len(vertex))
+    for _ in range(rounds):
+        mixed = _mix(colors)
+        pairs = [_mix(side ^ mixed[neighbour]) for side, neighbour in zip(sides, across)]
+        refined = _mix(colors[live] ^ (pairs[0] + pairs[1] + pairs[2]))
+        counts = _distinct_per_group(refined, group, num_groups)
+        # Los enlaces cuya partición ya no se refina conservan estos colores (que aún distinguen
+        # enlaces especulares con la misma partición) y dejan de refinarse
+        colors[live] = refined
+        grows = counts[group] > distinct[group]
+        distinct = np.maximum(distinct, counts)
+        if not grows.all():
+            live, group = live[grows], group[grows]
+            sides, across = [x[grows] for x in sides], [x[grows] for x in across]
+        if not len(live):
+            break
+    return colors[:-1]
+
+def vertex_configuration_keys(points, simplices, num_points=None, resolution=1 / 256, exact=None, rounds=6,
+                              chunk_size=2**18):
+    """
+    Clave canónica de la configuración de tetraedros incidentes en cada vértice.
+
+    Cada incidencia recibe el color del refinamiento del enlace del vértice (ver `_link_colors`)
+    y la clave del vértice es su grado más la suma (conmutativa) de los colores de sus
+    incidencias, acumulada con `np.bincount` en O(T). Así la clave recoge cómo se disponen y
+    comparten caras los tetraedros alrededor del vértice, y no depende del orden de los
+    tetraedros ni de la orientación del parche. Las longitudes se comparan de forma exacta si se
+    dan las coordenadas en Z[phi] y, si no, agrupando las razones casi iguales. Los enlaces se
+    refinan por bloques de vértices completos, así que la memoria de las rondas está acotada.
+
+    Parámetros:
+    points (array): Coordenadas de los vértices, forma (P, 3).
+    simplices (array): Índices de los vértices de cada tetraedro, forma (T, 4).
+    num_points (int | None): Número de vértices. Por defecto, len(points).
+    resolution (float): Tolerancia de las razones de longitudes en coma flotante.
+    exact (array | None): Coordenadas exactas (P, 3, 2) en Z[phi], p. ej. de `project_to_3d_exact`.
+    rounds (int): Máximo de rondas de refinamiento del enlace. Por defecto es 6 (el diámetro del
+        enlace del Grupo 20, un icosaedro, es 5).
+    chunk_size (int): Incidencias (tetraedro, vértice) o caras por bloque, para acotar la memoria
+        (las longitudes se calculan en bloques de chunk_size // 4 tetraedros).
+
+    Retorna:
+    np.ndarray: Claves int64 (P, 4): (pasos de resolución o 0 si exactas, grado, hash alto, hash bajo).
+    """
+    points = np.asarray(points, dtype=float)
+    simplices = np.asarray(simplices, dtype=np.intp).reshape(-1, 4)
+    num_points = len(points) if num_points is None else num_points
+    if exact is not None:
+        labels = _exact_labels(exact, simplices, max(chunk_size // 4, 1))
+    else:
+        labels = _snapped_labels(points, simplices, resolution, max(chunk_size // 4, 1))
+    neighbours = _face_neighbours(simplices, chunk_size)
+    # Incidencias agrupadas por vértice; cada bloque termina en un cambio de vértice
+    vertices = simplices.ravel()
+    order = np.argsort(vertices)
+    cuts = np.unique(np.r_[np.searchsorted(vertices[order], vertices[order][::chunk_size]), len(order)])
+    rank = np.empty(len(order), dtype=np.int64)
+    degree = np.zeros(num_points)
+    high = np.zeros(num_points)
+    low = np.zeros(num_points)
+    for start, stop in zip(cuts[:-1], cuts[1:]):
+        incidences = order[start:stop]
+        rank[incidences] = np.arange(stop - start)
+        hashes = _link_colors(simplices, labels, neighbours, incidences, rank, rounds)
+        owners = vertices[incidences]
+        # Dos mitades de 26 bits: sus sumas por vértice son exactas en float64
+        degree += np.bincount(owners, minlength=num_points)
+        high += np.bincount(owners, weights=((hashes >> np.uint64(32)) & np.uint64(_HALF)).astype(float),
+                            minlength=num_points)
+        low += np.bincount(owners, weights=(hashes & np.uint64(_HALF)).astype(float), minlength=num_points)
+    keys = np.empty((num_points, 4), dtype=np.int64)
+    keys[:, 0] = _EXACT if exact is not None else round(1 / resolution)
+    keys[:, 1] = degree
+    keys[:, 2] = high
+    keys[:, 3] = low
+    return keys
+
+def register_vertex_type(name, points, simplices, vertex=0, resolution=1 / 256, exact=None):
+    """
+    Registra con un nombre el tipo del vértice `vertex` de una configuración de ejemplo.
+
+    Retorna:
+    int: Identificador del tipo.
+    """
+    keys = vertex_configuration_keys(points, simplices, resolution=resolution, exact=exact)
+    ids, _ = _TYPES.insert(keys[vertex:vertex + 1])
+    _NAMES[int(ids[0])] = name
+    return int(ids[0])
+
+def vertex_type_name(type_id):
+    """Nombre registrado de un tipo, o 'tipo-<id>' si no tiene."""
+    return _NAMES.get(int(type_id), f"tipo-{int(type_id)}")
+
+def twenty_group(exact=False):
+    """
+    Configuración del Grupo 20: 20 tetraedros que comparten un vértice, uno por cara de un icosaedro.
+
+    Retorna:
+    tuple: (puntos (13, 3) con el vértice compartido en el origen, tetraedros (20, 4)); con
+        exact=True, los puntos son coordenadas exactas (13, 3, 2) en Z[phi].
+    """
+    # Los 12 vértices del icosaedro son las permutaciones cíclicas de (0, ±1, ±phi); en Z[phi]
+    # 1 = (1, 0) y phi = (0, 1)
+    signs = np.array([[1, 1], [1, -1], [-1, 1], [-1, -1]])
+    base = np.zeros((4, 3, 2), dtype=np.int64)
+    base[:, 1, 0] = signs[:, 0]
+    base[:, 2, 1] = signs[:, 1]
+    icosahedron = np.concatenate([np.roll(base, shift, axis=1) for shift in range(3)])
+    coordinates = icosahedron[..., 0] + PHI * icosahedron[..., 1]
+    # Caras: ternas de vértices a distancia 2 (la arista) entre sí
+    distance = np.linalg.norm(coordinates[:, None] - coordinates[None], axis=2)
+    adjacent = np.isclose(distance, 2)
+    faces = [(i, j, k) for i in range(12) for j in range(i + 1, 12) for k in range(j + 1, 12)
+             if adjacent[i, j] and adjacent[j, k] and adjacent[i, k]]
+    simplices = np.array([(0, i + 1, j + 1, k + 1) for i, j, k in faces])
+    if exact:
+        return np.concatenate([np.zeros((1, 3, 2), dtype=np.int64), icosahedron]), simplices
+    return np.concatenate([np.zeros((1, 3)), coordinates]), simplices
+
+@lru_cache(maxsize=None)
+def _known_types(resolution):
+    """Registra (una sola vez por resolución) los tipos de vértice conocidos, en coma flotante y exactos."""
+    points, simplices = twenty_group()
+    register_vertex_type('Grupo 20', points, simplices, vertex=0, resolution=resolution)
+    register_vertex_type('Grupo 20', points, simplices, vertex=0, exact=twenty_group(exact=True)[0])
+
+def classify_vertices(points, simplices, resolution=1 / 256, exact=None, chunk_size=2**18):
+    """
+    Clasifica todos los vértices de un parche por la configuración de sus tetraedros incidentes.
+
+    Cada configuración se reduce a una clave canónica invariante por rotaciones (ver
+    `vertex_configuration_keys`) que se busca en la tabla de tipos de la sesión: los tipos
+    conocidos (el Grupo 20) conservan su nombre y cada configuración nueva recibe un
+    identificador que se mantiene estable entre parches. Las longitudes no distinguen
+    configuraciones especulares, así que un tipo quiral y su imagen comparten identificador.
+
+    Parámetros:
+    points (array): Coordenadas de los vértices, forma (P, 3).
+    simplices (array): Índices de los vértices de cada tetraedro, forma (T, 4).
+    resolution (float): Tolerancia de las razones de longitudes en coma flotante.
+    exact (array | None): Coordenadas exactas (P, 3, 2) en Z[phi]; si se dan, las longitudes se
+        comparan sin redondeo.
+    chunk_size (int): Tamaño de los bloques (ver `vertex_configuration_keys`).
+
+    Retorna:
+    VertexCensus: Tipo de cada vértice e histograma de tipos.
+    """
+    _known_types(resolution)
+    keys = vertex_configuration_keys(points, simplices, resolution=resolution, exact=exact, chunk_size=chunk_size)
+    used = keys[:, 1] > 0
+    type_ids = np.full(len(keys), -1, dtype=np.int64)
+    type_ids[used], _ = _TYPES.insert(keys[used])
+    types, counts = np.unique(type_ids[used], return_counts=True)
+    order = np.argsort(-counts, kind='stable')
+    types, counts = types[order], counts[order]
+    return VertexCensus(type_ids, types, counts, _TYPES.keys[types, 1])
@@ -0,0 +1,14 @@
+import numpy as np
+
+from qsn.cache import ArtifactCache
+
+def test_cached_entry_larger_than_limit(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=1)
+    arrays = cache.cached('patch', {'radius': 1.0}, None, lambda: {'points': np.arange(1000.0)})
+    assert np.array_equal(arrays['points'], np.arange(1000.0))
+    assert cache.get('patch', {'radius': 1.0}) is not None
+
+    # La entrada nueva expulsa a la anterior, no a sí misma
+    cache.cached('patch', {'radius': 2.0}, None, lambda: {'points': np.zeros(10)})
+    assert cache.get('patch', {'radius': 1.0}) is None
+    assert cache.get('patch', {'radius': 2.0}) is not None
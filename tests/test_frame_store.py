@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from scipy.spatial import Delaunay
+
+from qsn.automaton import QSNAutomaton
+from qsn.frame_store import FrameStore, geometry_hash, record_run
+
+def _store(path, simplices, seed):
+    return FrameStore.create(path, len(simplices), metrics=('off', 'left', 'right'),
+                             geometry_hash=geometry_hash(simplices), seed=seed)
+
+def test_record_run_writes_num_frames_and_resumes(tmp_path):
+    simplices = Delaunay(np.random.default_rng(0).random((60, 3))).simplices
+    path = tmp_path / 'run.qsnf'
+    with _store(path, simplices, seed=0) as store:
+        record_run(QSNAutomaton(simplices, seed=0), store, 5)
+        assert len(store) == 5
+        assert store.frames.tolist() == [0, 1, 2, 3, 4]
+    expect = {'geometry_hash': geometry_hash(simplices), 'seed': 0}
+    with FrameStore.open(path, writable=True) as store:
+        record_run(QSNAutomaton(simplices, seed=1), store, 8, expect=expect)
+        assert len(store) == 8
+        assert store.frames.tolist() == list(range(8))
+    # Reanudar equivale a ejecutar de corrido
+    reference = QSNAutomaton(simplices, seed=0)
+    reference.step(7)
+    with FrameStore.open(path) as store:
+        assert np.array_equal(store.read_states(-1), reference.states)
+
+def test_record_run_rejects_other_run(tmp_path):
+    simplices = Delaunay(np.random.default_rng(0).random((60, 3))).simplices
+    path = tmp_path / 'run.qsnf'
+    with _store(path, simplices, seed=0) as store:
+        record_run(QSNAutomaton(simplices, seed=0), store, 3)
+    with FrameStore.open(path, writable=True) as store:
+        with pytest.raises(ValueError):
+            record_run(QSNAutomaton(simplices, seed=1), store, 5, expect={'seed': 1})
+        with pytest.raises(ValueError):
+            record_run(QSNAutomaton(simplices[:-1], seed=0), store, 5)
+        assert len(store) == 3
@@ -0,0 +1,61 @@
+import numpy as np
+from scipy.spatial import Delaunay
+
+from qsn.phason import PhasonPatch
+
+def _cells(simplices):
+    return set(map(tuple, np.sort(simplices, axis=1).tolist()))
+
+def _delaunay(patch):
+    vertices = np.flatnonzero(patch._multiplicity > 0)
+    return _cells(vertices[Delaunay(patch._positions[vertices]).simplices])
+
+def test_regeneration_matches_delaunay_and_keeps_ids():
+    patch = PhasonPatch(6.0)
+    rng = np.random.default_rng(1)
+    center = np.zeros(4)
+    regenerations = 0
+    for step in (0.05, 0.2, 0.05, 0.2, 0.2, 0.2):
+        before = dict(zip(patch.cell_ids.tolist(), patch.simplices.tolist()))
+        center = center + rng.normal(size=4) * step
+        update = patch.shift(center)
+        simplices = patch.simplices
+        assert (simplices >= 0).all()
+        assert len(_cells(simplices)) == len(simplices)
+        assert _cells(simplices) == _delaunay(patch)
+        # Las celdas que no aparecen en changed_cells conservan sus vértices (renumerados si se regeneró)
+        renumber = (lambda v: v) if update.remap is None else \
+            (lambda v: patch.representative[update.remap[v]])
+        changed = set(update.changed_cells.tolist())
+        after = dict(zip(patch.cell_ids.tolist(), simplices.tolist()))
+        for cell, vertices in before.items():
+            if cell not in changed:
+                assert sorted(after[cell]) == sorted(renumber(np.asarray(vertices)).tolist())
+        assert set(after) - set(before) <= changed
+        regenerations += update.remap is not None
+    assert regenerations >= 3
+
+def test_small_shifts_stay_local():
+    patch = PhasonPatch(5.0, margin=0.2)
+    direction = np.random.default_rng(0).normal(size=4)
+    direction /= np.linalg.norm(direction)
+    for step in range(1, 101):
+        patch.shift(direction * 0.0005 * step)
+    assert patch.stats['full'] == 0 and patch.stats['local'] > 0
+    assert _cells(patch.simplices) == _delaunay(patch)
+
+def test_failed_full_update_keeps_previous_triangulation(monkeypatch):
+    import scipy.spatial
+    from scipy.spatial import QhullError
+
+    patch = PhasonPatch(5.0, max_cavity_fraction=0.0)
+    before = dict(zip(patch.cell_ids.tolist(), patch.simplices.tolist()))
+
+    def failing(*args, **kwargs):
+        raise QhullError("QH6154 fallo simulado")
+
+    monkeypatch.setattr(scipy.spatial, 'Delaunay', failing)
+    update = patch.shift(np.full(4, 0.01))
+    assert update.full and 'QH6154' in update.error
+    assert len(update.added_cells) == 0 and len(update.removed_cells) == 0
+    assert dict(zip(patch.cell_ids.tolist(), patch.simplices.tolist())) == before
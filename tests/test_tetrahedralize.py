@@ -0,0 +1,27 @@
+import numpy as np
+from scipy.spatial import Delaunay
+
+from qsn.cut_project import cut_and_project
+from qsn.tetrahedralize import tetrahedralize_tiled
+
+def _cells(simplices):
+    return set(map(tuple, np.sort(simplices, axis=1).tolist()))
+
+def _perturbed(points, perturbation=1e-9, seed=0):
+    # La misma perturbación que aplica tetrahedralize_tiled
+    extent = np.maximum(points.max(axis=0) - points.min(axis=0), 1e-12)
+    return points + np.random.default_rng(seed).uniform(-perturbation, perturbation, points.shape) * extent.max()
+
+def test_tiled_matches_delaunay():
+    patch = np.concatenate(list(cut_and_project(6.0)))
+    uniform = np.random.default_rng(1).random((5000, 3))
+    for points in (patch, uniform):
+        simplices, failures = tetrahedralize_tiled(points, num_blocks=3, max_workers=1)
+        assert failures == []
+        assert _cells(simplices) == _cells(Delaunay(_perturbed(points)).simplices)
+
+def test_degenerate_cells_are_reported():
+    grid = np.stack(np.meshgrid(*[np.arange(4.0)] * 3), axis=-1).reshape(-1, 3)
+    # Sin perturbación, Qhull deja tetraedros planos en las facetas coesféricas de la rejilla
+    _, failures = tetrahedralize_tiled(grid, num_blocks=1, max_workers=1, perturbation=0)
+    assert [failure.kind for failure in failures] == ['degenerate']
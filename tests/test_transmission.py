@@ -0,0 +1,9 @@
+
+from qsn.transmission import simulate_qubit_transmission_batch
+
+def test_target_ci_needs_min_samples():
+    # Con bloques de una muestra, la primera estimación es 0 o 1: el intervalo normal se anulaba
+    _, used = simulate_qubit_transmission_batch([[0, 0, 1]] * 4, [1, 0, 0], num_samples=5000, chunk_size=4,
+                                                target_ci=0.05, min_samples=200, seed=0)
+    assert (used >= 200).all()
+    assert (used < 5000).all()
@@ -0,0 +1,35 @@
+import numpy as np
+from scipy.spatial import Delaunay
+from scipy.spatial.transform import Rotation
+
+from qsn.cut_project import cut_and_project
+from qsn.exact import zphi_project
+from qsn.vertex_types import classify_vertices, twenty_group, vertex_configuration_keys
+
+def test_twenty_group_float_and_exact():
+    points, simplices = twenty_group()
+    exact, _ = twenty_group(exact=True)
+    assert classify_vertices(points, simplices).histogram()['Grupo 20'] == 1
+    assert classify_vertices(points, simplices, exact=exact).histogram()['Grupo 20'] == 1
+
+def test_keys_depend_on_face_adjacency():
+    # Dos tetraedros regulares con el vértice 0 en común: pegados por una cara o sólo por el vértice
+    regular = np.array([[0, 0, 0], [1, 0, 0], [0.5, np.sqrt(3) / 2, 0], [0.5, np.sqrt(3) / 6, np.sqrt(2 / 3)]])
+    glued = np.vstack([regular, [0.5, np.sqrt(3) / 6, -np.sqrt(2 / 3)]])
+    apart = np.vstack([regular, -regular[1:] @ Rotation.from_euler('z', 0.3).as_matrix().T])
+    glued_keys = vertex_configuration_keys(glued, [[0, 1, 2, 3], [0, 1, 2, 4]])
+    apart_keys = vertex_configuration_keys(apart, [[0, 1, 2, 3], [0, 4, 5, 6]])
+    assert glued_keys[0, 1] == apart_keys[0, 1] == 2
+    assert (glued_keys[0] != apart_keys[0]).any()
+
+def test_census_is_invariant_and_matches_exact():
+    points, lattice = (np.concatenate(part) for part in zip(*cut_and_project(6.0, return_lattice=True)))
+    simplices = Delaunay(points).simplices
+    census = classify_vertices(points, simplices)
+    exact = classify_vertices(points, simplices, exact=zphi_project(lattice)[:, 1:])
+    assert len(set(zip(census.type_ids.tolist(), exact.type_ids.tolist()))) == len(census.types)
+
+    rng = np.random.default_rng(0)
+    moved = points @ Rotation.random(random_state=1).as_matrix().T * 2.5 + rng.normal(scale=1e-9, size=points.shape)
+    shuffled = classify_vertices(moved, simplices[rng.permutation(len(simplices))][:, rng.permutation(4)])
+    assert (shuffled.type_ids == census.type_ids).all()